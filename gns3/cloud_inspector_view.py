@@ -13,9 +13,6 @@ from PyQt4.QtCore import QTimer
 from PyQt4.QtCore import pyqtSignal
 from PyQt4.Qt import Qt
 
-from .cloud.utils import (ListInstancesThread, CreateInstanceThread, DeleteInstanceThread,
-                          StartGNS3ServerThread, WSConnectThread)
-from libcloud.compute.types import NodeState
 from .topology import Topology
 
 # this widget was promoted on Creator, must use absolute imports
@@ -27,13 +24,29 @@ log = logging.getLogger(__name__)
 POLLING_TIMER = 10000  # in milliseconds
 
 
-class RunningInstanceState(NodeState):
+_running_instance_state = None
+
+
+def runningInstanceState():
     """
-    GNS3 states for running instances
+    Returns the GNS3 states for running instances,
+    libcloud is imported when the cloud is first used.
     """
-    GNS3SERVER_STARTING = 10
-    GNS3SERVER_STARTED = 11
-    WS_CONNECTED = 12
+
+    global _running_instance_state
+    if _running_instance_state is None:
+        from libcloud.compute.types import NodeState
+
+        class RunningInstanceState(NodeState):
+            """
+            GNS3 states for running instances
+            """
+            GNS3SERVER_STARTING = 10
+            GNS3SERVER_STARTED = 11
+            WS_CONNECTED = 12
+
+        _running_instance_state = RunningInstanceState
+    return _running_instance_state
 
 
 class InstanceTableModel(QAbstractTableModel):
@@ -61,11 +74,11 @@ class InstanceTableModel(QAbstractTableModel):
         """
         Return a string pointing to the graphic resource
         """
-        if instance.state == RunningInstanceState.WS_CONNECTED:
+        if instance.state == runningInstanceState().WS_CONNECTED:
             return ':/icons/led_green.svg'
-        elif instance.state in (RunningInstanceState.STOPPED,
-                                RunningInstanceState.TERMINATED,
-                                RunningInstanceState.UNKNOWN):
+        elif instance.state in (runningInstanceState().STOPPED,
+                                runningInstanceState().TERMINATED,
+                                runningInstanceState().UNKNOWN):
             return ':/icons/led_red.svg'
         else:
             return ':/icons/led_yellow.svg'
@@ -225,6 +238,7 @@ class CloudInspectorView(QWidget, Ui_CloudInspectorView):
         for i in instances:
             self._project_instances_id.append(i["id"])
 
+        from .cloud.utils import ListInstancesThread
         update_thread = ListInstancesThread(self, self._provider)
         update_thread.instancesReady.connect(self._update_model)
         update_thread.start()
@@ -269,6 +283,7 @@ class CloudInspectorView(QWidget, Ui_CloudInspectorView):
         if len(sel) and self._provider is not None:
             index = sel[0].row()
             instance = self._model.getInstance(index)
+            from .cloud.utils import DeleteInstanceThread
             delete_thread = DeleteInstanceThread(self, self._provider, instance)
             delete_thread.instanceDeleted.connect(self._main_window.remove_instance_from_project)
             delete_thread.start()
@@ -297,6 +312,7 @@ class CloudInspectorView(QWidget, Ui_CloudInspectorView):
         if self._provider is None:
             return
 
+        from .cloud.utils import ListInstancesThread
         update_thread = ListInstancesThread(self, self._provider)
         update_thread.instancesReady.connect(self._update_model)
         update_thread.start()
@@ -312,7 +328,7 @@ class CloudInspectorView(QWidget, Ui_CloudInspectorView):
         """
         # instance state transition: GNS3SERVER_STARTING --> GNS3SERVER_STARTED
         instance = self._model.getInstanceById(id)
-        instance.state = RunningInstanceState.GNS3SERVER_STARTED
+        instance.state = runningInstanceState().GNS3SERVER_STARTED
         self._model.updateInstanceFields(instance, ['state'])
 
         data = ast.literal_eval(start_response)
@@ -341,6 +357,7 @@ class CloudInspectorView(QWidget, Ui_CloudInspectorView):
         ssh_pkey = top_instance.private_key
 
         log.debug('Cloud server gns3server started.')
+        from .cloud.utils import WSConnectThread
         wss_thread = WSConnectThread(self, self._provider, id, host_ip, port, ca_file,
                                      username, password, ssh_pkey, id)
         wss_thread.established.connect(self._wss_connected_slot)
@@ -353,7 +370,7 @@ class CloudInspectorView(QWidget, Ui_CloudInspectorView):
         """
         # instance state transition: GNS3SERVER_STARTED --> WS_CONNECTED
         instance = self._model.getInstanceById(id)
-        instance.state = RunningInstanceState.WS_CONNECTED
+        instance.state = runningInstanceState().WS_CONNECTED
         self._model.updateInstanceFields(instance, ['state'])
 
     def _get_public_ip(self, ip_list):
@@ -383,7 +400,7 @@ class CloudInspectorView(QWidget, Ui_CloudInspectorView):
         # filter instances to only those in the current project
         project_instances = [i for i in instances if i.id in self._project_instances_id]
         for i in project_instances:
-            if i.state != RunningInstanceState.RUNNING:
+            if i.state != runningInstanceState().RUNNING:
                 self._model.updateInstanceFields(i, ['state'])
 
         # cleanup removed instances
@@ -398,15 +415,16 @@ class CloudInspectorView(QWidget, Ui_CloudInspectorView):
             # get the real instance state from self._model
             model_instance = self._model.getInstanceById(i.id)
 
-            if model_instance.state == RunningInstanceState.RUNNING:
+            if model_instance.state == runningInstanceState().RUNNING:
                 # instance state transition: RUNNING --> GNS3SERVER_STARTING
-                model_instance.state = RunningInstanceState.GNS3SERVER_STARTING
+                model_instance.state = runningInstanceState().GNS3SERVER_STARTING
                 self._model.updateInstanceFields(model_instance, ['state'])
 
                 # start GNS3 server and deadman switch
                 public_ip = self._get_public_ip(i.public_ips)
                 instance_manager.update_host_for_instance(i.id, public_ip)
                 topology_instance = instance_manager.get_instance(i.id)
+                from .cloud.utils import StartGNS3ServerThread
                 ssh_thread = StartGNS3ServerThread(
                     self, public_ip, topology_instance.private_key, i.id,
                     self._provider.username, self._provider.api_key, self._provider.region,
@@ -437,6 +455,7 @@ class CloudInspectorView(QWidget, Ui_CloudInspectorView):
             if not name.endswith("-gns3"):
                 name += "-gns3"
 
+            from .cloud.utils import CreateInstanceThread
             create_thread = CreateInstanceThread(self, self._provider, name, flavor_id, image_id)
             create_thread.instanceCreated.connect(self._main_window.add_instance_to_project)
             create_thread.instanceCreated.connect(CloudInstances.instance().add_instance)
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Exports the configs of all the nodes at once: a limited number of export
+requests is in flight on each server and every config received is written
+straight to a zip or tar archive, or to a directory.
+"""
+
+import os
+import io
+import time
+import binascii
+import zipfile
+import tarfile
+import functools
+from collections import OrderedDict, deque
+
+from .qt import QtCore
+
+import logging
+log = logging.getLogger(__name__)
+
+# maximum number of export requests in flight on each server
+CONFIG_EXPORT_WINDOW = 8
+
+# archive file extensions and their format
+ARCHIVE_FORMATS = OrderedDict([(".zip", "zip"),
+                               (".tar.gz", "gztar"),
+                               (".tgz", "gztar"),
+                               (".tar", "tar")])
+
+
+def archiveFormat(path):
+    """
+    Returns the archive format matching a file name.
+
+    :param path: destination path
+
+    :returns: "zip", "gztar", "tar" or None for a directory
+    """
+
+    for extension, archive_format in ARCHIVE_FORMATS.items():
+        if path.lower().endswith(extension):
+            return archive_format
+    return None
+
+
+class ConfigArchive(object):
+    """
+    Destination of the exported configs.
+
+    :param path: archive or directory path
+    """
+
+    def __init__(self, path):
+
+        self._path = path
+        self._format = archiveFormat(path)
+        if self._format == "zip":
+            self._archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        elif self._format == "gztar":
+            self._archive = tarfile.open(path, "w:gz")
+        elif self._format == "tar":
+            self._archive = tarfile.open(path, "w")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._archive = None
+
+    def write(self, file_name, content):
+        """
+        Writes a config.
+
+        :param file_name: config file name
+        :param content: config content (bytes)
+        """
+
+        if self._format == "zip":
+            self._archive.writestr(file_name, content)
+        elif self._archive is not None:
+            info = tarfile.TarInfo(file_name)
+            info.size = len(content)
+            info.mtime = time.time()
+            self._archive.addfile(info, io.BytesIO(content))
+        else:
+            with open(os.path.join(self._path, file_name), "wb") as f:
+                f.write(content)
+
+    def close(self):
+        """
+        Closes the archive.
+        """
+
+        if self._archive is not None:
+            self._archive.close()
+
+    def discard(self):
+        """
+        Closes and deletes an incomplete archive,
+        the files already written to a directory are kept.
+        """
+
+        if self._archive is None:
+            return
+        try:
+            self._archive.close()
+            os.remove(self._path)
+        except OSError as e:
+            log.warning("could not delete {}: {}".format(self._path, e))
+
+
+class ConfigExporter(QtCore.QObject):
+    """
+    Exports the configs of nodes from all their servers concurrently.
+
+    :param nodes: list of Node instances
+    :param path: archive or directory path
+    :param window: maximum number of export requests in flight on each server
+    :param parent: parent object
+    """
+
+    # number of nodes done, total number of nodes
+    progress_signal = QtCore.Signal(int, int)
+
+    # emitted once all the nodes are done or the export is cancelled
+    finished_signal = QtCore.Signal()
+
+    def __init__(self, nodes, path, window=CONFIG_EXPORT_WINDOW, parent=None):
+
+        QtCore.QObject.__init__(self, parent)
+        self._path = path
+        self._window = window
+        self._archive = None
+        self._cancelled = False
+        self._done = 0
+        self._files = 0
+        self._failures = []
+
+        # server -> nodes waiting to be exported
+        self._queues = OrderedDict()
+        for node in nodes:
+            if hasattr(node, "exportConfigMessage") and node.initialized():
+                self._queues.setdefault(node.server(), deque()).append(node)
+        self._total = sum(len(queue) for queue in self._queues.values())
+
+    def path(self):
+        """
+        Returns the archive or directory path.
+
+        :returns: path
+        """
+
+        return self._path
+
+    def total(self):
+        """
+        Returns the number of nodes to export.
+
+        :returns: integer
+        """
+
+        return self._total
+
+    def exportedCount(self):
+        """
+        Returns the number of config files written.
+
+        :returns: integer
+        """
+
+        return self._files
+
+    def failures(self):
+        """
+        Returns the nodes whose configs could not be exported.
+
+        :returns: list of (node name, error message) tuples
+        """
+
+        return self._failures
+
+    def isRunning(self):
+        """
+        Returns either the export is in progress.
+
+        :returns: boolean
+        """
+
+        return self._archive is not None
+
+    def isCancelled(self):
+        """
+        Returns either the export has been cancelled.
+
+        :returns: boolean
+        """
+
+        return self._cancelled
+
+    def start(self):
+        """
+        Opens the archive and sends the first export requests to each server.
+
+        :raises OSError: if the archive cannot be created
+        """
+
+        self._archive = ConfigArchive(self._path)
+        log.info("exporting the configs of {} node(s) to {}".format(self._total, self._path))
+        self.progress_signal.emit(0, self._total)
+        if not self._total:
+            self._finish()
+            return
+
+        for server, queue in list(self._queues.items()):
+            server.startBatch()
+            try:
+                for _ in range(self._window):
+                    if not self._sendNext(server):
+                        break
+            finally:
+                server.endBatch()
+
+    def cancel(self):
+        """
+        Cancels the export, the replies still to come are ignored.
+        """
+
+        if self._archive is None:
+            return
+
+        log.info("config export to {} cancelled".format(self._path))
+        self._cancelled = True
+        self._queues.clear()
+        self._archive.discard()
+        self._archive = None
+        self.finished_signal.emit()
+
+    def _sendNext(self, server):
+        """
+        Sends the next export request to a server.
+
+        :param server: WebSocketClient instance
+
+        :returns: False if there is no node left for this server
+        """
+
+        queue = self._queues.get(server)
+        while queue:
+            node = queue.popleft()
+            if server.connected() or server.isReconnecting():
+                destination, params = node.exportConfigMessage()
+                server.send_message(destination, params, functools.partial(self._exportConfigCallback, server, node))
+                return True
+
+            # the message would be dropped without any reply
+            message = "connection with server {}:{} is down".format(server.host, server.port)
+            log.error("could not export {} configs: {}".format(node.name(), message))
+            self._failures.append((node.name(), message))
+            self._nodeDone()
+        return False
+
+    def _exportConfigCallback(self, server, node, result, error=False):
+        """
+        Called when the configs of a node have been received.
+
+        :param server: WebSocketClient instance
+        :param node: Node instance
+        :param result: server response
+        :param error: indicates an error (boolean)
+        """
+
+        if self._archive is None:
+            # cancelled in the meantime
+            return
+
+        if error:
+            log.error("error while exporting {} configs: {}".format(node.name(), result["message"]))
+            self._failures.append((node.name(), result["message"]))
+        else:
+            try:
+                for file_name, content in node.exportedConfigs(result):
+                    log.debug("saving {} to {}".format(file_name, self._path))
+                    self._archive.write(file_name, content)
+                    self._files += 1
+            except (OSError, binascii.Error) as e:
+                log.error("could not export {} configs: {}".format(node.name(), e))
+                self._failures.append((node.name(), str(e)))
+
+        if not self._nodeDone():
+            self._sendNext(server)
+
+    def _nodeDone(self):
+        """
+        Counts a node as done, whether its configs have been exported or not.
+
+        :returns: True if all the nodes are done
+        """
+
+        self._done += 1
+        self.progress_signal.emit(self._done, self._total)
+        if self._done == self._total:
+            self._finish()
+            return True
+        return False
+
+    def _finish(self):
+        """
+        Closes the archive once all the nodes are done.
+        """
+
+        try:
+            self._archive.close()
+        except OSError as e:
+            self._failures.append((os.path.basename(self._path), str(e)))
+        self._archive = None
+        log.info("{} config file(s) exported to {}, {} node(s) failed".format(self._files, self._path, len(self._failures)))
+        self.finished_signal.emit()
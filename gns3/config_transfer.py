@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Uploads of configuration files to the servers: the files are read and
+base64 encoded by chunks, and a file is not sent again to a device
+that already has the same content.
+"""
+
+import os
+import base64
+import hashlib
+
+import logging
+log = logging.getLogger(__name__)
+
+# size of the chunks read from the configuration files (multiple of 3 for base64)
+CHUNK_SIZE = 3 * 16384
+
+
+def readConfig(path, prefix=""):
+    """
+    Reads a configuration file by chunks, carriage returns are removed.
+
+    :param path: path to the configuration file
+    :param prefix: text inserted before the file content
+
+    :returns: iterator of bytes
+    """
+
+    if prefix:
+        yield prefix.encode("utf-8")
+    with open(path, "r", errors="replace") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk.replace("\r", "").encode("utf-8")
+
+
+def encodeConfig(path, prefix=""):
+    """
+    Base64 encodes a configuration file by chunks.
+
+    :param path: path to the configuration file
+    :param prefix: text inserted before the file content
+
+    :returns: base64 encoded string
+    """
+
+    encoded = []
+    remainder = b""
+    for chunk in readConfig(path, prefix):
+        data = remainder + chunk
+        # encode complete 3 bytes groups, so the chunks can be concatenated
+        cut = len(data) - len(data) % 3
+        encoded.append(base64.b64encode(data[:cut]))
+        remainder = data[cut:]
+    encoded.append(base64.b64encode(remainder))
+    return b"".join(encoded).decode("ascii")
+
+
+def configDigest(path, prefix=""):
+    """
+    Returns the digest of a configuration file, as it would be sent.
+
+    :param path: path to the configuration file
+    :param prefix: text inserted before the file content
+
+    :returns: hexadecimal digest
+    """
+
+    digest = hashlib.sha1()
+    for chunk in readConfig(path, prefix):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConfigTransferService(object):
+    """
+    Remembers the configuration files each device has received.
+    """
+
+    def __init__(self):
+
+        # (server ID, device, config name) -> digest of the content sent
+        self._sent = {}
+        # path -> (modification time, size, prefix, digest)
+        self._digests = {}
+        self._uploads = 0
+        self._skipped = 0
+
+    def _digest(self, path, prefix):
+        """
+        Returns the digest of a file, computed again only if the file has changed.
+
+        :param path: path to the configuration file
+        :param prefix: text inserted before the file content
+
+        :returns: hexadecimal digest
+        """
+
+        stat = os.stat(path)
+        cached = self._digests.get(path)
+        if cached and cached[:3] == (stat.st_mtime_ns, stat.st_size, prefix):
+            return cached[3]
+        digest = configDigest(path, prefix)
+        self._digests[path] = (stat.st_mtime_ns, stat.st_size, prefix, digest)
+        return digest
+
+    def upload(self, server, device, config_name, path, prefix=""):
+        """
+        Returns the base64 encoded content of a configuration file to
+        send to a device, unless the device already has this content.
+
+        :param server: WebSocketClient instance
+        :param device: device identifier on the server
+        :param config_name: configuration name (startup_config, private_config...)
+        :param path: path to the configuration file
+        :param prefix: text inserted before the file content
+
+        :returns: base64 encoded string, None if the device already has
+        this content or "" if the file cannot be read
+        """
+
+        key = (server.id(), device, config_name)
+        try:
+            digest = self._digest(path, prefix)
+            if self._sent.get(key) == digest:
+                self._skipped += 1
+                log.debug("{} of {} is unchanged, not sent again".format(config_name, device))
+                return None
+            log.info("opening configuration file: {}".format(path))
+            encoded = encodeConfig(path, prefix)
+        except OSError as e:
+            log.warn("could not base64 encode {}: {}".format(path, e))
+            return ""
+
+        self._sent[key] = digest
+        self._uploads += 1
+        return encoded
+
+    def received(self, server, device, config_name, content):
+        """
+        Records the content of a configuration a device has,
+        for instance when it has been exported.
+
+        :param server: WebSocketClient instance
+        :param device: device identifier on the server
+        :param config_name: configuration name
+        :param content: configuration content (bytes)
+        """
+
+        self._sent[(server.id(), device, config_name)] = hashlib.sha1(content.replace(b"\r", b"")).hexdigest()
+
+    def forget(self, server, device=None):
+        """
+        Forgets what has been sent to a device or to all the devices of a server,
+        when the upload has failed or the server may have lost its state.
+
+        :param server: WebSocketClient instance
+        :param device: device identifier on the server (optional)
+        """
+
+        for key in list(self._sent):
+            if key[0] == server.id() and (device is None or key[1] == device):
+                del self._sent[key]
+
+    def clear(self):
+        """
+        Forgets everything, when the topology is reset.
+        """
+
+        self._sent.clear()
+        self._digests.clear()
+
+    def stats(self):
+        """
+        Returns the number of files sent and skipped.
+
+        :returns: dictionary
+        """
+
+        return {"uploads": self._uploads, "skipped": self._skipped}
+
+    @staticmethod
+    def instance():
+        """
+        Singleton to return only one instance of ConfigTransferService.
+
+        :returns: instance of ConfigTransferService
+        """
+
+        if not hasattr(ConfigTransferService, "_instance"):
+            ConfigTransferService._instance = ConfigTransferService()
+        return ConfigTransferService._instance
@@ -286,6 +286,22 @@ class ConsoleCmd(cmd.Cmd):
                             print(json.dumps(node, sort_keys=True, indent=4))
                             break
 
+    def _show_stats(self, params):
+        """
+        Handles the 'show stats' command.
+
+        :param params: list of parameters
+        """
+
+        from .servers import Servers
+        for server in Servers.instance().servers():
+            stats = server.metrics().dump()
+            stats["pending_requests"] = server.pendingRequestCount()
+            stats["oldest_pending_request_age"] = round(server.oldestPendingRequestAge(), 2)
+            stats["coalesced_messages"] = server.coalescedCount()
+            print("Server {}:{} {}".format(server.host, server.port, "(connected)" if server.connected() else "(disconnected)"))
+            print(json.dumps(stats, sort_keys=True, indent=4))
+
     def do_show(self, args):
         """
         Show detail information about every device in current lab:
@@ -299,6 +315,9 @@ class ConsoleCmd(cmd.Cmd):
 
         Show topology info of a device:
         show run <device_name>
+
+        Show the metrics collected on the server connections:
+        show stats
         """
 
         if '?' in args or args.strip() == "":
@@ -310,6 +329,8 @@ class ConsoleCmd(cmd.Cmd):
             self._show_device(params)
         elif params[0] == "run":
             self._show_run(params)
+        elif params[0] == "stats":
+            self._show_stats(params)
         else:
             print(self.do_show.__doc__)
 
@@ -19,9 +19,11 @@ import os
 import sys
 import pkg_resources
 
-from ..qt import QtCore, QtGui, QtWebKit
+from ..qt import QtCore, QtGui, importWebKit
 from ..ui.getting_started_dialog_ui import Ui_GettingStartedDialog
 
+QtWebKit = importWebKit()
+
 
 class GettingStartedDialog(QtGui.QDialog, Ui_GettingStartedDialog):
     """
@@ -141,9 +141,10 @@ class SnapshotsDialog(QtGui.QDialog, Ui_SnapshotsDialog):
 
         # stop all the nodes
         topology = Topology.instance()
-        for node in topology.nodes():
-            if hasattr(node, "start") and node.status() == Node.started:
-                node.stop()
+        with topology.batch():
+            for node in topology.nodes():
+                if hasattr(node, "start") and node.status() == Node.started:
+                    node.stop()
 
         #FIXME: problably a bug when restoring a snapshot and the project name has changed.
         thread = ProcessFilesThread(snapshot_path, os.path.dirname(self._project_path), skip_dirs=["snapshots"])
@@ -153,7 +154,8 @@ class SnapshotsDialog(QtGui.QDialog, Ui_SnapshotsDialog):
         progress_dialog.exec_()
 
         from ..main_window import MainWindow
-        MainWindow.instance().loadProject(self._project_path)
+        with topology.batch():
+            MainWindow.instance().loadProject(self._project_path)
         self.accept()
 
     def _snapshotDoubleClickedSlot(self, item):
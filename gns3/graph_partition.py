@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Balanced graph partitioning minimizing the weight of the edges cut.
+
+Multilevel scheme: the graph is coarsened by heavy-edge matching,
+the coarsest graph is bisected by greedy growing, then the bisection
+is projected back level by level and refined with Kernighan-Lin style
+vertex moves (Fiduccia-Mattheyses variant). k-way partitions are
+obtained by recursive bisection.
+"""
+
+import random
+
+import logging
+log = logging.getLogger(__name__)
+
+# graphs with fewer vertices are not coarsened further
+COARSEST_SIZE = 20
+
+# allowed imbalance, as a fraction of the total weight
+IMBALANCE = 0.05
+
+# maximum number of refinement passes on each level
+REFINEMENT_PASSES = 8
+
+# number of initial bisections tried on the coarsest graph
+INITIAL_TRIES = 4
+
+
+class _Graph(object):
+    """
+    Undirected weighted graph used during partitioning.
+
+    :param weights: list of vertex weights
+    :param adjacency: list of dictionaries neighbor -> edge weight
+    :param fixed: list of fixed sides (0, 1 or None) for each vertex
+    """
+
+    __slots__ = ("weights", "adjacency", "fixed")
+
+    def __init__(self, weights, adjacency, fixed):
+
+        self.weights = weights
+        self.adjacency = adjacency
+        self.fixed = fixed
+
+    def __len__(self):
+
+        return len(self.weights)
+
+
+def cutWeight(edges, assignment):
+    """
+    Returns the weight of the edges between different parts.
+
+    :param edges: dictionary (vertex, vertex) -> edge weight
+    :param assignment: dictionary vertex -> part
+
+    :returns: number
+    """
+
+    return sum(weight for (source, destination), weight in edges.items()
+               if assignment.get(source) != assignment.get(destination))
+
+
+def partitionGraph(weights, edges, capacities, fixed=None, seed=0):
+    """
+    Partitions a graph in parts proportional to their capacities
+    while minimizing the weight of the edges cut.
+
+    :param weights: dictionary vertex -> weight
+    :param edges: dictionary (vertex, vertex) -> edge weight
+    :param capacities: list of part capacities
+    :param fixed: dictionary vertex -> part for vertices that cannot move (optional)
+    :param seed: seed of the random generator
+
+    :returns: dictionary vertex -> part index
+    """
+
+    vertices = list(weights.keys())
+    if not vertices:
+        return {}
+    if len(capacities) == 1:
+        return {vertex: 0 for vertex in vertices}
+
+    index = {vertex: position for position, vertex in enumerate(vertices)}
+    adjacency = [{} for _ in vertices]
+    for (source, destination), weight in edges.items():
+        if source == destination or source not in index or destination not in index:
+            continue
+        source, destination = index[source], index[destination]
+        adjacency[source][destination] = adjacency[source].get(destination, 0) + weight
+        adjacency[destination][source] = adjacency[destination].get(source, 0) + weight
+
+    fixed = fixed or {}
+    parts = [fixed.get(vertex) for vertex in vertices]
+    assignment = [0] * len(vertices)
+    rng = random.Random(seed)
+    _recursiveBisection(list(range(len(vertices))),
+                        [weights[vertex] for vertex in vertices],
+                        adjacency,
+                        parts,
+                        list(range(len(capacities))),
+                        capacities,
+                        assignment,
+                        rng)
+    return {vertex: assignment[position] for position, vertex in enumerate(vertices)}
+
+
+def _recursiveBisection(members, weights, adjacency, parts, part_ids, capacities, assignment, rng):
+    """
+    Splits a set of vertices between parts by recursive bisection.
+
+    :param members: vertex indexes to split
+    :param weights: weights of all the vertices
+    :param adjacency: adjacency of all the vertices
+    :param parts: fixed part of all the vertices (or None)
+    :param part_ids: part indexes to split the vertices between
+    :param capacities: capacities of all the parts
+    :param assignment: list updated with the part of each vertex
+    :param rng: random generator
+    """
+
+    if len(part_ids) == 1 or not members:
+        for vertex in members:
+            assignment[vertex] = part_ids[0]
+        return
+
+    half = len(part_ids) // 2
+    left_ids, right_ids = part_ids[:half], part_ids[half:]
+    left_capacity = sum(capacities[part] for part in left_ids)
+    total_capacity = left_capacity + sum(capacities[part] for part in right_ids)
+    fraction = left_capacity / total_capacity if total_capacity else 0.5
+
+    # build the sub-graph
+    local = {vertex: position for position, vertex in enumerate(members)}
+    sub_adjacency = []
+    sub_fixed = []
+    for vertex in members:
+        sub_adjacency.append({local[neighbor]: weight for neighbor, weight in adjacency[vertex].items() if neighbor in local})
+        part = parts[vertex]
+        if part is None:
+            sub_fixed.append(None)
+        else:
+            sub_fixed.append(0 if part in left_ids else 1)
+    graph = _Graph([weights[vertex] for vertex in members], sub_adjacency, sub_fixed)
+
+    sides = _multilevelBisection(graph, fraction, rng)
+    left = [vertex for vertex, side in zip(members, sides) if side == 0]
+    right = [vertex for vertex, side in zip(members, sides) if side == 1]
+    _recursiveBisection(left, weights, adjacency, parts, left_ids, capacities, assignment, rng)
+    _recursiveBisection(right, weights, adjacency, parts, right_ids, capacities, assignment, rng)
+
+
+def _multilevelBisection(graph, fraction, rng):
+    """
+    Bisects a graph: coarsening, initial bisection and refinement.
+
+    :param graph: _Graph instance
+    :param fraction: target fraction of the weight on side 0
+    :param rng: random generator
+
+    :returns: list of sides (0 or 1)
+    """
+
+    total = sum(graph.weights)
+    target = total * fraction
+    tolerance = max(max(graph.weights), total * IMBALANCE)
+
+    # coarsening
+    levels = []
+    current = graph
+    while len(current) > COARSEST_SIZE:
+        coarse, mapping = _coarsen(current, rng)
+        if len(coarse) > 0.9 * len(current):
+            # matching doesn't shrink the graph anymore
+            break
+        levels.append((current, mapping))
+        current = coarse
+
+    # initial bisection of the coarsest graph
+    best = None
+    for _ in range(INITIAL_TRIES):
+        sides = _growBisection(current, target, rng)
+        _refine(current, sides, target, tolerance)
+        score = (_cut(current, sides), abs(_sideWeight(current, sides) - target))
+        if best is None or score < best[0]:
+            best = (score, sides)
+    sides = best[1]
+
+    # uncoarsening and refinement
+    for finer, mapping in reversed(levels):
+        sides = [sides[mapping[vertex]] for vertex in range(len(finer))]
+        _refine(finer, sides, target, tolerance)
+    return sides
+
+
+def _coarsen(graph, rng):
+    """
+    Coarsens a graph by merging vertices along the heaviest edges.
+
+    :param graph: _Graph instance
+    :param rng: random generator
+
+    :returns: (coarse _Graph instance, mapping fine vertex -> coarse vertex) tuple
+    """
+
+    order = list(range(len(graph)))
+    rng.shuffle(order)
+    mapping = [None] * len(graph)
+    weights = []
+    fixed = []
+    for vertex in order:
+        if mapping[vertex] is not None:
+            continue
+        match = None
+        match_weight = 0
+        for neighbor, weight in graph.adjacency[vertex].items():
+            if mapping[neighbor] is not None or weight <= match_weight:
+                continue
+            if graph.fixed[vertex] is not None and graph.fixed[neighbor] is not None and graph.fixed[vertex] != graph.fixed[neighbor]:
+                continue
+            match = neighbor
+            match_weight = weight
+        coarse_vertex = len(weights)
+        mapping[vertex] = coarse_vertex
+        weights.append(graph.weights[vertex])
+        fixed.append(graph.fixed[vertex])
+        if match is not None:
+            mapping[match] = coarse_vertex
+            weights[coarse_vertex] += graph.weights[match]
+            if fixed[coarse_vertex] is None:
+                fixed[coarse_vertex] = graph.fixed[match]
+
+    adjacency = [{} for _ in weights]
+    for vertex, neighbors in enumerate(graph.adjacency):
+        source = mapping[vertex]
+        for neighbor, weight in neighbors.items():
+            destination = mapping[neighbor]
+            if source != destination:
+                adjacency[source][destination] = adjacency[source].get(destination, 0) + weight
+    return _Graph(weights, adjacency, fixed), mapping
+
+
+def _growBisection(graph, target, rng):
+    """
+    Initial bisection: grows side 0 from a random vertex, always adding
+    the vertex most connected to it, until it reaches its target weight.
+
+    :param graph: _Graph instance
+    :param target: target weight of side 0
+    :param rng: random generator
+
+    :returns: list of sides
+    """
+
+    sides = [1] * len(graph)
+    weight = 0
+    free = set()
+    for vertex in range(len(graph)):
+        if graph.fixed[vertex] == 0:
+            sides[vertex] = 0
+            weight += graph.weights[vertex]
+        elif graph.fixed[vertex] is None:
+            free.add(vertex)
+
+    # connectivity of each free vertex to side 0
+    connectivity = {vertex: 0 for vertex in free}
+    for vertex in range(len(graph)):
+        if sides[vertex] == 0:
+            for neighbor, edge_weight in graph.adjacency[vertex].items():
+                if neighbor in connectivity:
+                    connectivity[neighbor] += edge_weight
+
+    while free and weight < target:
+        best_gain = max(connectivity[vertex] for vertex in free)
+        candidates = [vertex for vertex in free if connectivity[vertex] == best_gain]
+        vertex = rng.choice(sorted(candidates))
+        if weight + graph.weights[vertex] - target > target - weight:
+            # adding this vertex would overshoot more than stopping here
+            break
+        free.discard(vertex)
+        sides[vertex] = 0
+        weight += graph.weights[vertex]
+        for neighbor, edge_weight in graph.adjacency[vertex].items():
+            if neighbor in free:
+                connectivity[neighbor] += edge_weight
+    return sides
+
+
+def _sideWeight(graph, sides):
+
+    return sum(weight for weight, side in zip(graph.weights, sides) if side == 0)
+
+
+def _cut(graph, sides):
+
+    cut = 0
+    for vertex, neighbors in enumerate(graph.adjacency):
+        for neighbor, weight in neighbors.items():
+            if vertex < neighbor and sides[vertex] != sides[neighbor]:
+                cut += weight
+    return cut
+
+
+def _refine(graph, sides, target, tolerance):
+    """
+    Kernighan-Lin / Fiduccia-Mattheyses refinement: moves vertices one
+    at a time to the other side, highest gain first, each vertex at most
+    once per pass, then keeps the best prefix of moves.
+
+    :param graph: _Graph instance
+    :param sides: list of sides, updated in place
+    :param target: target weight of side 0
+    :param tolerance: allowed deviation from the target weight
+    """
+
+    movable = [vertex for vertex in range(len(graph)) if graph.fixed[vertex] is None]
+    for _ in range(REFINEMENT_PASSES):
+        weight = _sideWeight(graph, sides)
+        gains = {}
+        for vertex in movable:
+            gain = 0
+            for neighbor, edge_weight in graph.adjacency[vertex].items():
+                gain += edge_weight if sides[neighbor] != sides[vertex] else -edge_weight
+            gains[vertex] = gain
+
+        def score(cut_delta, side_weight):
+            # balance violations are worse than any cut
+            excess = max(0, abs(side_weight - target) - tolerance)
+            return (excess, -cut_delta)
+
+        moves = []
+        cut_delta = 0
+        best_score = score(0, weight)
+        best_length = 0
+        while gains:
+            candidate = None
+            for vertex, gain in gains.items():
+                delta = graph.weights[vertex] if sides[vertex] == 1 else -graph.weights[vertex]
+                new_weight = weight + delta
+                if abs(new_weight - target) > tolerance and abs(new_weight - target) >= abs(weight - target):
+                    continue
+                if candidate is None or gain > candidate[1]:
+                    candidate = (vertex, gain, new_weight)
+            if candidate is None:
+                break
+            vertex, gain, weight = candidate
+            del gains[vertex]
+            cut_delta += gain
+            sides[vertex] = 1 - sides[vertex]
+            moves.append(vertex)
+            for neighbor, edge_weight in graph.adjacency[vertex].items():
+                if neighbor in gains:
+                    gains[neighbor] += -2 * edge_weight if sides[neighbor] == sides[vertex] else 2 * edge_weight
+            current_score = score(cut_delta, weight)
+            if current_score < best_score:
+                best_score = current_score
+                best_length = len(moves)
+
+        # roll back the moves after the best prefix
+        for vertex in moves[best_length:]:
+            sides[vertex] = 1 - sides[vertex]
+        if best_length == 0:
+            break
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Graphics scene where items are drawn.
+Keeps a registry of node and link items indexed by their identifiers.
+"""
+
+from collections import OrderedDict
+
+from .qt import QtGui
+from . import level_of_detail
+from .items.node_item import NodeItem
+from .items.link_item import LinkItem
+from .items.shape_item import ShapeItem
+from .items.image_item import ImageItem
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class GraphicsScene(QtGui.QGraphicsScene):
+    """
+    Graphics scene.
+
+    :param parent: parent widget
+    """
+
+    def __init__(self, parent=None):
+
+        QtGui.QGraphicsScene.__init__(self, parent)
+        self._node_items = OrderedDict()
+        self._link_items = OrderedDict()
+        self._level_of_detail = level_of_detail.FULL
+
+    def addItem(self, item):
+        """
+        Adds an item to the scene and registers
+        node and link items.
+
+        :param item: QGraphicsItem instance
+        """
+
+        QtGui.QGraphicsScene.addItem(self, item)
+        if isinstance(item, NodeItem):
+            self._node_items[item.node().id()] = item
+        elif isinstance(item, LinkItem) and item.link() is not None:
+            self._link_items[item.link().id()] = item
+        elif isinstance(item, (ShapeItem, ImageItem)):
+            # the item may have been cached at another level before being removed
+            level_of_detail.applyItemCache(item, self._level_of_detail)
+
+    def removeItem(self, item):
+        """
+        Removes an item from the scene and unregisters
+        node and link items.
+
+        :param item: QGraphicsItem instance
+        """
+
+        if isinstance(item, NodeItem):
+            if self._node_items.get(item.node().id()) is item:
+                del self._node_items[item.node().id()]
+        elif isinstance(item, LinkItem) and item.link() is not None:
+            if self._link_items.get(item.link().id()) is item:
+                del self._link_items[item.link().id()]
+        QtGui.QGraphicsScene.removeItem(self, item)
+
+    def clear(self):
+        """
+        Removes all the items from the scene.
+        """
+
+        self._node_items.clear()
+        self._link_items.clear()
+        QtGui.QGraphicsScene.clear(self)
+
+    def nodeItem(self, node_id):
+        """
+        Lookups for a node item using the node identifier.
+
+        :param node_id: node identifier
+
+        :returns: NodeItem instance or None
+        """
+
+        return self._node_items.get(node_id)
+
+    def linkItem(self, link_id):
+        """
+        Lookups for a link item using the link identifier.
+
+        :param link_id: link identifier
+
+        :returns: LinkItem instance or None
+        """
+
+        return self._link_items.get(link_id)
+
+    def nodeItems(self):
+        """
+        Returns all the node items on this scene.
+
+        :returns: list of NodeItem instances
+        """
+
+        return list(self._node_items.values())
+
+    def linkItems(self):
+        """
+        Returns all the link items on this scene.
+
+        :returns: list of LinkItem instances
+        """
+
+        return list(self._link_items.values())
+
+    def levelOfDetail(self):
+        """
+        Returns the level of detail the items are drawn with.
+
+        :returns: level of detail (see level_of_detail module)
+        """
+
+        return self._level_of_detail
+
+    def setLevelOfDetail(self, level):
+        """
+        Sets the level of detail the items are drawn with,
+        caching the shapes and images in low resolution
+        pixmaps below the full level of detail.
+
+        :param level: level of detail (see level_of_detail module)
+        """
+
+        if level == self._level_of_detail:
+            return
+        self._level_of_detail = level
+        for item in self.items():
+            if isinstance(item, (ShapeItem, ImageItem)):
+                level_of_detail.applyItemCache(item, level)
@@ -25,8 +25,8 @@ import pickle
 
 from .qt import QtCore, QtGui, QtNetwork
 from .servers import Servers
+from .graphics_scene import GraphicsScene
 from .items.node_item import NodeItem
-from .dialogs.node_configurator_dialog import NodeConfiguratorDialog
 from .link import Link
 from .node import Node
 from .modules import MODULES
@@ -34,11 +34,9 @@ from .modules.builtin.cloud import Cloud
 from .modules.module_error import ModuleError
 from .settings import GRAPHICS_VIEW_SETTINGS, GRAPHICS_VIEW_SETTING_TYPES
 from .topology import Topology
+from .symbol_cache import SymbolCache
+from . import level_of_detail
 from .ports.port import Port
-from .dialogs.style_editor_dialog import StyleEditorDialog
-from .dialogs.text_editor_dialog import TextEditorDialog
-from .dialogs.symbol_selection_dialog import SymbolSelectionDialog
-from .dialogs.idlepc_dialog import IdlePCDialog
 from .utils.connect_to_server import ConnectToServer
 
 # link items
@@ -55,6 +53,14 @@ from .items.image_item import ImageItem
 
 log = logging.getLogger(__name__)
 
+VIEWPORT_UPDATE_MODES = {"smart": QtGui.QGraphicsView.SmartViewportUpdate,
+                         "minimal": QtGui.QGraphicsView.MinimalViewportUpdate,
+                         "bounding_rect": QtGui.QGraphicsView.BoundingRectViewportUpdate,
+                         "full": QtGui.QGraphicsView.FullViewportUpdate}
+
+SCENE_INDEX_METHODS = {"bsp": QtGui.QGraphicsScene.BspTreeIndex,
+                       "none": QtGui.QGraphicsScene.NoIndex}
+
 
 class GraphicsView(QtGui.QGraphicsView):
     """
@@ -83,7 +89,7 @@ class GraphicsView(QtGui.QGraphicsView):
         self._topology = Topology.instance()
 
         # set the scene
-        scene = QtGui.QGraphicsScene(parent=self)
+        scene = GraphicsScene(parent=self)
         width = self._settings["scene_width"]
         height = self._settings["scene_height"]
         scene.setSceneRect(-(width / 2), -(height / 2), width, height)
@@ -96,6 +102,15 @@ class GraphicsView(QtGui.QGraphicsView):
         self.setTransformationAnchor(QtGui.QGraphicsView.AnchorUnderMouse)
         self.setResizeAnchor(QtGui.QGraphicsView.AnchorViewCenter)
 
+        # level of detail and frames per second counter
+        self._level_of_detail = level_of_detail.FULL
+        self._frames = 0
+        self._fps = 0
+        self._fps_timer = QtCore.QTimer(self)
+        self._fps_timer.setInterval(1000)
+        self._fps_timer.timeout.connect(self._fpsTimerSlot)
+        self._applyRenderingSettings()
+
         self._local_addresses = ['0.0.0.0', '127.0.0.1', 'localhost', '::1', '0:0:0:0:0:0:0:1', '::', QtNetwork.QHostInfo.localHostName()]
 
     def reset(self):
@@ -123,6 +138,7 @@ class GraphicsView(QtGui.QGraphicsView):
 
         # clear all objects on the scene
         self.scene().clear()
+        SymbolCache.instance().clear()
 
     def updateProjectFilesDir(self, path):
         """
@@ -163,6 +179,7 @@ class GraphicsView(QtGui.QGraphicsView):
         for name, value in GRAPHICS_VIEW_SETTINGS.items():
             self._settings[name] = settings.value(name, value, type=GRAPHICS_VIEW_SETTING_TYPES[name])
         settings.endGroup()
+        SymbolCache.instance().setPixmapsEnabled(self._settings["cache_symbol_pixmaps"])
 
     def settings(self):
         """
@@ -180,14 +197,99 @@ class GraphicsView(QtGui.QGraphicsView):
         :param new_settings: settings dictionary
         """
 
+        if "cache_symbol_pixmaps" in new_settings:
+            SymbolCache.instance().setPixmapsEnabled(new_settings["cache_symbol_pixmaps"])
+
         # save the settings
         self._settings.update(new_settings)
+        self._applyRenderingSettings()
         settings = QtCore.QSettings()
         settings.beginGroup(self.__class__.__name__)
         for name, value in self._settings.items():
             settings.setValue(name, value)
         settings.endGroup()
 
+    def _applyRenderingSettings(self):
+        """
+        Applies the settings related to the rendering performance.
+        """
+
+        mode = self._settings["viewport_update_mode"]
+        if mode not in VIEWPORT_UPDATE_MODES:
+            log.warning("unknown viewport update mode {}".format(mode))
+            mode = GRAPHICS_VIEW_SETTINGS["viewport_update_mode"]
+        self.setViewportUpdateMode(VIEWPORT_UPDATE_MODES[mode])
+
+        index = self._settings["scene_index"]
+        if index not in SCENE_INDEX_METHODS:
+            log.warning("unknown scene index method {}".format(index))
+            index = GRAPHICS_VIEW_SETTINGS["scene_index"]
+        self.scene().setItemIndexMethod(SCENE_INDEX_METHODS[index])
+
+        level_of_detail.setEnabled(self._settings["level_of_detail"])
+        self.updateLevelOfDetail()
+
+        if self._settings["show_fps"]:
+            self._frames = 0
+            self._fps_timer.start()
+        elif self._fps_timer.isActive():
+            self._fps_timer.stop()
+            self._main_window.uiStatusBar.clearMessage()
+
+    def levelOfDetail(self):
+        """
+        Returns the level of detail for the current view scale.
+
+        :returns: level of detail (see level_of_detail module)
+        """
+
+        return self._level_of_detail
+
+    def updateLevelOfDetail(self):
+        """
+        Updates the level of detail after the view scale changed:
+        shapes and images are cached in low resolution pixmaps
+        when the view is zoomed out.
+        """
+
+        scale = QtGui.QStyleOptionGraphicsItem.levelOfDetailFromTransform(self.transform())
+        level = level_of_detail.levelForScale(scale)
+        if level == self._level_of_detail:
+            return
+        log.debug("level of detail changed from {} to {}".format(self._level_of_detail, level))
+        self._level_of_detail = level
+        self.scene().setLevelOfDetail(level)
+
+    def fps(self):
+        """
+        Returns the number of frames drawn during the last second,
+        only counted when the FPS counter is shown.
+
+        :returns: integer
+        """
+
+        return self._fps
+
+    def _fpsTimerSlot(self):
+        """
+        Shows the number of frames drawn during the last second.
+        """
+
+        self._fps = self._frames
+        self._frames = 0
+        self._main_window.uiStatusBar.showMessage("{} FPS ({} items)".format(self._fps, len(self.scene().items())))
+
+    def paintEvent(self, event):
+        """
+        Counts the frames when the FPS counter is shown.
+
+        :param event: QPaintEvent instance
+        """
+
+        QtGui.QGraphicsView.paintEvent(self, event)
+        if self._fps_timer.isActive():
+            self._frames += 1
+
     def addingLinkSlot(self, enabled):
         """
         Slot to receive events from MainWindow
@@ -271,6 +373,8 @@ class GraphicsView(QtGui.QGraphicsView):
         :param source_port: source Port instance
         :param destination_node: destination Node instance
         :param destination_port: destination Port instance
+
+        :returns: Link instance
         """
 
         link = Link(source_node, source_port, destination_node, destination_port)
@@ -280,6 +384,7 @@ class GraphicsView(QtGui.QGraphicsView):
         link.add_link_signal.connect(self.addLinkSlot)
         link.delete_link_signal.connect(self.deleteLinkSlot)
         self._topology.addLink(link)
+        return link
 
     def addLinkSlot(self, link_id):
         """
@@ -290,20 +395,12 @@ class GraphicsView(QtGui.QGraphicsView):
         """
 
         link = self._topology.getLink(link_id)
-        source_item = None
-        destination_item = None
         source_port = link.sourcePort()
         destination_port = link.destinationPort()
 
         # find the correct source and destination node items
-        for item in self.scene().items():
-            if isinstance(item, NodeItem):
-                if item.node().id() == link.sourceNode().id():
-                    source_item = item
-                if item.node().id() == link.destinationNode().id():
-                    destination_item = item
-            if source_item and destination_item:
-                break
+        source_item = self.scene().nodeItem(link.sourceNode().id())
+        destination_item = self.scene().nodeItem(link.destinationNode().id())
 
         if not source_item or not destination_item:
             print("Could not find a source or destination item for the link!")
@@ -442,9 +539,9 @@ class GraphicsView(QtGui.QGraphicsView):
         if item and isinstance(item, LinkItem):
             is_not_link = False
         else:
-            for it in self.scene().items():
-                if isinstance(it, LinkItem):
-                    it.setHovered(False)
+            for link_item in self.scene().linkItems():
+                if link_item.isHovered():
+                    link_item.setHovered(False)
 
         if (event.buttons() == QtCore.Qt.LeftButton and event.modifiers() == QtCore.Qt.ShiftModifier) or event.buttons() == QtCore.Qt.MidButton:
             # checks to see if either the middle mouse is pressed
@@ -550,6 +647,7 @@ class GraphicsView(QtGui.QGraphicsView):
         if (factor < 0.10 or factor > 10):
             return
         self.scale(scale_factor, scale_factor)
+        self.updateLevelOfDetail()
 
     def keyPressEvent(self, event):
         """
@@ -622,6 +720,7 @@ class GraphicsView(QtGui.QGraphicsView):
 
         if not items:
             items = self.scene().selectedItems()
+        from .dialogs.node_configurator_dialog import NodeConfiguratorDialog
         node_configurator = NodeConfiguratorDialog(items, self._main_window)
         node_configurator.setModal(True)
         node_configurator.show()
@@ -862,6 +961,7 @@ class GraphicsView(QtGui.QGraphicsView):
             if isinstance(item, NodeItem) and item.node().initialized():
                 items.append(item)
         if items:
+            from .dialogs.symbol_selection_dialog import SymbolSelectionDialog
             dialog = SymbolSelectionDialog(self, items)
             dialog.show()
             dialog.exec_()
@@ -1006,6 +1106,7 @@ class GraphicsView(QtGui.QGraphicsView):
         router.server_error_signal.disconnect(self._showIdlepcError)
         idlepcs = router.idlepcs()
         if idlepcs and idlepcs[0] != "0x0":
+            from .dialogs.idlepc_dialog import IdlePCDialog
             dialog = IdlePCDialog(router, idlepcs, parent=self)
             dialog.show()
             dialog.exec_()
@@ -1047,6 +1148,7 @@ class GraphicsView(QtGui.QGraphicsView):
             if isinstance(item, ShapeItem):
                 items.append(item)
         if items:
+            from .dialogs.style_editor_dialog import StyleEditorDialog
             style_dialog = StyleEditorDialog(self._main_window, items)
             style_dialog.show()
             style_dialog.exec_()
@@ -1062,6 +1164,7 @@ class GraphicsView(QtGui.QGraphicsView):
             if isinstance(item, NoteItem):
                 items.append(item)
         if items:
+            from .dialogs.text_editor_dialog import TextEditorDialog
             text_edit_dialog = TextEditorDialog(self._main_window, items)
             text_edit_dialog.show()
             text_edit_dialog.exec_()
@@ -1109,12 +1212,13 @@ class GraphicsView(QtGui.QGraphicsView):
                                                QtGui.QMessageBox.Yes, QtGui.QMessageBox.No)
             if reply == QtGui.QMessageBox.No:
                 return
-        for item in self.scene().selectedItems():
-            if isinstance(item, NodeItem):
-                item.node().delete()
-                self._topology.removeNode(item.node())
-            elif item.parentItem() is None:
-                item.delete()
+        with self._topology.batch():
+            for item in self.scene().selectedItems():
+                if isinstance(item, NodeItem):
+                    item.node().delete()
+                    self._topology.removeNode(item.node())
+                elif item.parentItem() is None:
+                    item.delete()
 
     def createNode(self, node_data, pos):
         """
@@ -1140,7 +1244,7 @@ class GraphicsView(QtGui.QGraphicsView):
                 raise ModuleError("Could not find any module for {}".format(node_class))
 
             if not "server" in node_data:
-                server = node_module.allocateServer(node_class)
+                server = node_module.allocateServer(node_class, node_name=node_data["name"])
             elif node_data["server"] == "local":
                 server = Servers.instance().localServer()
             elif node_data["server"] == "cloud":
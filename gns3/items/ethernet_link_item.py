@@ -21,6 +21,7 @@ Graphical representation of an Ethernet link for QGraphicsScene.
 
 from ..qt import QtCore, QtGui
 from .link_item import LinkItem
+from .. import level_of_detail
 from .note_item import NoteItem
 from ..ports.port import Port
 
@@ -106,7 +107,8 @@ class EthernetLinkItem(LinkItem):
         """
 
         QtGui.QGraphicsPathItem.paint(self, painter, option, widget)
-        if not self._adding_flag and self._settings["draw_link_status_points"]:
+        if not self._adding_flag and self._settings["draw_link_status_points"] and \
+           level_of_detail.levelOfDetail(painter) == level_of_detail.FULL:
 
             # points disappears if nodes are too close to each others.
             if self.length < 100:
@@ -24,6 +24,7 @@ import math
 import struct
 import sys
 from ..qt import QtCore, QtGui
+from ..link_adjust_scheduler import LinkAdjustScheduler
 
 
 class LinkItem(QtGui.QGraphicsPathItem):
@@ -104,8 +105,9 @@ class LinkItem(QtGui.QGraphicsPathItem):
 
         self._source_item.removeLink(self)
         self._destination_item.removeLink(self)
+        LinkAdjustScheduler.instance().cancel(self)
         self._link.deleteLink()
-        if self in self.scene().items():
+        if self.scene():
             self.scene().removeItem(self)
 
     def link(self):
@@ -338,6 +340,15 @@ class LinkItem(QtGui.QGraphicsPathItem):
         except OSError as e:
             QtGui.QMessageBox.critical(self._main_window, "Capture analyzer", "Cannot start the packet capture analyzer program: {}".format(e))
 
+    def isHovered(self):
+        """
+        Returns either the link is hovered or not.
+
+        :returns: boolean
+        """
+
+        return self._hovered
+
     def setHovered(self, value):
         """
         Sets the link as hovered or not.
@@ -20,6 +20,9 @@ Graphical representation of a node on the QGraphicsScene.
 """
 
 from ..qt import QtCore, QtGui, QtSvg
+from ..symbol_cache import SymbolCache, isRasterPainter
+from .. import level_of_detail
+from ..link_adjust_scheduler import LinkAdjustScheduler
 from .note_item import NoteItem
 
 
@@ -55,20 +58,15 @@ class NodeItem(QtSvg.QGraphicsSvgItem):
         self.setAcceptsHoverEvents(True)
         self.setZValue(1)
 
-        # create renderers using symbols paths/resources
-        if default_symbol:
-            self._default_renderer = QtSvg.QSvgRenderer(default_symbol)
-            if default_symbol != node.defaultSymbol():
-                self._default_renderer.setObjectName(default_symbol)
-        else:
-            self._default_renderer = QtSvg.QSvgRenderer(node.defaultSymbol())
-        if hover_symbol:
-            self._hover_renderer = QtSvg.QSvgRenderer(hover_symbol)
-            if hover_symbol != node.hoverSymbol():
-                self._hover_renderer.setObjectName(hover_symbol)
-        else:
-            self._hover_renderer = QtSvg.QSvgRenderer(node.hoverSymbol())
-        self.setSharedRenderer(self._default_renderer)
+        # get the renderers shared by all the items using the same symbols paths/resources
+        self._default_symbol = None
+        self._default_renderer = None
+        self._hover_symbol = None
+        self._hover_renderer = None
+        if not default_symbol or not self.setDefaultSymbol(default_symbol):
+            self.setDefaultSymbol(node.defaultSymbol())
+        if not hover_symbol or not self.setHoverSymbol(hover_symbol):
+            self.setHoverSymbol(node.hoverSymbol())
 
         # connect signals to know about some events
         # e.g. when the node has been started, stopped or suspended etc.
@@ -102,15 +100,34 @@ class NodeItem(QtSvg.QGraphicsSvgItem):
 
         return self._default_renderer
 
-    def setDefaultRenderer(self, default_renderer):
+    def defaultSymbol(self):
+        """
+        Returns the default symbol.
+
+        :return: symbol path or resource
         """
-        Sets new default QSvgRenderer.
 
-        :param default_renderer: QSvgRenderer instance
+        return self._default_symbol
+
+    def setDefaultSymbol(self, path):
         """
+        Sets a new default symbol.
 
-        self._default_renderer = default_renderer
-        self.setSharedRenderer(self._default_renderer)
+        :param path: symbol path or resource
+
+        :returns: False if the symbol is not valid (the symbol is not changed)
+        """
+
+        renderer = SymbolCache.instance().acquire(path)
+        if renderer is None:
+            return False
+        if self._default_symbol:
+            SymbolCache.instance().release(self._default_symbol)
+        self._default_symbol = path
+        self._default_renderer = renderer
+        if self._hover_renderer is None or not (self.isSelected() or self.isUnderMouse()):
+            self.setSharedRenderer(self._default_renderer)
+        return True
 
     def hoverRenderer(self):
         """
@@ -121,14 +138,48 @@ class NodeItem(QtSvg.QGraphicsSvgItem):
 
         return self._hover_renderer
 
-    def setHoverRenderer(self, hover_renderer):
+    def hoverSymbol(self):
+        """
+        Returns the hover symbol.
+
+        :return: symbol path or resource
         """
-        Sets new hover QSvgRenderer.
 
-        :param hover_renderer: QSvgRenderer instance
+        return self._hover_symbol
+
+    def setHoverSymbol(self, path):
+        """
+        Sets a new hover symbol.
+
+        :param path: symbol path or resource
+
+        :returns: False if the symbol is not valid (the symbol is not changed)
         """
 
-        self._hover_renderer = hover_renderer
+        renderer = SymbolCache.instance().acquire(path)
+        if renderer is None:
+            return False
+        if self._hover_symbol:
+            SymbolCache.instance().release(self._hover_symbol)
+        self._hover_symbol = path
+        self._hover_renderer = renderer
+        if self.isSelected() or self.isUnderMouse():
+            self.setSharedRenderer(self._hover_renderer)
+        return True
+
+    def releaseSymbols(self):
+        """
+        Releases the symbols used by this item so they
+        can be evicted from the symbol cache.
+        """
+
+        cache = SymbolCache.instance()
+        if self._default_symbol:
+            cache.release(self._default_symbol)
+            self._default_symbol = None
+        if self._hover_symbol:
+            cache.release(self._hover_symbol)
+            self._hover_symbol = None
 
     def setUnsavedState(self):
         """
@@ -224,6 +275,10 @@ class NodeItem(QtSvg.QGraphicsSvgItem):
         when a the node has been updated.
         """
 
+        from ..topology import Topology
+        if Topology.instance().defer(self.updatedSlot):
+            return
+
         if self._node_label:
             self._node_label.setPlainText(self._node.name())
         self.setUnsavedState()
@@ -249,7 +304,8 @@ class NodeItem(QtSvg.QGraphicsSvgItem):
         """
 
         self._node.removeAllocatedName()
-        if self in self.scene().items():
+        self.releaseSymbols()
+        if self.scene():
             self.scene().removeItem(self)
         self.setUnsavedState()
 
@@ -400,11 +456,13 @@ class NodeItem(QtSvg.QGraphicsSvgItem):
             else:
                 self.setSharedRenderer(self._default_renderer)
 
-        # adjust link item positions when this node is moving or has changed.
-        if change == QtSvg.QGraphicsSvgItem.ItemPositionChange or change == QtSvg.QGraphicsSvgItem.ItemPositionHasChanged:
+        # adjust link item positions once this node has moved, links are adjusted
+        # once per frame even if several of the nodes they connect are dragged.
+        if change == QtSvg.QGraphicsSvgItem.ItemPositionHasChanged:
             self.setUnsavedState()
+            scheduler = LinkAdjustScheduler.instance()
             for link in self._links:
-                link.adjust()
+                scheduler.schedule(link)
 
         return QtGui.QGraphicsItem.itemChange(self, change, value)
 
@@ -419,7 +477,22 @@ class NodeItem(QtSvg.QGraphicsSvgItem):
 
         # don't show the selection rectangle
         option.state = QtGui.QStyle.State_None
-        QtSvg.QGraphicsSvgItem.paint(self, painter, option, widget)
+        level = level_of_detail.levelOfDetail(painter)
+        if level == level_of_detail.MINIMAL:
+            # too small to see the symbol, draw a plain rectangle
+            painter.fillRect(self.boundingRect(), QtCore.Qt.red if self.isSelected() else QtCore.Qt.darkGray)
+            return
+
+        pixmap = None
+        symbol_cache = SymbolCache.instance()
+        transform = painter.worldTransform()
+        if (symbol_cache.pixmapsEnabled() or level == level_of_detail.REDUCED) and not transform.isRotating() and isRasterPainter(painter):
+            # draw the symbol rasterized for this zoom level
+            pixmap = symbol_cache.pixmap(self.renderer(), self.boundingRect().size(), abs(transform.m11()))
+        if pixmap:
+            painter.drawPixmap(self.boundingRect(), pixmap, QtCore.QRectF(pixmap.rect()))
+        else:
+            QtSvg.QGraphicsSvgItem.paint(self, painter, option, widget)
 
         if not self._initialized or self.show_layer:
             brect = self.boundingRect()
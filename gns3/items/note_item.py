@@ -20,6 +20,7 @@ Graphical representation of a note on the QGraphicsScene.
 """
 
 from ..qt import QtCore, QtGui
+from .. import level_of_detail
 
 
 class NoteItem(QtGui.QGraphicsTextItem):
@@ -152,6 +153,10 @@ class NoteItem(QtGui.QGraphicsTextItem):
         :param widget: QWidget instance
         """
 
+        if self.parentItem() and level_of_detail.levelOfDetail(painter) != level_of_detail.FULL:
+            # node and port labels are not readable at low zoom
+            return
+
         QtGui.QGraphicsTextItem.paint(self, painter, option, widget)
 
         if self.show_layer is False or self.parentItem():
@@ -22,6 +22,7 @@ Graphical representation of a Serial link on the QGraphicsScene.
 import math
 from ..qt import QtCore, QtGui
 from .link_item import LinkItem
+from .. import level_of_detail
 from .note_item import NoteItem
 from ..ports.port import Port
 
@@ -107,7 +108,8 @@ class SerialLinkItem(LinkItem):
 
         QtGui.QGraphicsPathItem.paint(self, painter, option, widget)
 
-        if not self._adding_flag and self._settings["draw_link_status_points"]:
+        if not self._adding_flag and self._settings["draw_link_status_points"] and \
+           level_of_detail.levelOfDetail(painter) == level_of_detail.FULL:
 
             # points disappears if nodes are too close to each others.
             if self.length < 80:
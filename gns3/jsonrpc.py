@@ -21,7 +21,117 @@ http://www.jsonrpc.org/specification
 """
 
 import json
-import uuid
+import itertools
+
+import logging
+log = logging.getLogger(__name__)
+
+# request identifiers are monotonically increasing integers
+_request_ids = itertools.count(1)
+
+
+def _orjsonDumps(obj):
+
+    import orjson
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+def _orjsonLoads(data):
+
+    import orjson
+    return orjson.loads(data)
+
+
+def _ujsonDumps(obj):
+
+    import ujson
+    return ujson.dumps(obj, ensure_ascii=False)
+
+
+def _ujsonLoads(data):
+
+    import ujson
+    return ujson.loads(data)
+
+
+def _simplejsonDumps(obj):
+
+    import simplejson
+    return simplejson.dumps(obj)
+
+
+def _simplejsonLoads(data):
+
+    import simplejson
+    return simplejson.loads(data)
+
+
+# JSON codecs: name -> (module, dumps, loads)
+JSON_CODECS = {
+    "json": ("json", json.dumps, json.loads),
+    "orjson": ("orjson", _orjsonDumps, _orjsonLoads),
+    "ujson": ("ujson", _ujsonDumps, _ujsonLoads),
+    "simplejson": ("simplejson", _simplejsonDumps, _simplejsonLoads),
+}
+
+# codecs tried, in order, when the "auto" codec is selected
+AUTO_JSON_CODECS = ("orjson", "ujson", "simplejson", "json")
+
+_codec = "json"
+dumps = json.dumps
+loads = json.loads
+
+
+def availableJSONCodecs():
+    """
+    Returns the JSON codecs that can be used.
+
+    :returns: list of codec names
+    """
+
+    codecs = []
+    for name, (module, _, _) in sorted(JSON_CODECS.items()):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        codecs.append(name)
+    return codecs
+
+
+def setJSONCodec(name):
+    """
+    Selects the codec used to encode and decode JSON-RPC messages.
+    Falls back to the standard json module if the codec is not available.
+
+    :param name: codec name or "auto" to select the fastest available one
+
+    :returns: name of the selected codec
+    """
+
+    global _codec, dumps, loads
+
+    available = availableJSONCodecs()
+    if name == "auto":
+        name = next(codec for codec in AUTO_JSON_CODECS if codec in available)
+    elif name not in available:
+        log.warning("JSON codec {} is not available, using json instead".format(name))
+        name = "json"
+
+    _codec = name
+    _, dumps, loads = JSON_CODECS[name]
+    log.info("using JSON codec {}".format(name))
+    return name
+
+
+def jsonCodec():
+    """
+    Returns the name of the codec used to encode and decode JSON-RPC messages.
+
+    :returns: codec name
+    """
+
+    return _codec
 
 
 class JSONRPCObject(object):
@@ -30,14 +140,17 @@ class JSONRPCObject(object):
     notifications and errors.
     """
 
-    def __init__(self):
-        return JSONRPCEncoder().default(self)
+    __slots__ = ()
 
     def __str__(self, *args, **kwargs):
-        return json.dumps(self, cls=JSONRPCEncoder)
+        return dumps(self())
 
     def __call__(self):
-        return JSONRPCEncoder().default(self)
+        """
+        Returns a Python dictionary corresponding to the JSON-RPC message.
+        """
+
+        raise NotImplementedError()
 
 
 class JSONRPCEncoder(json.JSONEncoder):
@@ -51,77 +164,91 @@ class JSONRPCEncoder(json.JSONEncoder):
         """
 
         if isinstance(obj, JSONRPCObject):
-            message = {"jsonrpc": 2.0}
-            for field in dir(obj):
-                if not field.startswith('_'):
-                    value = getattr(obj, field)
-                    message[field] = value
-            return message
+            return obj()
         return json.JSONEncoder.default(self, obj)
 
 
-class JSONRPCInvalidRequest(JSONRPCObject):
+class JSONRPCError(JSONRPCObject):
+    """
+    Base error response.
+
+    :param code: JSON-RPC error code
+    :param message: JSON-RPC error message
+    :param request_id: JSON-RPC identifier (optional)
+    """
+
+    __slots__ = ("id", "error")
+
+    def __init__(self, code, message, request_id=None):
+        self.id = request_id
+        self.error = {"code": code, "message": message}
+
+    def __call__(self):
+        return {"jsonrpc": 2.0, "id": self.id, "error": self.error}
+
+
+class JSONRPCInvalidRequest(JSONRPCError):
     """
     Error response for an invalid request.
     """
 
+    __slots__ = ()
+
     def __init__(self):
-        JSONRPCObject.__init__(self)
-        self.id = None
-        self.error = {"code": -32600, "message": "Invalid Request"}
+        JSONRPCError.__init__(self, -32600, "Invalid Request")
 
 
-class JSONRPCMethodNotFound(JSONRPCObject):
+class JSONRPCMethodNotFound(JSONRPCError):
     """
     Error response for an method not found.
 
     :param request_id: JSON-RPC identifier
     """
 
+    __slots__ = ()
+
     def __init__(self, request_id):
-        JSONRPCObject.__init__(self)
-        self.id = request_id
-        self.error = {"code": -32601, "message": "Method not found"}
+        JSONRPCError.__init__(self, -32601, "Method not found", request_id)
 
 
-class JSONRPCInvalidParams(JSONRPCObject):
+class JSONRPCInvalidParams(JSONRPCError):
     """
     Error response for invalid parameters.
 
     :param request_id: JSON-RPC identifier
     """
 
+    __slots__ = ()
+
     def __init__(self, request_id):
-        JSONRPCObject.__init__(self)
-        self.id = request_id
-        self.error = {"code": -32602, "message": "Invalid params"}
+        JSONRPCError.__init__(self, -32602, "Invalid params", request_id)
 
 
-class JSONRPCInternalError(JSONRPCObject):
+class JSONRPCInternalError(JSONRPCError):
     """
     Error response for an internal error.
 
     :param request_id: JSON-RPC identifier (optional)
     """
 
+    __slots__ = ()
+
     def __init__(self, request_id=None):
-        JSONRPCObject.__init__(self)
-        self.id = request_id
-        self.error = {"code": -32603, "message": "Internal error"}
+        JSONRPCError.__init__(self, -32603, "Internal error", request_id)
 
 
-class JSONRPCParseError(JSONRPCObject):
+class JSONRPCParseError(JSONRPCError):
     """
     Error response for parsing error.
     """
 
+    __slots__ = ()
+
     def __init__(self):
-        JSONRPCObject.__init__(self)
-        self.id = None
-        self.error = {"code": -32700, "message": "Parse error"}
+        JSONRPCError.__init__(self, -32700, "Parse error")
 
 
-class JSONRPCCustomError(JSONRPCObject):
+class JSONRPCCustomError(JSONRPCError):
     """
     Error response for an custom error.
 
@@ -130,10 +257,7 @@ class JSONRPCCustomError(JSONRPCObject):
     :param request_id: JSON-RPC identifier (optional)
     """
 
-    def __init__(self, code, message, request_id=None):
-        JSONRPCObject.__init__(self)
-        self.id = request_id
-        self.error = {"code": code, "message": message}
+    __slots__ = ()
 
 
 class JSONRPCResponse(JSONRPCObject):
@@ -144,11 +268,15 @@ class JSONRPCResponse(JSONRPCObject):
     :param request_id: JSON-RPC identifier
     """
 
+    __slots__ = ("id", "result")
+
     def __init__(self, result, request_id):
-        JSONRPCObject.__init__(self)
         self.id = request_id
         self.result = result
 
+    def __call__(self):
+        return {"jsonrpc": 2.0, "id": self.id, "result": self.result}
+
 
 class JSONRPCRequest(JSONRPCObject):
     """
@@ -159,14 +287,19 @@ class JSONRPCRequest(JSONRPCObject):
     :param request_id: JSON-RPC identifier (generated by default)
     """
 
+    __slots__ = ("id", "method", "params")
+
     def __init__(self, method, params=None, request_id=None):
-        JSONRPCObject.__init__(self)
-        if request_id == None:
-            request_id = str(uuid.uuid4())
+        if request_id is None:
+            request_id = next(_request_ids)
         self.id = request_id
         self.method = method
-        if params:
-            self.params = params
+        self.params = params
+
+    def __call__(self):
+        if self.params:
+            return {"jsonrpc": 2.0, "id": self.id, "method": self.method, "params": self.params}
+        return {"jsonrpc": 2.0, "id": self.id, "method": self.method}
 
 
 class JSONRPCNotification(JSONRPCObject):
@@ -177,8 +310,51 @@ class JSONRPCNotification(JSONRPCObject):
     :param params: JSON-RPC params for the corresponding method (optional)
     """
 
+    __slots__ = ("method", "params")
+
     def __init__(self, method, params=None):
-        JSONRPCObject.__init__(self)
         self.method = method
-        if params:
-            self.params = params
+        self.params = params
+
+    def __call__(self):
+        if self.params:
+            return {"jsonrpc": 2.0, "method": self.method, "params": self.params}
+        return {"jsonrpc": 2.0, "method": self.method}
+
+
+class JSONRPCBatch(object):
+    """
+    JSON-RPC batch: several requests and notifications
+    sent to the server in a single message.
+
+    :param messages: list of JSONRPCRequest or JSONRPCNotification instances (optional)
+    """
+
+    __slots__ = ("_messages",)
+
+    def __init__(self, messages=None):
+        self._messages = []
+        if messages:
+            for message in messages:
+                self.add(message)
+
+    def add(self, message):
+        """
+        Adds a request or a notification to this batch.
+
+        :param message: JSONRPCRequest or JSONRPCNotification instance
+
+        :returns: the added message
+        """
+
+        self._messages.append(message)
+        return message
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def __str__(self, *args, **kwargs):
+        return dumps([message() for message in self._messages])
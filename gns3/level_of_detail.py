@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Level of detail used to draw the items, depending on the view scale:
+the less the items are zoomed in, the less details are drawn.
+"""
+
+from .qt import QtCore, QtGui
+
+# levels of detail
+MINIMAL = 0  # nodes are plain rectangles
+REDUCED = 1  # nodes are rasterized symbols, no labels or status points
+FULL = 2  # everything is drawn
+
+# scale factors under which the level of detail drops
+REDUCED_SCALE = 0.5
+MINIMAL_SCALE = 0.25
+
+# size (in pixels) of the pixmaps caching the shapes and images at low zoom
+LOW_RESOLUTION_CACHE_SIZE = 256
+
+_enabled = True
+
+
+def setEnabled(enabled):
+    """
+    Enables or disables the levels of detail, everything
+    is drawn at full detail when disabled.
+
+    :param enabled: boolean
+    """
+
+    global _enabled
+    _enabled = enabled
+
+
+def isEnabled():
+    """
+    Returns either the levels of detail are enabled.
+
+    :returns: boolean
+    """
+
+    return _enabled
+
+
+def levelForScale(scale):
+    """
+    Returns the level of detail for a view scale.
+
+    :param scale: scale factor (1 is no zoom)
+
+    :returns: MINIMAL, REDUCED or FULL
+    """
+
+    if not _enabled or scale >= REDUCED_SCALE:
+        return FULL
+    if scale >= MINIMAL_SCALE:
+        return REDUCED
+    return MINIMAL
+
+
+def levelOfDetail(painter):
+    """
+    Returns the level of detail to draw an item with.
+
+    :param painter: QPainter instance passed to paint()
+
+    :returns: MINIMAL, REDUCED or FULL
+    """
+
+    if not _enabled:
+        return FULL
+    return levelForScale(QtGui.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()))
+
+
+def applyItemCache(item, level):
+    """
+    Caches an item (shape or image) in a low resolution pixmap
+    below the full level of detail, so it's not redrawn when panning.
+
+    :param item: QGraphicsItem instance
+    :param level: level of detail
+    """
+
+    if level == FULL:
+        item.setCacheMode(QtGui.QGraphicsItem.NoCache)
+    else:
+        item.setCacheMode(QtGui.QGraphicsItem.ItemCoordinateCache,
+                          QtCore.QSize(LOW_RESOLUTION_CACHE_SIZE, LOW_RESOLUTION_CACHE_SIZE))
@@ -39,9 +39,10 @@ class Link(QtCore.QObject):
     """
 
     # signals used to let the GUI view know about link
-    # additions and deletions.
+    # additions, deletions and cancellations.
     add_link_signal = QtCore.Signal(int)
     delete_link_signal = QtCore.Signal(int)
+    cancel_link_signal = QtCore.Signal(int)
 
     _instance_count = 1
 
@@ -372,6 +373,9 @@ class Link(QtCore.QObject):
         self._source_nio_active = False
         self._destination_nio_active = False
 
+        # let the GUI know this link could not be created
+        self.cancel_link_signal.emit(self._id)
+
     def dump(self):
         """
         Returns a representation of this link.
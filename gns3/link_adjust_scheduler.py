@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Coalesces the link geometry updates: links attached to moving nodes
+are marked dirty and adjusted once when control returns to the event
+loop, before the next frame is drawn.
+"""
+
+from collections import OrderedDict
+
+from .qt import QtCore
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class LinkAdjustScheduler(QtCore.QObject):
+    """
+    Schedules the adjustment of link items.
+    """
+
+    def __init__(self):
+
+        QtCore.QObject.__init__(self)
+        self._dirty = OrderedDict()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+        self._scheduled = 0
+        self._adjusted = 0
+
+    def schedule(self, link_item):
+        """
+        Marks a link item as dirty, it will be adjusted
+        only once whatever the number of calls.
+
+        :param link_item: LinkItem instance
+        """
+
+        self._scheduled += 1
+        self._dirty[id(link_item)] = link_item
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self, link_item):
+        """
+        Forgets a link item, for instance when it is deleted.
+
+        :param link_item: LinkItem instance
+        """
+
+        self._dirty.pop(id(link_item), None)
+
+    def pending(self):
+        """
+        Returns the number of link items waiting to be adjusted.
+
+        :returns: integer
+        """
+
+        return len(self._dirty)
+
+    def flush(self):
+        """
+        Adjusts all the dirty link items now.
+        """
+
+        self._timer.stop()
+        while self._dirty:
+            _, link_item = self._dirty.popitem(last=False)
+            try:
+                if link_item.scene() is None:
+                    # the link has been removed from the scene
+                    continue
+                link_item.adjust()
+            except RuntimeError:
+                # the underlying C++ item has been deleted
+                continue
+            self._adjusted += 1
+
+    def stats(self):
+        """
+        Returns the number of adjustments requested and done.
+
+        :returns: dictionary
+        """
+
+        return {"scheduled": self._scheduled, "adjusted": self._adjusted}
+
+    @staticmethod
+    def instance():
+        """
+        Singleton to return only one instance of LinkAdjustScheduler.
+
+        :returns: instance of LinkAdjustScheduler
+        """
+
+        if not hasattr(LinkAdjustScheduler, "_instance"):
+            LinkAdjustScheduler._instance = LinkAdjustScheduler()
+        return LinkAdjustScheduler._instance
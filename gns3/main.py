@@ -34,6 +34,7 @@ except ImportError:
     raise RuntimeError("Can't import Qt modules: Qt and/or PyQt is probably not installed correctly...")
 
 from gns3.main_window import MainWindow
+from gns3.network_thread import NetworkThread
 from gns3.version import __version__
 
 
@@ -135,12 +136,14 @@ def main():
     if DEFAULT_BINDING == "PySide" and version(QtCore.BINDING_VERSION_STR) < version("1.0"):
         raise RuntimeError("Requirement is PySide version 1.0 or higher, got version {}".format(QtCore.BINDING_VERSION_STR))
 
-    try:
-        # if tornado is present then enable pretty logging.
-        import tornado.log
-        tornado.log.enable_pretty_logging()
-    except ImportError:
-        pass
+    # log to the console, importing tornado just for its pretty logging slows down the startup
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter("[%(levelname)1.1s %(asctime)s %(module)s:%(lineno)d] %(message)s",
+                                                   datefmt="%y%m%d %H:%M:%S"))
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(console_handler)
 
     # check for the correct locale
     # (UNIX/Linux only)
@@ -217,6 +220,7 @@ def main():
         mainwindow = MainWindow.instance()
         mainwindow.show()
         exit_code = app.exec_()
+        NetworkThread.instance().stop()
         delattr(MainWindow, "_instance")
         app.deleteLater()
 
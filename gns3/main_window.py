@@ -25,7 +25,6 @@ import os
 import platform
 import time
 import tempfile
-import socket
 import shutil
 import json
 import glob
@@ -38,17 +37,13 @@ from .modules import MODULES
 from .version import __version__
 from .qt import QtGui, QtCore, QtNetwork
 from .servers import Servers
+from .server_metrics_dock_widget import ServerMetricsDockWidget
+from . import jsonrpc
 from .node import Node
 from .ui.main_window_ui import Ui_MainWindow
-from .dialogs.about_dialog import AboutDialog
-from .dialogs.new_project_dialog import NewProjectDialog
-from .dialogs.preferences_dialog import PreferencesDialog
-from .dialogs.snapshots_dialog import SnapshotsDialog
-from .dialogs.import_cloud_project_dialog import ImportCloudProjectDialog
 from .settings import GENERAL_SETTINGS, GENERAL_SETTING_TYPES, CLOUD_SETTINGS, CLOUD_SETTINGS_TYPES, ENABLE_CLOUD
 from .utils.progress_dialog import ProgressDialog
 from .utils.process_files_thread import ProcessFilesThread
-from .utils.wait_for_connection_thread import WaitForConnectionThread
 from .utils.message_box import MessageBox
 from .utils.analytics import AnalyticsClient
 from .ports.port import Port
@@ -58,9 +53,8 @@ from .items.shape_item import ShapeItem
 from .items.image_item import ImageItem
 from .items.note_item import NoteItem
 from .topology import Topology, TopologyInstance
-from .cloud.utils import UploadProjectThread
-from .cloud.rackspace_ctrl import get_provider
-from .cloud.exceptions import KeyPairExists
+from .scene_exporter import SceneExporter, TILED_FORMATS
+from .config_exporter import ConfigExporter, archiveFormat
 from .cloud_instances import CloudInstances
 
 log = logging.getLogger(__name__)
@@ -101,6 +95,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         self._max_recent_files = 5
         self._recent_file_actions = []
         self._start_time = time.time()
+        self._config_exporter = None
 
         self._project_settings = {
             "project_name": "unsaved",
@@ -109,12 +104,13 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             "project_type": "local",
         }
 
-        try:
-            from .news_dock_widget import NewsDockWidget
-            self._uiNewsDockWidget = NewsDockWidget(self)
-            self.addDockWidget(QtCore.Qt.DockWidgetArea(QtCore.Qt.RightDockWidgetArea), self._uiNewsDockWidget)
-        except ImportError:
-            self._uiNewsDockWidget = None
+        # the news dock widget (using QtWebKit) is created once the window is shown
+        self._uiNewsDockWidget = None
+
+        # metrics collected on the server connections, hidden by default
+        self.uiServerMetricsDockWidget = ServerMetricsDockWidget(self)
+        self.addDockWidget(QtCore.Qt.DockWidgetArea(QtCore.Qt.BottomDockWidgetArea), self.uiServerMetricsDockWidget)
+        self.uiServerMetricsDockWidget.setVisible(False)
 
         # restore the geometry and state of the main window.
         settings = QtCore.QSettings()
@@ -128,6 +124,13 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         self.uiDocksMenu.addAction(self.uiTopologySummaryDockWidget.toggleViewAction())
         self.uiDocksMenu.addAction(self.uiConsoleDockWidget.toggleViewAction())
         self.uiDocksMenu.addAction(self.uiNodesDockWidget.toggleViewAction())
+        self.uiDocksMenu.addAction(self.uiServerMetricsDockWidget.toggleViewAction())
+
+        # add the tools menu actions
+        self.uiAutoDistributeAction = QtGui.QAction("&Auto-distribute nodes...", self)
+        self.uiAutoDistributeAction.setStatusTip("Distribute the nodes on the remote servers minimizing the links between servers")
+        self.uiAutoDistributeAction.triggered.connect(self._autoDistributeActionSlot)
+        self.uiToolsMenu.addAction(self.uiAutoDistributeAction)
         if ENABLE_CLOUD:
             self.uiDocksMenu.addAction(self.uiCloudInspectorDockWidget.toggleViewAction())
 
@@ -161,6 +164,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
     @property
     def cloudProvider(self):
         if self._cloud_provider is None:
+            from .cloud.rackspace_ctrl import get_provider
             self._cloud_provider = get_provider(self.cloudSettings())
         return self._cloud_provider
 
@@ -185,6 +189,9 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         # restore the style
         self._setStyle(self._settings["style"])
 
+        # select the codec used for JSON-RPC messages
+        jsonrpc.setJSONCodec(self._settings["json_codec"])
+
         # restore packet capture settings
         Port.loadPacketCaptureSettings()
 
@@ -231,6 +238,10 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             if not self._setStyle(style):
                 self._setLegacyStyle()
 
+        json_codec = new_settings.get("json_codec")
+        if json_codec and json_codec != self._settings["json_codec"]:
+            jsonrpc.setJSONCodec(json_codec)
+
         # save the settings
         self._settings.update(new_settings)
         settings = QtCore.QSettings()
@@ -357,6 +368,8 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         Sets the project in a unsaved state.
         """
 
+        if Topology.instance().defer(self.setUnsavedState):
+            return
         if not self._ignore_unsaved_state:
             self.setWindowModified(True)
 
@@ -403,6 +416,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         """
 
         if self.checkForUnsavedChanges():
+            from .dialogs.new_project_dialog import NewProjectDialog
             project_dialog = NewProjectDialog(self)
             project_dialog.show()
             create_new_project = project_dialog.exec_()
@@ -471,25 +485,76 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         for the entire topology.
         """
 
-        options = ["Export configs to a directory", "Import configs from a directory"]
+        options = ["Export configs to a directory", "Export configs to an archive", "Import configs from a directory"]
         selection, ok = QtGui.QInputDialog.getItem(self, "Import/Export configs", "Please choose an option:", options, 0, False)
         if ok:
             if selection == options[0]:
                 self._exportConfigs()
+            elif selection == options[1]:
+                self._exportConfigs(archive=True)
             else:
                 self._importConfigs()
 
-    def _exportConfigs(self):
+    def _exportConfigs(self, archive=False):
         """
-        Exports all configs to a directory.
+        Exports all configs to a directory or to a zip/tar archive.
+
+        :param archive: asks for an archive instead of a directory
         """
 
-        path = QtGui.QFileDialog.getExistingDirectory(self, "Export directory", ".", QtGui.QFileDialog.ShowDirsOnly)
-        if path:
-            for module in MODULES:
-                instance = module.instance()
-                if hasattr(instance, "exportConfigs"):
-                    instance.exportConfigs(path)
+        if self._config_exporter is not None and self._config_exporter.isRunning():
+            QtGui.QMessageBox.critical(self, "Export configs", "Configs are already being exported to {}".format(self._config_exporter.path()))
+            return
+
+        if archive:
+            path, selected_filter = QtGui.QFileDialog.getSaveFileNameAndFilter(self, "Export archive", self.projectsDirPath(), "Zip archive (*.zip);;Tar archive (*.tar.gz)")
+            if not path:
+                return
+            # add the extension if missing
+            if archiveFormat(path) is None:
+                path += ".zip" if selected_filter.startswith("Zip") else ".tar.gz"
+        else:
+            path = QtGui.QFileDialog.getExistingDirectory(self, "Export directory", ".", QtGui.QFileDialog.ShowDirsOnly)
+            if not path:
+                return
+
+        self._config_exporter = ConfigExporter(Topology.instance().nodes(), path, parent=self)
+        progress_dialog = QtGui.QProgressDialog("Exporting configs to {}".format(os.path.basename(path)), "Cancel", 0, self._config_exporter.total(), parent=self)
+        progress_dialog.setWindowTitle("Export configs")
+        progress_dialog.setMinimumDuration(500)
+        progress_dialog.canceled.connect(self._config_exporter.cancel)
+        self._config_exporter.progress_signal.connect(progress_dialog.setValue)
+        self._config_exporter.finished_signal.connect(functools.partial(self._configsExportedSlot, progress_dialog))
+        try:
+            self._config_exporter.start()
+        except OSError as e:
+            progress_dialog.deleteLater()
+            self._config_exporter = None
+            QtGui.QMessageBox.critical(self, "Export configs", "Could not export the configs to {}: {}".format(path, e))
+
+    def _configsExportedSlot(self, progress_dialog):
+        """
+        Slot called when the configs export is over.
+
+        :param progress_dialog: QProgressDialog instance
+        """
+
+        exporter = self._config_exporter
+        progress_dialog.canceled.disconnect(exporter.cancel)
+        progress_dialog.reset()
+        progress_dialog.deleteLater()
+        if exporter.isCancelled():
+            self.uiStatusBar.showMessage("Configs export cancelled", 5000)
+            return
+
+        failures = exporter.failures()
+        if failures:
+            MessageBox(self, "Export configs", "{} config file(s) exported to {}, the configs of {} node(s) could not be exported".format(exporter.exportedCount(),
+                                                                                                                                              exporter.path(),
+                                                                                                                                              len(failures)),
+                       "\n".join("{}: {}".format(name, message) for name, message in failures))
+        else:
+            self.uiStatusBar.showMessage("{} config file(s) exported to {}".format(exporter.exportedCount(), exporter.path()), 5000)
 
     def _importConfigs(self):
         """
@@ -498,28 +563,56 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
 
         path = QtGui.QFileDialog.getExistingDirectory(self, "Import directory", ".", QtGui.QFileDialog.ShowDirsOnly)
         if path:
-            for module in MODULES:
-                instance = module.instance()
-                if hasattr(instance, "importConfigs"):
-                    instance.importConfigs(path)
+            servers = Servers.instance()
+            servers.startBatch()
+            try:
+                with Topology.instance().batch():
+                    for module in MODULES:
+                        instance = module.instance()
+                        if hasattr(instance, "importConfigs"):
+                            instance.importConfigs(path)
+            finally:
+                servers.endBatch()
 
     def _createScreenshot(self, path):
         """
         Create a screenshot of the scene.
 
-        :returns: True if the image was successfully saved; otherwise returns False
+        :returns: True if the image was successfully saved, None if
+        cancelled by the user; otherwise returns False
         """
 
         scene = self.uiGraphicsView.scene()
         scene.clearSelection()
-        scene.setSceneRect(scene.itemsBoundingRect().adjusted(-20.0, -20.0, 20.0, 20.0))
-        image = QtGui.QImage(scene.sceneRect().size().toSize(), QtGui.QImage.Format_RGB32)
+        exporter = SceneExporter(scene)
+        if os.path.splitext(path)[1][1:].lower() in TILED_FORMATS:
+            # large scenes are rendered region by region
+            progress_dialog = QtGui.QProgressDialog("Exporting {}".format(os.path.basename(path)), "Cancel", 0, 0, parent=self)
+            progress_dialog.setWindowTitle("Screenshot")
+            progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
+            progress_dialog.setMinimumDuration(500)
+
+            def progress(done, total):
+                progress_dialog.setMaximum(total)
+                progress_dialog.setValue(done)
+                QtGui.QApplication.processEvents()
+                return not progress_dialog.wasCanceled()
+
+            try:
+                if exporter.export(path, progress):
+                    return True
+                return None if exporter.wasCancelled() else False
+            finally:
+                progress_dialog.reset()
+
+        size = exporter.size()
+        image = QtGui.QImage(size, QtGui.QImage.Format_RGB32)
         image.fill(QtCore.Qt.white)
         painter = QtGui.QPainter(image)
         painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
         painter.setRenderHint(QtGui.QPainter.TextAntialiasing, True)
         painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, True)
-        scene.render(painter)
+        scene.render(painter, QtCore.QRectF(image.rect()), scene.itemsBoundingRect().adjusted(-20.0, -20.0, 20.0, 20.0))
         painter.end()
         #TODO: quality option
         return image.save(path)
@@ -530,7 +623,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         """
 
         # supported image file formats
-        file_formats = "PNG File (*.png);;JPG File (*.jpeg *.jpg);;BMP File (*.bmp);;XPM File (*.xpm *.xbm);;PPM File (*.ppm);;TIFF File (*.tiff)"
+        file_formats = "PNG File (*.png);;SVG File (*.svg);;PDF File (*.pdf);;JPG File (*.jpeg *.jpg);;BMP File (*.bmp);;XPM File (*.xpm *.xbm);;PPM File (*.ppm);;TIFF File (*.tiff)"
 
         path, selected_filter = QtGui.QFileDialog.getSaveFileNameAndFilter(self, "Screenshot", self.projectsDirPath(), file_formats)
         if not path:
@@ -541,7 +634,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         if not path.endswith(file_format):
             path += file_format
 
-        if not self._createScreenshot(path):
+        if self._createScreenshot(path) is False:
             QtGui.QMessageBox.critical(self, "Screenshot", "Could not create screenshot file {}".format(path))
 
     def _snapshotActionSlot(self):
@@ -556,6 +649,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
                 QtGui.QMessageBox.critical(self, "Snapshots", "Snapshot can only be created if all the nodes run locally")
                 return
 
+        from .dialogs.snapshots_dialog import SnapshotsDialog
         dialog = SnapshotsDialog(self,
                                  self._project_settings["project_path"],
                                  self._project_settings["project_files_dir"])
@@ -602,6 +696,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         """
 
         self.uiGraphicsView.resetMatrix()
+        self.uiGraphicsView.updateLevelOfDetail()
 
     def _fitInViewActionSlot(self):
         """
@@ -612,6 +707,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         bounding_rect = view.scene().itemsBoundingRect().adjusted(-20.0, -20.0, 20.0, 20.0)
         view.ensureVisible(bounding_rect)
         view.fitInView(bounding_rect, QtCore.Qt.KeepAspectRatio)
+        view.updateLevelOfDetail()
 
     def _showLayersActionSlot(self):
         """
@@ -647,45 +743,174 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         """
 
         LinkItem.showPortLabels(self.uiShowPortNamesAction.isChecked())
-        for item in self.uiGraphicsView.scene().items():
-            if isinstance(item, LinkItem):
-                item.adjust()
+        for item in self.uiGraphicsView.scene().linkItems():
+            item.adjust()
 
     def _startAllActionSlot(self):
         """
         Slot called when starting all the nodes.
         """
 
-        for item in self.uiGraphicsView.scene().items():
-            if isinstance(item, NodeItem) and hasattr(item.node(), "start") and item.node().initialized():
-                item.node().start()
+        servers = Servers.instance()
+        servers.startBatch()
+        try:
+            with Topology.instance().batch():
+                for item in self.uiGraphicsView.scene().nodeItems():
+                    if hasattr(item.node(), "start") and item.node().initialized():
+                        item.node().start()
+        finally:
+            servers.endBatch()
 
     def _suspendAllActionSlot(self):
         """
         Slot called when suspending all the nodes.
         """
 
-        for item in self.uiGraphicsView.scene().items():
-            if isinstance(item, NodeItem) and hasattr(item.node(), "suspend") and item.node().initialized():
-                item.node().suspend()
+        servers = Servers.instance()
+        servers.startBatch()
+        try:
+            with Topology.instance().batch():
+                for item in self.uiGraphicsView.scene().nodeItems():
+                    if hasattr(item.node(), "suspend") and item.node().initialized():
+                        item.node().suspend()
+        finally:
+            servers.endBatch()
 
     def _stopAllActionSlot(self):
         """
         Slot called when stopping all the nodes.
         """
 
-        for item in self.uiGraphicsView.scene().items():
-            if isinstance(item, NodeItem) and hasattr(item.node(), "stop") and item.node().initialized():
-                item.node().stop()
+        servers = Servers.instance()
+        servers.startBatch()
+        try:
+            with Topology.instance().batch():
+                for item in self.uiGraphicsView.scene().nodeItems():
+                    if hasattr(item.node(), "stop") and item.node().initialized():
+                        item.node().stop()
+        finally:
+            servers.endBatch()
+
+    def _autoDistributeActionSlot(self):
+        """
+        Slot called to distribute the nodes on the remote servers.
+        The nodes are partitioned to minimize the number of links between
+        servers (each one is a UDP tunnel between hosts), then the topology
+        is reloaded so the nodes are created on their new server.
+        """
+
+        from .placement import distributeNodes, crossServerLinks
+
+        servers = list(Servers.instance().remoteServers().values())
+        if len(servers) < 2:
+            QtGui.QMessageBox.critical(self, "Auto-distribute", "At least 2 remote servers are required to distribute the nodes")
+            return
+
+        topology = Topology.instance()
+        nodes = topology.nodes()
+        links = topology.links()
+        for node in nodes:
+            if node.status() != Node.stopped:
+                QtGui.QMessageBox.critical(self, "Auto-distribute", "All the nodes must be stopped to be distributed")
+                return
+
+        assignment = distributeNodes(nodes, links, servers)
+        if not assignment:
+            QtGui.QMessageBox.information(self, "Auto-distribute", "There is no node on the remote servers")
+            return
+
+        before = crossServerLinks(links)
+        after = crossServerLinks(links, assignment)
+        moved = [node for node, server in assignment.items() if server is not node.server()]
+        report = ["Links between servers: {} now, {} after distribution.".format(before, after), ""]
+        for server in servers:
+            server_nodes = [node for node, node_server in assignment.items() if node_server is server]
+            ram = 0
+            for node in server_nodes:
+                try:
+                    ram += int(node.settings().get("ram") or 0)
+                except (NotImplementedError, AttributeError, TypeError, ValueError):
+                    continue
+            capacity = "{} MB".format(server.ramCapacity()) if server.ramCapacity() else "unknown"
+            report.append("{}:{}: {} nodes, {} MB of RAM (capacity {})".format(server.host,
+                                                                             server.port,
+                                                                             len(server_nodes),
+                                                                             ram,
+                                                                             capacity))
+
+        if not moved or after >= before:
+            report.append("")
+            report.append("The current distribution cannot be improved.")
+            QtGui.QMessageBox.information(self, "Auto-distribute", "\n".join(report))
+            return
+
+        report.append("")
+        report.append("{} nodes will be moved and recreated on their new server, "
+                      "the project will be saved before and after.".format(len(moved)))
+        report.append("")
+        report.append("Warning: all the nodes are deleted from their current server, anything that "
+                      "only exists there (running VMs, NVRAM, disks) will be lost. Continue?")
+        reply = QtGui.QMessageBox.warning(self, "Auto-distribute", "\n".join(report),
+                                          QtGui.QMessageBox.Yes, QtGui.QMessageBox.No)
+        if reply == QtGui.QMessageBox.No:
+            return
+
+        # the nodes are bound to their server when created: rewrite their
+        # server in the topology representation and load it again.
+        if self._temporary_project or not self._project_settings["project_path"]:
+            QtGui.QMessageBox.information(self, "Auto-distribute", "The project has never been saved, please choose where to save it before the nodes are distributed")
+            if not self.saveProjectAs():
+                self.uiStatusBar.showMessage("Auto-distribute cancelled: the project has not been saved", 5000)
+                return
+        elif not self.saveProject(self._project_settings["project_path"]):
+            return
+        dump = topology.dump()
+        nodes_by_id = {node.id(): node for node in nodes}
+        servers_dump = {server.id(): server.dump() for server in servers}
+        for topology_server in dump["topology"].get("servers", []):
+            servers_dump.setdefault(topology_server["id"], topology_server)
+        for topology_node in dump["topology"].get("nodes", []):
+            node = nodes_by_id.get(topology_node["id"])
+            if node in assignment:
+                topology_node["server_id"] = assignment[node].id()
+        dump["topology"]["servers"] = list(servers_dump.values())
+
+        log.info("distributing {} nodes on {} remote servers ({} links between servers instead of {})".format(len(assignment),
+                                                                                                             len(servers),
+                                                                                                             after,
+                                                                                                             before))
+        self.uiGraphicsView.reset()
+        topology.load(dump)
+        self.uiStatusBar.showMessage("{} nodes moved, {} links between servers saved".format(len(moved), before - after), 5000)
+        loader = topology.loader()
+        if loader and loader.isRunning():
+            loader.finished_signal.connect(self._autoDistributeFinishedSlot)
+        else:
+            self._autoDistributeFinishedSlot()
+
+    def _autoDistributeFinishedSlot(self):
+        """
+        Slot called when the distributed topology has been loaded.
+        Saves the new server of each node.
+        """
+
+        if not self.saveProject(self._project_settings["project_path"]):
+            self.setUnsavedState()
 
     def _reloadAllActionSlot(self):
         """
         Slot called when reloading all the nodes.
         """
 
-        for item in self.uiGraphicsView.scene().items():
-            if isinstance(item, NodeItem) and hasattr(item.node(), "reload") and item.node().initialized():
-                item.node().reload()
+        servers = Servers.instance()
+        servers.startBatch()
+        try:
+            with Topology.instance().batch():
+                for item in self.uiGraphicsView.scene().nodeItems():
+                    if hasattr(item.node(), "reload") and item.node().initialized():
+                        item.node().reload()
+        finally:
+            servers.endBatch()
 
     def _deviceMenuActionSlot(self):
         """
@@ -710,8 +935,8 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
 
         delay = self._settings["delay_console_all"]
         counter = 0
-        for item in self.uiGraphicsView.scene().items():
-            if isinstance(item, NodeItem) and hasattr(item.node(), "console") and item.node().initialized() and item.node().status() == Node.started:
+        for item in self.uiGraphicsView.scene().nodeItems():
+            if hasattr(item.node(), "console") and item.node().initialized() and item.node().status() == Node.started:
                 callback = functools.partial(self.uiGraphicsView.consoleToNode, item.node())
                 QtCore.QTimer.singleShot(counter, callback)
                 counter += delay
@@ -781,17 +1006,21 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
 
         QtGui.QDesktopServices.openUrl(QtCore.QUrl("http://www.gns3.net/documentation/"))
 
-    def _checkForUpdateActionSlot(self, silent=False):
+    def _checkForUpdateActionSlot(self, silent=False, callback=None):
         """
         Slot to check if a newer version is available.
 
         :param silent: do not display any message
+        :param callback: called without argument as soon as the reply is received
         """
 
         request = QtNetwork.QNetworkRequest(QtCore.QUrl("http://update.gns3.net/"))
         request.setRawHeader("User-Agent", "GNS3 Check For Update")
         request.setAttribute(QtNetwork.QNetworkRequest.User, silent)
         reply = self._network_manager.get(request)
+        if callback is not None:
+            # before a message box is shown
+            reply.finished.connect(callback)
         reply.finished.connect(self._checkForUpdateReplySlot)
 
     def _checkForUpdateReplySlot(self):
@@ -866,6 +1095,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         Slot to display the GNS3 About dialog.
         """
 
+        from .dialogs.about_dialog import AboutDialog
         dialog = AboutDialog(self)
         dialog.show()
         dialog.exec_()
@@ -941,6 +1171,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         Slot to show the preferences dialog.
         """
 
+        from .dialogs.preferences_dialog import PreferencesDialog
         dialog = PreferencesDialog(self)
         dialog.show()
         dialog.exec_()
@@ -976,6 +1207,8 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             settings.setValue("GUI/state", self.saveState())
             event.accept()
 
+            from .reconnect_supervisor import ReconnectSupervisor
+            ReconnectSupervisor.instance().stop()
             servers = Servers.instance()
             servers.stopLocalServer(wait=True)
 
@@ -1019,77 +1252,29 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         Called by QTimer.singleShot to load everything needed at startup.
         """
 
-        if self._uiNewsDockWidget and not self._uiNewsDockWidget.isVisible():
-            self.addDockWidget(QtCore.Qt.DockWidgetArea(QtCore.Qt.RightDockWidgetArea), self._uiNewsDockWidget)
-
-        self._gettingStartedActionSlot(auto=True)
-
-        # connect to the local server
-        servers = Servers.instance()
-        server = servers.localServer()
-
-        if not server.connected():
-
+        if self._uiNewsDockWidget is None:
             try:
-                # check if the local address still exists
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                    sock.bind((server.host, 0))
-            except OSError as e:
-                QtGui.QMessageBox.critical(self, "Local server", "Could not bind with {host}: {error} (please check your host binding setting)".format(host=server.host, error=e))
-                return
-
-            try:
-                server.connect()
-                log.info("use an already started local server on {}:{}".format(server.host, server.port))
-            except OSError as e:
-
-                if not e.errno:
-                    # not a normal OSError, thrown from the Websocket client.
-                    MessageBox(self, "Local server", "Something other than a GNS3 server is already running on {} port {}, please adjust the local server port setting".format(server.host,
-                                                                                                                                                                               server.port),
-                                                                                                                                                                               str(e))
-                    return
-
-                if not servers.localServerAutoStart():
-                    return
-
-                log.info("starting local server {} on {}:{}".format(servers.localServerPath(), server.host, server.port))
-
-                local_server_path = servers.localServerPath()
-
-                if not local_server_path:
-                    log.info("no local server is configured")
-                    return
-
-                if not os.path.isfile(local_server_path):
-                    QtGui.QMessageBox.critical(self, "Local server", "Could not find local server {}".format(local_server_path))
-                    return
+                from .news_dock_widget import NewsDockWidget
+                self._uiNewsDockWidget = NewsDockWidget(self)
+                self.addDockWidget(QtCore.Qt.DockWidgetArea(QtCore.Qt.RightDockWidgetArea), self._uiNewsDockWidget)
+                # the window state has been restored before the dock widget existed
+                self.restoreDockWidget(self._uiNewsDockWidget)
+            except ImportError:
+                pass
+        elif not self._uiNewsDockWidget.isVisible():
+            self.addDockWidget(QtCore.Qt.DockWidgetArea(QtCore.Qt.RightDockWidgetArea), self._uiNewsDockWidget)
 
-                elif not os.access(local_server_path, os.X_OK):
-                    QtGui.QMessageBox.critical(self, "Local server", "{} is not an executable".format(local_server_path))
-                    return
+        # connect to the servers, check for update and send analytics
+        # in the background so the window is usable immediately
+        from .startup_orchestrator import StartupOrchestrator
+        self._startup = StartupOrchestrator(self)
+        self._startup.start()
 
-                if servers.startLocalServer(servers.localServerPath(), server.host, server.port):
-                        self._thread = WaitForConnectionThread(server.host, server.port)
-                        progress_dialog = ProgressDialog(self._thread,
-                                                         "Local server",
-                                                         "Connecting to server {} on port {}...".format(server.host, server.port),
-                                                         "Cancel", busy=True, parent=self)
-                        progress_dialog.show()
-                        if not progress_dialog.exec_():
-                            return
-                else:
-                    QtGui.QMessageBox.critical(self, "Local server", "Could not start the local server process: {}".format(servers.localServerPath()))
-                    return
-                try:
-                    servers.localServer().reconnect()
-                except OSError as e:
-                    QtGui.QMessageBox.critical(self, "Local server", "Could not connect to the local server {host} on port {port}: {error}".format(host=server.host,
-                                                                                                                                                   port=server.port,
-                                                                                                                                                   error=e))
+        self._gettingStartedActionSlot(auto=True)
 
         self._createTemporaryProject()
         if self._settings["auto_launch_project_dialog"]:
+            from .dialogs.new_project_dialog import NewProjectDialog
             project_dialog = NewProjectDialog(self, showed_from_startup=True)
             project_dialog.show()
             create_new_project = project_dialog.exec_()
@@ -1098,17 +1283,6 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
                 self._createNewProject(new_project_settings)
                 self.project_new_signal.emit(self._project_settings["project_path"])
 
-        if self._settings["check_for_update"]:
-            # automatic check for update every week (604800 seconds)
-            current_epoch = int(time.mktime(time.localtime()))
-            if current_epoch - self._settings["last_check_for_update"] >= 604800:
-                # let's check for an update
-                self._checkForUpdateActionSlot(silent=True)
-                self._settings["last_check_for_update"] = current_epoch
-                self.setSettings(self._settings)
-
-        AnalyticsClient().send_event("GNS3", "Open", "Version {} on {}".format(__version__, platform.system()))
-
     def saveProjectAs(self):
         """
         Saves a project to another location/name.
@@ -1592,6 +1766,8 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         if not name.endswith("-gns3"):
             name += "-gns3"
 
+        from .cloud.exceptions import KeyPairExists
+
         log.debug("Creating cloud keypair with name {}".format(name))
         try:
             keypair = self.cloudProvider.create_key_pair(name)
@@ -1614,6 +1790,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
                 "Cannot export temporary projects, please save current project first.")
             return
 
+        from .cloud.utils import UploadProjectThread
         upload_thread = UploadProjectThread(
             self._cloud_settings,
             self._project_settings['project_path'],
@@ -1625,6 +1802,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         progress_dialog.exec_()
 
     def _importProjectActionSlot(self):
+        from .dialogs.import_cloud_project_dialog import ImportCloudProjectDialog
         dialog = ImportCloudProjectDialog(
             self,
             self._settings['projects_path'],
@@ -1641,10 +1819,9 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         running on the instance_id instance
         """
         self.uiGraphicsView.scene().clearSelection()
-        for item in self.uiGraphicsView.scene().items():
-            if isinstance(item, NodeItem):
-                if item.node()._server.instance_id == instance_id:
-                    item.setSelected(True)
+        for item in self.uiGraphicsView.scene().nodeItems():
+            if item.node().server().instance_id == instance_id:
+                item.setSelected(True)
 
     def _setStyle(self, style):
 
@@ -109,11 +109,12 @@ class Builtin(Module):
         if node in self._nodes:
             self._nodes.remove(node)
 
-    def allocateServer(self, node_class):
+    def allocateServer(self, node_class, node_name=None):
         """
         Allocates a server.
 
         :param node_class: Node object
+        :param node_name: node name (unused)
 
         :returns: allocated server (WebSocketClient instance)
         """
@@ -140,7 +141,7 @@ class Builtin(Module):
             if not True in using_local_server and len(remote_servers) == 1:
                 # no module is using a local server and there is only one
                 # remote server available, so no need to ask the user.
-                return next(iter(servers))
+                return servers.allocateRemoteServer()
 
             server_list = []
             server_list.append("Local server ({}:{})".format(local_server.host, local_server.port))
@@ -365,11 +365,13 @@ class Dynamips(Module):
             params.update({"project_name": project_name})
         server.send_notification("dynamips.settings", params)
 
-    def allocateServer(self, node_class, use_cloud=False):
+    def allocateServer(self, node_class, use_cloud=False, node_name=None):
         """
         Allocates a server.
 
         :param node_class: Node object
+        :param use_cloud: allocates a cloud server
+        :param node_name: name of the IOS router the node is created from
 
         :returns: allocated server (WebSocketClient instance)
         """
@@ -387,8 +389,18 @@ class Dynamips(Module):
                 # use the local server
                 server = servers.localServer()
             else:
-                # pick up a remote server (round-robin method)
-                server = next(iter(servers))
+                # the placement policy chooses a remote server with enough RAM for the router
+                ram = 0
+                for info in self._ios_routers.values():
+                    if node_name == info["name"]:
+                        ram = info["ram"]
+                        break
+                else:
+                    for platform, platform_class in PLATFORM_TO_CLASS.items():
+                        if platform_class is node_class:
+                            ram = PLATFORMS_DEFAULT_RAM[platform]
+                            break
+                server = servers.allocateRemoteServer(ram)
                 if not server:
                     raise ModuleError("No remote server is configured")
         return server
@@ -642,8 +654,8 @@ class Dynamips(Module):
 
         server = "local"
         if not self._settings["use_local_server"]:
-            # pick up a remote server (round-robin method)
-            remote_server = next(iter(Servers.instance()))
+            # the placement policy chooses a remote server
+            remote_server = Servers.instance().allocateRemoteServer()
             if remote_server:
                 server = "{}:{}".format(remote_server.host, remote_server.port)
 
@@ -364,7 +364,7 @@ class IOSRouterWizard(QtGui.QWizard, Ui_IOSRouterWizard):
             server = "local"
         elif self.uiRemoteRadioButton.isChecked():
             if self.uiLoadBalanceCheckBox.isChecked():
-                server = next(iter(Servers.instance()))
+                server = Servers.instance().allocateRemoteServer(self.uiRamSpinBox.value())
                 if not server:
                     QtGui.QMessageBox.critical(self, "IOS router", "No remote server available!")
                     return
@@ -204,15 +204,16 @@ class EthernetHub(Node):
             log.info("{} has been updated".format(self.name()))
             self.updated_signal.emit()
 
-    def allocateUDPPort(self, port_id):
+    def udpPortRequest(self, port_id):
         """
-        Requests an UDP port allocation.
+        Returns the request allocating an UDP port on the server.
 
         :param port_id: port identifier
+
+        :returns: (JSON-RPC method, params) tuple
         """
 
-        log.debug("{} is requesting an UDP port allocation".format(self.name()))
-        self._server.send_message("dynamips.ethhub.allocate_udp_port", {"id": self._ethhub_id, "port_id": port_id}, self._allocateUDPPortCallback)
+        return "dynamips.ethhub.allocate_udp_port", {"id": self._ethhub_id, "port_id": port_id}
 
     def _allocateUDPPortCallback(self, result, error=False):
         """
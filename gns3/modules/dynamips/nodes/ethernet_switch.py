@@ -211,15 +211,16 @@ class EthernetSwitch(Node):
             log.info("{} has been updated".format(self.name()))
             self.updated_signal.emit()
 
-    def allocateUDPPort(self, port_id):
+    def udpPortRequest(self, port_id):
         """
-        Requests an UDP port allocation.
+        Returns the request allocating an UDP port on the server.
 
         :param port_id: port identifier
+
+        :returns: (JSON-RPC method, params) tuple
         """
 
-        log.debug("{} is requesting an UDP port allocation".format(self.name()))
-        self._server.send_message("dynamips.ethsw.allocate_udp_port", {"id": self._ethsw_id, "port_id": port_id}, self._allocateUDPPortCallback)
+        return "dynamips.ethsw.allocate_udp_port", {"id": self._ethsw_id, "port_id": port_id}
 
     def _allocateUDPPortCallback(self, result, error=False):
         """
@@ -25,6 +25,7 @@ import base64
 from gns3.node import Node
 from gns3.ports.port import Port
 from gns3.utils.normalize_filename import normalize_filename
+from gns3.config_transfer import ConfigTransferService
 
 from ..settings import PLATFORMS_DEFAULT_RAM
 from ..adapters import ADAPTER_MATRIX
@@ -203,6 +204,7 @@ class Router(Node):
         # first delete all the links attached to this node
         self.delete_links_signal.emit()
         if self._router_id and self._server.connected():
+            ConfigTransferService.instance().forget(self._server, ("dynamips", self._router_id))
             self._server.send_message("dynamips.vm.delete", {"id": self._router_id}, self._deleteCallback)
         else:
             self.deleted_signal.emit()
@@ -289,6 +291,9 @@ class Router(Node):
             self.error_signal.emit(self.id(), "returned ID from server is null")
             return
 
+        # the server reuses the IDs of deleted devices
+        ConfigTransferService.instance().forget(self._server, ("dynamips", self._router_id))
+
         # update the settings using the defaults sent by the server
         for name, value in result.items():
             if name in self._settings and self._settings[name] != value:
@@ -313,25 +318,17 @@ class Router(Node):
             self.created_signal.emit(self.id())
             self._module.addNode(self)
 
-    def _base64Config(self, config_path):
+    def _base64Config(self, config_path, config_name):
         """
         Get the base64 encoded config from a file.
 
         :param config_path: path to the configuration file.
+        :param config_name: startup_config or private_config
 
-        :returns: base64 encoded string
+        :returns: base64 encoded string, None if the router already has this config
         """
 
-        try:
-            with open(config_path, "r", errors="replace") as f:
-                log.info("opening configuration file: {}".format(config_path))
-                config = f.read()
-                config = "!\n" + config.replace('\r', "")
-                encoded = "".join(base64.encodestring(config.encode("utf-8")).decode("utf-8").split())
-                return encoded
-        except OSError as e:
-            log.warn("could not base64 encode {}: {}".format(config_path, e))
-            return ""
+        return ConfigTransferService.instance().upload(self._server, ("dynamips", self._router_id), config_name, config_path, prefix="!\n")
 
     def update(self, new_settings):
         """
@@ -349,15 +346,12 @@ class Router(Node):
             if name in self._settings and self._settings[name] != value:
                 params[name] = value
 
-        # push the startup-config
-        if "startup_config" in new_settings and self._settings["startup_config"] != new_settings["startup_config"] \
-        and not self.server().isLocal() and os.path.isfile(new_settings["startup_config"]):
-            params["startup_config_base64"] = self._base64Config(new_settings["startup_config"])
-
-        # push the private-config
-        if "private_config" in new_settings and self._settings["private_config"] != new_settings["private_config"] \
-        and not self.server().isLocal() and os.path.isfile(new_settings["private_config"]):
-            params["private_config_base64"] = self._base64Config(new_settings["private_config"])
+        # push the startup-config and private-config, unless the router already has them
+        for config_name in ("startup_config", "private_config"):
+            if config_name in new_settings and not self.server().isLocal() and os.path.isfile(new_settings[config_name]):
+                config = self._base64Config(new_settings[config_name], config_name)
+                if config is not None:
+                    params[config_name + "_base64"] = config
 
         log.debug("{} is updating settings: {}".format(self.name(), params))
         self._server.send_message("dynamips.vm.update", params, self._updateCallback)
@@ -373,6 +367,8 @@ class Router(Node):
         if error:
             log.error("error while deleting {}: {}".format(self.name(), result["message"]))
             self.server_error_signal.emit(self.id(), result["code"], result["message"])
+            # the configs may not have been received
+            ConfigTransferService.instance().forget(self._server, ("dynamips", self._router_id))
             return
 
         updated = False
@@ -671,15 +667,16 @@ class Router(Node):
         self._server.send_message("dynamips.vm.update", params, self._updateCallback)
         self._module.updateImageIdlepc(self._settings["image"], idlepc)
 
-    def allocateUDPPort(self, port_id):
+    def udpPortRequest(self, port_id):
         """
-        Requests an UDP port allocation.
+        Returns the request allocating an UDP port on the server.
 
         :param port_id: port identifier
+
+        :returns: (JSON-RPC method, params) tuple
         """
 
-        log.debug("{} is requesting an UDP port allocation".format(self.name()))
-        self._server.send_message("dynamips.vm.allocate_udp_port", {"id": self._router_id, "port_id": port_id}, self._allocateUDPPortCallback)
+        return "dynamips.vm.allocate_udp_port", {"id": self._router_id, "port_id": port_id}
 
     def _allocateUDPPortCallback(self, result, error=False):
         """
@@ -1002,6 +999,30 @@ class Router(Node):
         self._inital_settings = None
         self._loading = False
 
+    def exportConfigMessage(self):
+        """
+        Returns the message requesting the startup-config and private-config.
+
+        :returns: tuple (destination, params)
+        """
+
+        return "dynamips.vm.export_config", {"id": self._router_id}
+
+    def exportedConfigs(self, result):
+        """
+        Decodes the startup-config and private-config sent by the server.
+
+        :param result: server response
+
+        :returns: iterator of (file name, content) tuples
+        """
+
+        for config_name, suffix in (("startup_config", "_startup-config.cfg"), ("private_config", "_private-config.cfg")):
+            if config_name + "_base64" in result:
+                config = base64.decodebytes(result[config_name + "_base64"].encode("utf-8"))
+                ConfigTransferService.instance().received(self._server, ("dynamips", self._router_id), config_name, config)
+                yield normalize_filename(self.name()) + suffix, config
+
     def exportConfigs(self, directory):
         """
         Exports the startup-config and private-config to a directory.
@@ -1010,7 +1031,8 @@ class Router(Node):
         """
 
         self._export_directory = directory
-        self._server.send_message("dynamips.vm.export_config", {"id": self._router_id}, self._exportConfigsCallback)
+        destination, params = self.exportConfigMessage()
+        self._server.send_message(destination, params, self._exportConfigsCallback)
 
     def _exportConfigsCallback(self, result, error=False):
         """
@@ -1024,26 +1046,14 @@ class Router(Node):
             log.error("error while exporting {} configs: {}".format(self.name(), result["message"]))
             self.server_error_signal.emit(self.id(), result["code"], result["message"])
         else:
-
-            if "startup_config_base64" in result:
-                config_path = os.path.join(self._export_directory, normalize_filename(self.name())) + "_startup-config.cfg"
-                config = base64.decodebytes(result["startup_config_base64"].encode("utf-8"))
-                try:
-                    with open(config_path, "wb") as f:
-                        log.info("saving {} startup-config to {}".format(self.name(), config_path))
-                        f.write(config)
-                except OSError as e:
-                    self.error_signal.emit(self.id(), "could not export startup-config to {}: {}".format(config_path, e))
-
-            if "private_config_base64" in result:
-                config_path = os.path.join(self._export_directory, normalize_filename(self.name())) + "_private-config.cfg"
-                config = base64.decodebytes(result["private_config_base64"].encode("utf-8"))
+            for file_name, config in self.exportedConfigs(result):
+                config_path = os.path.join(self._export_directory, file_name)
                 try:
                     with open(config_path, "wb") as f:
-                        log.info("saving {} private-config to {}".format(self.name(), config_path))
+                        log.info("saving {} config to {}".format(self.name(), config_path))
                         f.write(config)
                 except OSError as e:
-                    self.error_signal.emit(self.id(), "could not export private-config to {}: {}".format(config_path, e))
+                    self.error_signal.emit(self.id(), "could not export config to {}: {}".format(config_path, e))
 
             self._export_directory = None
 
@@ -19,11 +19,11 @@
 IOU module implementation.
 """
 
-import base64
 import os
 
 from gns3.qt import QtCore, QtGui
 from gns3.node import Node
+from gns3.config_transfer import encodeConfig
 
 from ..module import Module
 from ..module_error import ModuleError
@@ -245,11 +245,8 @@ class IOU(Module):
         """
 
         try:
-            with open(iourc_path, "r", errors="replace") as f:
-                log.info("opening iourc file: {}".format(iourc_path))
-                config = f.read()
-                encoded = "".join(base64.encodestring(config.encode("utf-8")).decode("utf-8").split())
-                return encoded
+            log.info("opening iourc file: {}".format(iourc_path))
+            return encodeConfig(iourc_path)
         except OSError as e:
             log.warn("could not base64 encode {}: {}".format(iourc_path, e))
             return ""
@@ -192,7 +192,7 @@ class IOUDeviceWizard(QtGui.QWizard, Ui_IOUDeviceWizard):
             server = "local"
         elif self.uiRemoteRadioButton.isChecked():
             if self.uiLoadBalanceCheckBox.isChecked():
-                server = next(iter(Servers.instance()))
+                server = Servers.instance().allocateRemoteServer()
                 if not server:
                     QtGui.QMessageBox.critical(self, "IOU device", "No remote server available!")
                     return
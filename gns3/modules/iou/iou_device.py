@@ -26,6 +26,7 @@ from gns3.ports.port import Port
 from gns3.ports.ethernet_port import EthernetPort
 from gns3.ports.serial_port import SerialPort
 from gns3.utils.normalize_filename import normalize_filename
+from gns3.config_transfer import ConfigTransferService
 from .settings import IOU_DEVICE_SETTINGS
 
 import logging
@@ -161,6 +162,9 @@ class IOUDevice(Node):
             self.error_signal.emit(self.id(), "returned ID from server is null")
             return
 
+        # the server reuses the IDs of deleted devices
+        ConfigTransferService.instance().forget(self._server, ("iou", self._iou_id))
+
         # update the settings using the defaults sent by the server
         for name, value in result.items():
             if name in self._settings and self._settings[name] != value:
@@ -187,6 +191,7 @@ class IOUDevice(Node):
         # first delete all the links attached to this node
         self.delete_links_signal.emit()
         if self._iou_id:
+            ConfigTransferService.instance().forget(self._server, ("iou", self._iou_id))
             self._server.send_message("iou.delete", {"id": self._iou_id}, self._deleteCallback)
         else:
             self.deleted_signal.emit()
@@ -213,19 +218,10 @@ class IOUDevice(Node):
 
         :param config_path: path to the configuration file.
 
-        :returns: base64 encoded string
+        :returns: base64 encoded string, None if the device already has this config
         """
 
-        try:
-            with open(config_path, "r", errors="replace") as f:
-                log.info("opening configuration file: {}".format(config_path))
-                config = f.read()
-                config = '!\n' + config.replace('\r', "")
-                encoded = "".join(base64.encodestring(config.encode("utf-8")).decode("utf-8").split())
-                return encoded
-        except OSError as e:
-            log.warn("could not base64 encode {}: {}".format(config_path, e))
-            return ""
+        return ConfigTransferService.instance().upload(self._server, ("iou", self._iou_id), "initial_config", config_path, prefix="!\n")
 
     def update(self, new_settings):
         """
@@ -243,9 +239,11 @@ class IOUDevice(Node):
             if name in self._settings and self._settings[name] != value:
                 params[name] = value
 
-        if "initial_config" in new_settings and self._settings["initial_config"] != new_settings["initial_config"] \
-        and not self.server().isLocal() and os.path.isfile(new_settings["initial_config"]):
-            params["initial_config_base64"] = self._base64Config(new_settings["initial_config"])
+        # push the initial-config, unless the device already has it
+        if "initial_config" in new_settings and not self.server().isLocal() and os.path.isfile(new_settings["initial_config"]):
+            initial_config = self._base64Config(new_settings["initial_config"])
+            if initial_config is not None:
+                params["initial_config_base64"] = initial_config
 
         log.debug("{} is updating settings: {}".format(self.name(), params))
         self._server.send_message("iou.update", params, self._updateCallback)
@@ -261,6 +259,8 @@ class IOUDevice(Node):
         if error:
             log.error("error while deleting {}: {}".format(self.name(), result["message"]))
             self.server_error_signal.emit(self.id(), result["code"], result["message"])
+            # the initial-config may not have been received
+            ConfigTransferService.instance().forget(self._server, ("iou", self._iou_id))
             return
 
         updated = False
@@ -376,15 +376,16 @@ class IOUDevice(Node):
         else:
             log.info("{} has reloaded".format(self.name()))
 
-    def allocateUDPPort(self, port_id):
+    def udpPortRequest(self, port_id):
         """
-        Requests an UDP port allocation.
+        Returns the request allocating an UDP port on the server.
 
         :param port_id: port identifier
+
+        :returns: (JSON-RPC method, params) tuple
         """
 
-        log.debug("{} is requesting an UDP port allocation".format(self.name()))
-        self._server.send_message("iou.allocate_udp_port", {"id": self._iou_id, "port_id": port_id}, self._allocateUDPPortCallback)
+        return "iou.allocate_udp_port", {"id": self._iou_id, "port_id": port_id}
 
     def _allocateUDPPortCallback(self, result, error=False):
         """
@@ -675,6 +676,29 @@ class IOUDevice(Node):
         self._inital_settings = None
         self._loading = False
 
+    def exportConfigMessage(self):
+        """
+        Returns the message requesting the initial-config.
+
+        :returns: tuple (destination, params)
+        """
+
+        return "iou.export_config", {"id": self._iou_id}
+
+    def exportedConfigs(self, result):
+        """
+        Decodes the initial-config sent by the server.
+
+        :param result: server response
+
+        :returns: iterator of (file name, content) tuples
+        """
+
+        if "initial_config_base64" in result:
+            config = base64.decodebytes(result["initial_config_base64"].encode("utf-8"))
+            ConfigTransferService.instance().received(self._server, ("iou", self._iou_id), "initial_config", config)
+            yield normalize_filename(self.name()) + "_initial-config.cfg", config
+
     def exportConfig(self, directory):
         """
         Exports the initial-config to a directory.
@@ -683,7 +707,8 @@ class IOUDevice(Node):
         """
 
         self._export_directory = directory
-        self._server.send_message("iou.export_config", {"id": self._iou_id}, self._exportConfigCallback)
+        destination, params = self.exportConfigMessage()
+        self._server.send_message(destination, params, self._exportConfigCallback)
 
     def _exportConfigCallback(self, result, error=False):
         """
@@ -697,10 +722,8 @@ class IOUDevice(Node):
             log.error("error while exporting {} initial-config: {}".format(self.name(), result["message"]))
             self.server_error_signal.emit(self.id(), result["code"], result["message"])
         else:
-
-            if "initial_config_base64" in result:
-                config_path = os.path.join(self._export_directory, normalize_filename(self.name())) + "_initial-config.cfg"
-                config = base64.decodebytes(result["initial_config_base64"].encode("utf-8"))
+            for file_name, config in self.exportedConfigs(result):
+                config_path = os.path.join(self._export_directory, file_name)
                 try:
                     with open(config_path, "wb") as f:
                         log.info("saving {} initial-config to {}".format(self.name(), config_path))
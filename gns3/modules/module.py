@@ -54,6 +54,17 @@ class Module(QtCore.QObject):
 
         raise NotImplementedError()
 
+    def serverReconnected(self, server):
+        """
+        Called when the connection with a server has been restored,
+        sends the module settings again if the module uses this server.
+
+        :param server: WebSocketClient instance
+        """
+
+        if hasattr(self, "_sendSettings") and server in self.servers():
+            self._sendSettings(server)
+
     @staticmethod
     def nodes(self):
         """
@@ -353,15 +353,16 @@ class QemuVM(Node):
         else:
             log.info("{} has reloaded".format(self.name()))
 
-    def allocateUDPPort(self, port_id):
+    def udpPortRequest(self, port_id):
         """
-        Requests an UDP port allocation.
+        Returns the request allocating an UDP port on the server.
 
         :param port_id: port identifier
+
+        :returns: (JSON-RPC method, params) tuple
         """
 
-        log.debug("{} is requesting an UDP port allocation".format(self.name()))
-        self._server.send_message("qemu.allocate_udp_port", {"id": self._qemu_id, "port_id": port_id}, self._allocateUDPPortCallback)
+        return "qemu.allocate_udp_port", {"id": self._qemu_id, "port_id": port_id}
 
     def _allocateUDPPortCallback(self, result, error=False):
         """
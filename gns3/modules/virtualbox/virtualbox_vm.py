@@ -356,15 +356,16 @@ class VirtualBoxVM(Node):
         else:
             log.info("{} has reloaded".format(self.name()))
 
-    def allocateUDPPort(self, port_id):
+    def udpPortRequest(self, port_id):
         """
-        Requests an UDP port allocation.
+        Returns the request allocating an UDP port on the server.
 
         :param port_id: port identifier
+
+        :returns: (JSON-RPC method, params) tuple
         """
 
-        log.debug("{} is requesting an UDP port allocation".format(self.name()))
-        self._server.send_message("virtualbox.allocate_udp_port", {"id": self._vbox_id, "port_id": port_id}, self._allocateUDPPortCallback)
+        return "virtualbox.allocate_udp_port", {"id": self._vbox_id, "port_id": port_id}
 
     def _allocateUDPPortCallback(self, result, error=False):
         """
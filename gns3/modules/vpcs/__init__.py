@@ -327,8 +327,8 @@ class VPCS(Module):
 
         server = "local"
         if not self._settings["use_local_server"]:
-            # pick up a remote server (round-robin method)
-            remote_server = next(iter(Servers.instance()))
+            # the placement policy chooses a remote server
+            remote_server = Servers.instance().allocateRemoteServer()
             if remote_server:
                 server = "{}:{}".format(remote_server.host, remote_server.port)
 
@@ -25,6 +25,7 @@ from gns3.node import Node
 from gns3.ports.port import Port
 from gns3.ports.ethernet_port import EthernetPort
 from gns3.utils.normalize_filename import normalize_filename
+from gns3.config_transfer import ConfigTransferService
 
 import logging
 log = logging.getLogger(__name__)
@@ -108,6 +109,9 @@ class VPCSDevice(Node):
             self.error_signal.emit(self.id(), "returned ID from server is null")
             return
 
+        # the server reuses the IDs of deleted devices
+        ConfigTransferService.instance().forget(self._server, ("vpcs", self._vpcs_id))
+
         # update the settings using the defaults sent by the server
         for name, value in result.items():
             if name in self._settings and self._settings[name] != value:
@@ -134,6 +138,7 @@ class VPCSDevice(Node):
         # first delete all the links attached to this node
         self.delete_links_signal.emit()
         if self._vpcs_id:
+            ConfigTransferService.instance().forget(self._server, ("vpcs", self._vpcs_id))
             self._server.send_message("vpcs.delete", {"id": self._vpcs_id}, self._deleteCallback)
         else:
             self.deleted_signal.emit()
@@ -160,19 +165,10 @@ class VPCSDevice(Node):
 
         :param config_path: path to the configuration file.
 
-        :returns: base64 encoded string
+        :returns: base64 encoded string, None if the device already has this script
         """
 
-        try:
-            with open(config_path, "r", errors="replace") as f:
-                log.info("opening configuration file: {}".format(config_path))
-                config = f.read()
-                config = config.replace('\r', "")
-                encoded = "".join(base64.encodestring(config.encode("utf-8")).decode("utf-8").split())
-                return encoded
-        except OSError as e:
-            log.warn("could not base64 encode {}: {}".format(config_path, e))
-            return ""
+        return ConfigTransferService.instance().upload(self._server, ("vpcs", self._vpcs_id), "script_file", config_path)
 
     def update(self, new_settings):
         """
@@ -190,9 +186,11 @@ class VPCSDevice(Node):
             if name in self._settings and self._settings[name] != value:
                 params[name] = value
 
-        if "script_file" in new_settings and self._settings["script_file"] != new_settings["script_file"] \
-        and not self.server().isLocal() and os.path.isfile(new_settings["script_file"]):
-            params["script_file_base64"] = self._base64Config(new_settings["script_file"])
+        # push the script file, unless the device already has it
+        if "script_file" in new_settings and not self.server().isLocal() and os.path.isfile(new_settings["script_file"]):
+            script_file = self._base64Config(new_settings["script_file"])
+            if script_file is not None:
+                params["script_file_base64"] = script_file
 
         log.debug("{} is updating settings: {}".format(self.name(), params))
         self._server.send_message("vpcs.update", params, self._updateCallback)
@@ -208,6 +206,8 @@ class VPCSDevice(Node):
         if error:
             log.error("error while deleting {}: {}".format(self.name(), result["message"]))
             self.server_error_signal.emit(self.id(), result["code"], result["message"])
+            # the script file may not have been received
+            ConfigTransferService.instance().forget(self._server, ("vpcs", self._vpcs_id))
             return
 
         updated = False
@@ -314,15 +314,16 @@ class VPCSDevice(Node):
         else:
             log.info("{} has reloaded".format(self.name()))
 
-    def allocateUDPPort(self, port_id):
+    def udpPortRequest(self, port_id):
         """
-        Requests an UDP port allocation.
+        Returns the request allocating an UDP port on the server.
 
         :param port_id: port identifier
+
+        :returns: (JSON-RPC method, params) tuple
         """
 
-        log.debug("{} is requesting an UDP port allocation".format(self.name()))
-        self._server.send_message("vpcs.allocate_udp_port", {"id": self._vpcs_id, "port_id": port_id}, self._allocateUDPPortCallback)
+        return "vpcs.allocate_udp_port", {"id": self._vpcs_id, "port_id": port_id}
 
     def _allocateUDPPortCallback(self, result, error=False):
         """
@@ -505,6 +506,29 @@ class VPCSDevice(Node):
         self._inital_settings = None
         self._loading = False
 
+    def exportConfigMessage(self):
+        """
+        Returns the message requesting the script-file.
+
+        :returns: tuple (destination, params)
+        """
+
+        return "vpcs.export_config", {"id": self._vpcs_id}
+
+    def exportedConfigs(self, result):
+        """
+        Decodes the script-file sent by the server.
+
+        :param result: server response
+
+        :returns: iterator of (file name, content) tuples
+        """
+
+        if "script_file_base64" in result:
+            config = base64.decodebytes(result["script_file_base64"].encode("utf-8"))
+            ConfigTransferService.instance().received(self._server, ("vpcs", self._vpcs_id), "script_file", config)
+            yield normalize_filename(self.name()) + "_startup.vpc", config
+
     def exportConfig(self, directory):
         """
         Exports the script-file to a directory.
@@ -513,7 +537,8 @@ class VPCSDevice(Node):
         """
 
         self._export_directory = directory
-        self._server.send_message("vpcs.export_config", {"id": self._vpcs_id}, self._exportConfigCallback)
+        destination, params = self.exportConfigMessage()
+        self._server.send_message(destination, params, self._exportConfigCallback)
 
     def _exportConfigCallback(self, result, error=False):
         """
@@ -527,10 +552,8 @@ class VPCSDevice(Node):
             log.error("error while exporting {} configs: {}".format(self.name(), result["message"]))
             self.server_error_signal.emit(self.id(), result["code"], result["message"])
         else:
-
-            if "script_file_base64" in result:
-                config_path = os.path.join(self._export_directory, normalize_filename(self.name())) + "_startup.vpc"
-                config = base64.decodebytes(result["script_file_base64"].encode("utf-8"))
+            for file_name, config in self.exportedConfigs(result):
+                config_path = os.path.join(self._export_directory, file_name)
                 try:
                     with open(config_path, "wb") as f:
                         log.info("saving {} script file to {}".format(self.name(), config_path))
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Thread owning the server sockets: reads and decodes the data received
+from the servers. Connections are made from a thread pool, in parallel
+and without blocking the GUI.
+"""
+
+import threading
+
+from .qt import QtCore
+
+import logging
+log = logging.getLogger(__name__)
+
+# maximum number of servers connected at the same time
+MAX_PARALLEL_CONNECTIONS = 8
+
+
+class SocketReader(QtCore.QObject):
+    """
+    Monitors a server socket from the network thread.
+
+    :param client: WebSocketClient instance
+    """
+
+    # signals emitted from the GUI thread to the network thread
+    watch_signal = QtCore.Signal(int)
+    unwatch_signal = QtCore.Signal()
+
+    # signals emitted from the network thread to the GUI thread
+    opened_signal = QtCore.Signal()
+    message_signal = QtCore.Signal(object)
+    disconnected_signal = QtCore.Signal()
+
+    def __init__(self, client):
+
+        super(SocketReader, self).__init__()
+        self._client = client
+        self._notifier = None
+        self._watching = False
+        # held while reading, so the socket is not closed in the meantime
+        self._lock = threading.RLock()
+        self.watch_signal.connect(self._watchSlot)
+        self.unwatch_signal.connect(self._unwatchSlot)
+
+    def watch(self, fd):
+        """
+        Starts monitoring a socket, can be called from any thread.
+
+        :param fd: socket file descriptor
+        """
+
+        with self._lock:
+            self._watching = True
+        self.watch_signal.emit(fd)
+
+    def unwatch(self):
+        """
+        Stops monitoring the socket, can be called from any thread.
+        Waits for a read in progress, the socket can be closed on return.
+        """
+
+        with self._lock:
+            self._watching = False
+        self.unwatch_signal.emit()
+
+    def _watchSlot(self, fd):
+        """
+        Starts monitoring a socket, the notifier must
+        be created in the network thread.
+
+        :param fd: socket file descriptor
+        """
+
+        self._unwatchSlot()
+        self._notifier = QtCore.QSocketNotifier(fd, QtCore.QSocketNotifier.Read)
+        self._notifier.activated.connect(self._readSlot)
+
+    def _unwatchSlot(self):
+        """
+        Stops monitoring the socket.
+        """
+
+        if self._notifier:
+            self._notifier.setEnabled(False)
+            self._notifier.deleteLater()
+            self._notifier = None
+
+    def _readSlot(self, fd):
+        """
+        Slot called when data is received from the server.
+
+        :param fd: socket file descriptor
+        """
+
+        with self._lock:
+            if not self._watching:
+                # the socket may have been closed
+                return
+            # read the data, if successful received_message() is called by once()
+            if self._client.once() != False:
+                return
+            self._watching = False
+        self._unwatchSlot()
+        self.disconnected_signal.emit()
+
+
+class ConnectionNotifier(QtCore.QObject):
+    """
+    Notifies the GUI thread when a connection attempt is over.
+    """
+
+    result_signal = QtCore.Signal(object, str, int)
+
+
+class ConnectionTask(QtCore.QRunnable):
+    """
+    Connects to a server from the connection thread pool.
+
+    :param client: WebSocketClient instance
+    :param notifier: ConnectionNotifier instance
+    """
+
+    def __init__(self, client, notifier):
+
+        QtCore.QRunnable.__init__(self)
+        self._client = client
+        self._notifier = notifier
+
+    def run(self):
+        """
+        Connects to the server.
+        """
+
+        client = self._client
+        error = ""
+        errno = 0
+        try:
+            if not client.connected():
+                client.reconnect()
+        except OSError as e:
+            error = str(e)
+            errno = e.errno or 0
+            if not error:
+                error = "Could not connect to {}:{}".format(client.host, client.port)
+        except Exception as e:
+            error = "Could not connect to {}:{}: {}".format(client.host, client.port, e)
+        self._notifier.result_signal.emit(client, error, errno)
+
+
+class NetworkThread(QtCore.QThread):
+    """
+    Network thread running its own event loop.
+    """
+
+    def __init__(self):
+
+        super(NetworkThread, self).__init__()
+        self._callbacks = {}
+
+        # connections are made in parallel, outside of the GUI thread
+        self._connection_pool = QtCore.QThreadPool()
+        self._connection_pool.setMaxThreadCount(MAX_PARALLEL_CONNECTIONS)
+        self._notifier = ConnectionNotifier()
+        self._notifier.result_signal.connect(self._connectionResultSlot)
+
+    def run(self):
+        """
+        Thread starting point.
+        """
+
+        log.info("network thread started")
+        self.exec_()
+        log.info("network thread stopped")
+
+    def stop(self):
+        """
+        Stops the network thread.
+        """
+
+        self._connection_pool.waitForDone(5000)
+        if self.isRunning():
+            self.quit()
+            self.wait(5000)
+
+    def createReader(self, client):
+        """
+        Creates a reader for a server socket,
+        living in the network thread.
+
+        :param client: WebSocketClient instance
+
+        :returns: SocketReader instance
+        """
+
+        reader = SocketReader(client)
+        reader.moveToThread(self)
+        return reader
+
+    @staticmethod
+    def isNetworkThread():
+        """
+        Returns either the caller runs in the network thread.
+
+        :returns: boolean
+        """
+
+        return hasattr(NetworkThread, "_instance") and QtCore.QThread.currentThread() == NetworkThread._instance
+
+    @staticmethod
+    def isGuiThread():
+        """
+        Returns either the caller runs in the GUI thread.
+
+        :returns: boolean
+        """
+
+        application = QtCore.QCoreApplication.instance()
+        return application is None or QtCore.QThread.currentThread() == application.thread()
+
+    def connectServer(self, client, callback):
+        """
+        Connects to a server from the connection thread pool,
+        several servers are connected at the same time.
+
+        :param client: WebSocketClient instance
+        :param callback: callback to call in the GUI thread once connected,
+        on failure the result is a dictionary with the error message
+        and errno (0 if the error is not a socket error) and error is set to True.
+        """
+
+        self._callbacks.setdefault(client, []).append(callback)
+        if len(self._callbacks[client]) == 1:
+            self._connection_pool.start(ConnectionTask(client, self._notifier))
+
+    def isConnecting(self, client):
+        """
+        Returns either a connection to a server is in progress.
+
+        :param client: WebSocketClient instance
+
+        :returns: boolean
+        """
+
+        return client in self._callbacks
+
+    def _connectionResultSlot(self, client, error, errno):
+        """
+        Slot running in the GUI thread when a connection attempt is over.
+
+        :param client: WebSocketClient instance
+        :param error: error message (empty if the connection is successful)
+        :param errno: socket error number (0 if unknown)
+        """
+
+        for callback in self._callbacks.pop(client, []):
+            if error:
+                callback({"message": error, "errno": errno}, True)
+            else:
+                callback(client)
+
+    @staticmethod
+    def instance():
+        """
+        Singleton to return only one instance of NetworkThread.
+        The thread is started on first use.
+
+        :returns: instance of NetworkThread
+        """
+
+        if not hasattr(NetworkThread, "_instance"):
+            NetworkThread._instance = NetworkThread()
+            NetworkThread._instance.start()
+        return NetworkThread._instance
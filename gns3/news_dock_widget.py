@@ -19,9 +19,11 @@ import os
 import sys
 import pkg_resources
 
-from .qt import QtGui, QtCore, QtWebKit
+from .qt import QtGui, QtCore, importWebKit
 from .ui.news_dock_widget_ui import Ui_NewsDockWidget
 
+QtWebKit = importWebKit()
+
 import logging
 log = logging.getLogger(__name__)
 
@@ -71,6 +71,7 @@ class Node(QtCore.QObject):
         Node._instance_count += 1
 
         self._server = server
+        self._module = None
         self._initialized = False
         self._status = 0
 
@@ -150,6 +151,15 @@ class Node(QtCore.QObject):
 
         return self._server
 
+    def module(self):
+        """
+        Returns the module this node belongs to.
+
+        :returns: Module instance
+        """
+
+        return self._module
+
     def id(self):
         """
         Returns this node identifier.
@@ -261,6 +271,31 @@ class Node(QtCore.QObject):
 
         raise NotImplementedError()
 
+    def udpPortRequest(self, port_id):
+        """
+        Returns the request allocating an UDP port on the server.
+        Must be overloaded by nodes supporting UDP NIOs.
+
+        :param port_id: port identifier
+
+        :returns: (JSON-RPC method, params) tuple
+        """
+
+        raise NotImplementedError()
+
+    def allocateUDPPort(self, port_id):
+        """
+        Requests an UDP port allocation, allocate_udp_nio_signal
+        is emitted when the port is allocated. Ports prefetched
+        on the server are used when available.
+
+        :param port_id: port identifier
+        """
+
+        from .udp_port_pool import UDPPortPool
+        log.debug("{} is requesting an UDP port allocation".format(self.name()))
+        UDPPortPool.instance().allocate(self, port_id)
+
     def getNIOInfo(self, nio):
         """
         Returns NIO information for a specific NIO.
@@ -24,6 +24,7 @@ import shutil
 from gns3.qt import QtGui, QtCore
 from ..ui.general_preferences_page_ui import Ui_GeneralPreferencesPageWidget
 from ..settings import GRAPHICS_VIEW_SETTINGS, GENERAL_SETTINGS, PRECONFIGURED_TELNET_CONSOLE_COMMANDS, PRECONFIGURED_SERIAL_CONSOLE_COMMANDS, STYLES
+from ..settings import VIEWPORT_UPDATE_MODES, SCENE_INDEX_METHODS
 
 
 class GeneralPreferencesPage(QtGui.QWidget, Ui_GeneralPreferencesPageWidget):
@@ -60,6 +61,12 @@ class GeneralPreferencesPage(QtGui.QWidget, Ui_GeneralPreferencesPageWidget):
         self._default_label_color = QtGui.QColor(QtCore.Qt.black)
         self.uiStyleComboBox.addItems(STYLES)
 
+        # Load the rendering options
+        for mode, description in VIEWPORT_UPDATE_MODES:
+            self.uiViewportUpdateModeComboBox.addItem(description, mode)
+        for method, description in SCENE_INDEX_METHODS:
+            self.uiSceneIndexComboBox.addItem(description, method)
+
     def _projectsPathSlot(self):
         """
         Slot to select the projects directory path.
@@ -228,6 +235,15 @@ class GeneralPreferencesPage(QtGui.QWidget, Ui_GeneralPreferencesPageWidget):
         self.uiSceneHeightSpinBox.setValue(settings["scene_height"])
         self.uiRectangleSelectedItemCheckBox.setChecked(settings["draw_rectangle_selected_item"])
         self.uiDrawLinkStatusPointsCheckBox.setChecked(settings["draw_link_status_points"])
+        self.uiCacheSymbolPixmapsCheckBox.setChecked(settings["cache_symbol_pixmaps"])
+        self.uiLevelOfDetailCheckBox.setChecked(settings["level_of_detail"])
+        self.uiShowFPSCheckBox.setChecked(settings["show_fps"])
+        index = self.uiViewportUpdateModeComboBox.findData(settings["viewport_update_mode"])
+        if index != -1:
+            self.uiViewportUpdateModeComboBox.setCurrentIndex(index)
+        index = self.uiSceneIndexComboBox.findData(settings["scene_index"])
+        if index != -1:
+            self.uiSceneIndexComboBox.setCurrentIndex(index)
 
         qt_font = QtGui.QFont()
         if qt_font.fromString(settings["default_label_font"]):
@@ -277,6 +293,11 @@ class GeneralPreferencesPage(QtGui.QWidget, Ui_GeneralPreferencesPageWidget):
         new_settings["scene_height"] = self.uiSceneHeightSpinBox.value()
         new_settings["draw_rectangle_selected_item"] = self.uiRectangleSelectedItemCheckBox.isChecked()
         new_settings["draw_link_status_points"] = self.uiDrawLinkStatusPointsCheckBox.isChecked()
+        new_settings["cache_symbol_pixmaps"] = self.uiCacheSymbolPixmapsCheckBox.isChecked()
+        new_settings["level_of_detail"] = self.uiLevelOfDetailCheckBox.isChecked()
+        new_settings["show_fps"] = self.uiShowFPSCheckBox.isChecked()
+        new_settings["viewport_update_mode"] = self.uiViewportUpdateModeComboBox.itemData(self.uiViewportUpdateModeComboBox.currentIndex())
+        new_settings["scene_index"] = self.uiSceneIndexComboBox.itemData(self.uiSceneIndexComboBox.currentIndex())
         new_settings["default_label_font"] = self.uiDefaultLabelStylePlainTextEdit.font().toString()
         new_settings["default_label_color"] = self._default_label_color.name()
         MainWindow.instance().uiGraphicsView.setSettings(new_settings)
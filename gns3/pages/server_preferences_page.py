@@ -24,13 +24,14 @@ import sys
 from gns3.qt import QtNetwork, QtGui
 from ..ui.server_preferences_page_ui import Ui_ServerPreferencesPageWidget
 from ..servers import Servers
+from ..placement import PLACEMENT_POLICIES
 from ..topology import Topology
 from ..utils.message_box import MessageBox
 from ..utils.progress_dialog import ProgressDialog
-from ..utils.wait_for_connection_thread import WaitForConnectionThread
 from ..settings import DEFAULT_LOCAL_SERVER_PATH
 from ..settings import DEFAULT_LOCAL_SERVER_HOST
 from ..settings import DEFAULT_LOCAL_SERVER_PORT
+from ..settings import DEFAULT_REMOTE_SERVER_COMPRESSION
 
 
 class ServerPreferencesPage(QtGui.QWidget, Ui_ServerPreferencesPageWidget):
@@ -56,6 +57,12 @@ class ServerPreferencesPage(QtGui.QWidget, Ui_ServerPreferencesPageWidget):
         #FIXME: temporally hide test button
         self.uiTestSettingsPushButton.hide()
 
+        self.uiRemoteServerCompressionCheckBox.setChecked(DEFAULT_REMOTE_SERVER_COMPRESSION)
+
+        # policies choosing the remote server for new nodes
+        for name, policy in PLACEMENT_POLICIES.items():
+            self.uiPlacementPolicyComboBox.addItem(policy.description, name)
+
         # load all available addresses
         for address in QtNetwork.QNetworkInterface.allAddresses():
             address_string = address.toString()
@@ -112,6 +119,10 @@ class ServerPreferencesPage(QtGui.QWidget, Ui_ServerPreferencesPageWidget):
         port = int(item.text(1))
         self.uiRemoteServerPortLineEdit.setText(host)
         self.uiRemoteServerPortSpinBox.setValue(port)
+        remote_server = self._remote_servers.get("{host}:{port}".format(host=host, port=port))
+        if remote_server:
+            self.uiRemoteServerRamCapacitySpinBox.setValue(remote_server["ram_capacity"])
+            self.uiRemoteServerCompressionCheckBox.setChecked(remote_server["compression"])
 
     def _remoteServerChangedSlot(self):
         """
@@ -131,25 +142,54 @@ class ServerPreferencesPage(QtGui.QWidget, Ui_ServerPreferencesPageWidget):
 
         host = self.uiRemoteServerPortLineEdit.text()
         port = self.uiRemoteServerPortSpinBox.value()
+        ram_capacity = self.uiRemoteServerRamCapacitySpinBox.value()
+        compression = self.uiRemoteServerCompressionCheckBox.isChecked()
 
         # check if the remote server is already defined
         remote_server = "{host}:{port}".format(host=host, port=port)
         if remote_server in self._remote_servers:
-            QtGui.QMessageBox.critical(self, "Remote server", "Remote server {} is already defined.".format(remote_server))
+            remote_server_settings = self._remote_servers[remote_server]
+            if remote_server_settings["ram_capacity"] == ram_capacity and remote_server_settings["compression"] == compression:
+                QtGui.QMessageBox.critical(self, "Remote server", "Remote server {} is already defined.".format(remote_server))
+                return
+            # only update the RAM capacity and the compression
+            remote_server_settings["ram_capacity"] = ram_capacity
+            remote_server_settings["compression"] = compression
+            for index in range(self.uiRemoteServersTreeWidget.topLevelItemCount()):
+                item = self.uiRemoteServersTreeWidget.topLevelItem(index)
+                if item.text(0) == host and item.text(1) == str(port):
+                    item.setText(2, self._ramCapacityText(ram_capacity))
             return
 
         # add a new entry in the tree widget
         item = QtGui.QTreeWidgetItem(self.uiRemoteServersTreeWidget)
         item.setText(0, host)
         item.setText(1, str(port))
+        item.setText(2, self._ramCapacityText(ram_capacity))
 
         # keep track of this remote server
         self._remote_servers[remote_server] = {"host": host,
-                                               "port": port}
+                                               "port": port,
+                                               "ram_capacity": ram_capacity,
+                                               "compression": compression}
 
         self.uiRemoteServerPortSpinBox.setValue(self.uiRemoteServerPortSpinBox.value() + 1)
         self.uiRemoteServersTreeWidget.resizeColumnToContents(0)
 
+    @staticmethod
+    def _ramCapacityText(ram_capacity):
+        """
+        Returns the text representing a RAM capacity.
+
+        :param ram_capacity: RAM in MB (0 if unknown)
+
+        :returns: string
+        """
+
+        if not ram_capacity:
+            return "unknown"
+        return "{} MB".format(ram_capacity)
+
     def _remoteServerDeleteSlot(self):
         """
         Deletes a remote server.
@@ -188,13 +228,20 @@ class ServerPreferencesPage(QtGui.QWidget, Ui_ServerPreferencesPageWidget):
             host = server.host
             port = server.port
             self._remote_servers[server_id] = {"host": host,
-                                               "port": port}
+                                               "port": port,
+                                               "ram_capacity": server.ramCapacity(),
+                                               "compression": server.compression()}
             item = QtGui.QTreeWidgetItem(self.uiRemoteServersTreeWidget)
             item.setText(0, host)
             item.setText(1, str(port))
+            item.setText(2, self._ramCapacityText(server.ramCapacity()))
 
         self.uiRemoteServersTreeWidget.resizeColumnToContents(0)
 
+        index = self.uiPlacementPolicyComboBox.findData(servers.placementPolicy().name)
+        if index != -1:
+            self.uiPlacementPolicyComboBox.setCurrentIndex(index)
+
     def savePreferences(self):
         """
         Saves the server preferences.
@@ -245,7 +292,7 @@ class ServerPreferencesPage(QtGui.QWidget, Ui_ServerPreferencesPageWidget):
                     servers.stopLocalServer(wait=True)
                     #TODO: ASK if the user wants to start local server
                     if servers.startLocalServer(local_server_path, local_server_host, local_server_port):
-                        self._thread = WaitForConnectionThread(local_server_host, local_server_port)
+                        self._thread = servers.waitForLocalServerThread()
                         dialog = ProgressDialog(self._thread, "Local server", "Connecting...", "Cancel", busy=True, parent=self)
                         dialog.show()
                         dialog.exec_()
@@ -260,4 +307,5 @@ class ServerPreferencesPage(QtGui.QWidget, Ui_ServerPreferencesPageWidget):
 
         # save the remote server preferences
         servers.updateRemoteServers(self._remote_servers)
+        servers.setPlacementPolicy(self.uiPlacementPolicyComboBox.itemData(self.uiPlacementPolicyComboBox.currentIndex()))
         servers.save()
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Keeps track of the JSON-RPC requests waiting for a reply and expires
+the ones the server doesn't answer in time.
+"""
+
+import time
+import heapq
+
+from .qt import QtCore
+from . import jsonrpc
+
+import logging
+log = logging.getLogger(__name__)
+
+# error code given to callbacks when a request times out
+# (in the range reserved for implementation-defined server errors)
+REQUEST_TIMEOUT_ERROR_CODE = -32001
+
+# error code given to callbacks when the connection is lost before the reply
+CONNECTION_LOST_ERROR_CODE = -32002
+
+# default timeout in seconds for requests without a more specific timeout
+DEFAULT_REQUEST_TIMEOUT = 60
+
+# timeouts in seconds matched against the end of the method name,
+# the longest matching suffix wins.
+REQUEST_TIMEOUTS = {
+    ".create": 120,
+    ".start": 180,
+    ".reload": 180,
+    ".stop": 120,
+    ".export_config": 120,
+    ".idlepcs": 300,
+    ".auto_idlepc": 300,
+    ".start_capture": 120,
+}
+
+# expired requests are collected together when their deadlines
+# are less than this number of milliseconds apart
+COALESCING_DELAY = 250
+
+
+class PendingRequests(QtCore.QObject):
+    """
+    Table of the requests waiting for a reply, with their deadlines.
+    A single timer is armed for the closest deadline.
+
+    :param default_timeout: timeout in seconds for requests without a more specific timeout
+    :param timeouts: dictionary method name suffix -> timeout in seconds
+    :param metrics: ServerMetrics instance recording the expired requests (optional)
+    """
+
+    def __init__(self, default_timeout=DEFAULT_REQUEST_TIMEOUT, timeouts=None, metrics=None):
+
+        super(PendingRequests, self).__init__()
+        self._default_timeout = default_timeout
+        self._timeouts = dict(REQUEST_TIMEOUTS if timeouts is None else timeouts)
+        self._requests = {}
+        self._deadlines = []
+        self._expired = 0
+        self._metrics = metrics
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._expireSlot)
+        self._timer_deadline = None
+
+    def timeout(self, method):
+        """
+        Returns the timeout for a method.
+
+        :param method: JSON-RPC method name
+
+        :returns: timeout in seconds
+        """
+
+        timeout = self._default_timeout
+        matched = 0
+        for suffix, suffix_timeout in self._timeouts.items():
+            if len(suffix) > matched and method.endswith(suffix):
+                timeout = suffix_timeout
+                matched = len(suffix)
+        return timeout
+
+    def setTimeout(self, suffix, timeout):
+        """
+        Sets the timeout for the methods ending with a suffix.
+
+        :param suffix: method name suffix (e.g. ".start")
+        :param timeout: timeout in seconds
+        """
+
+        self._timeouts[suffix] = timeout
+
+    def add(self, request_id, method, callback, timeout=None):
+        """
+        Registers a request waiting for a reply.
+
+        :param request_id: JSON-RPC identifier
+        :param method: JSON-RPC method name
+        :param callback: callback to call with the reply
+        :param timeout: timeout in seconds (optional, depends on the method by default)
+        """
+
+        if timeout is None:
+            timeout = self.timeout(method)
+        now = time.monotonic()
+        deadline = now + timeout
+        self._requests[request_id] = (callback, method, now, deadline)
+        heapq.heappush(self._deadlines, (deadline, request_id))
+        self._armTimer()
+
+    def pop(self, request_id):
+        """
+        Unregisters a request because its reply has been received.
+
+        :param request_id: JSON-RPC identifier
+
+        :returns: callback or None if the request is unknown
+        (never sent, already replied or expired)
+        """
+
+        request = self.take(request_id)
+        if request is None:
+            return None
+        return request[0]
+
+    def take(self, request_id):
+        """
+        Unregisters a request because its reply has been received.
+
+        :param request_id: JSON-RPC identifier
+
+        :returns: (callback, method, round-trip time in seconds) tuple
+        or None if the request is unknown
+        """
+
+        request = self._requests.pop(request_id, None)
+        if request is None:
+            return None
+        if not self._requests:
+            self._deadlines = []
+            self._timer.stop()
+            self._timer_deadline = None
+        callback, method, sent, _ = request
+        return callback, method, time.monotonic() - sent
+
+    def __contains__(self, request_id):
+
+        return request_id in self._requests
+
+    def __len__(self):
+
+        return len(self._requests)
+
+    def count(self):
+        """
+        Returns the number of requests waiting for a reply.
+
+        :returns: integer
+        """
+
+        return len(self._requests)
+
+    def oldestAge(self):
+        """
+        Returns the time the oldest pending request has been waiting.
+
+        :returns: seconds (0 if there is no pending request)
+        """
+
+        if not self._requests:
+            return 0
+        now = time.monotonic()
+        return max(now - sent for _, _, sent, _ in self._requests.values())
+
+    def expiredCount(self):
+        """
+        Returns the number of requests that have timed out so far.
+
+        :returns: integer
+        """
+
+        return self._expired
+
+    def failAll(self, message, code=REQUEST_TIMEOUT_ERROR_CODE):
+        """
+        Fails all the pending requests, for instance
+        when the connection with the server is lost.
+
+        :param message: error message given to the callbacks
+        :param code: error code given to the callbacks
+        """
+
+        requests = self._requests
+        self._requests = {}
+        self._deadlines = []
+        self._timer.stop()
+        self._timer_deadline = None
+        for request_id, (callback, _, _, _) in requests.items():
+            callback(jsonrpc.JSONRPCCustomError(code, message, request_id).error, True)
+
+    def _armTimer(self):
+        """
+        Arms the timer for the closest deadline.
+        """
+
+        # drop the deadlines of requests already replied
+        while self._deadlines and self._deadlines[0][1] not in self._requests:
+            heapq.heappop(self._deadlines)
+
+        if not self._deadlines:
+            self._timer.stop()
+            self._timer_deadline = None
+            return
+
+        deadline = self._deadlines[0][0]
+        if self._timer.isActive() and self._timer_deadline is not None and self._timer_deadline <= deadline:
+            # the timer already fires earlier
+            return
+
+        self._timer_deadline = deadline
+        delay = max(0, int((deadline - time.monotonic()) * 1000))
+        self._timer.start(delay + COALESCING_DELAY)
+
+    def _expireSlot(self):
+        """
+        Slot called when the closest deadline has passed.
+        Gives a timeout error to all the expired requests.
+        """
+
+        self._timer_deadline = None
+        now = time.monotonic()
+        expired = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, request_id = heapq.heappop(self._deadlines)
+            request = self._requests.get(request_id)
+            if request is not None and request[3] <= now:
+                del self._requests[request_id]
+                expired.append((request_id, request))
+
+        for request_id, (callback, method, sent, _) in expired:
+            self._expired += 1
+            if self._metrics:
+                self._metrics.requestTimedOut(method)
+            message = "Request {} timed out after {:.0f} seconds".format(method, now - sent)
+            log.warning(message)
+            callback(jsonrpc.JSONRPCCustomError(REQUEST_TIMEOUT_ERROR_CODE, message, request_id).error, True)
+
+        self._armTimer()
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Placement policies choosing the remote server where a new node is created.
+"""
+
+from collections import OrderedDict
+
+import logging
+log = logging.getLogger(__name__)
+
+
+def serverLoad(server):
+    """
+    Returns the load of a server: the nodes created on it
+    and the RAM they have been allocated.
+
+    :param server: WebSocketClient instance
+
+    :returns: (node count, allocated RAM in MB) tuple
+    """
+
+    from .topology import Topology
+    nodes = Topology.instance().nodesByServer(server)
+    ram = 0
+    for node in nodes:
+        try:
+            ram += int(node.settings().get("ram") or 0)
+        except (NotImplementedError, AttributeError, TypeError, ValueError):
+            continue
+    return len(nodes), ram
+
+
+def serverLatency(server):
+    """
+    Returns the mean round-trip time of the requests sent to a server.
+
+    :param server: WebSocketClient instance
+
+    :returns: milliseconds or None if nothing has been measured yet
+    """
+
+    count = 0
+    total = 0.0
+    for histogram in server.metrics().latencies().values():
+        count += histogram.count
+        total += histogram.total
+    if not count:
+        return None
+    return total / count
+
+
+class PlacementPolicy(object):
+    """
+    Base placement policy.
+    """
+
+    name = None
+    description = None
+
+    def select(self, servers, ram=0):
+        """
+        Selects the server where a new node is created.
+
+        :param servers: list of WebSocketClient instances (not empty)
+        :param ram: RAM required by the new node in MB (0 if unknown)
+
+        :returns: WebSocketClient instance
+        """
+
+        raise NotImplementedError()
+
+
+class RoundRobinPolicy(PlacementPolicy):
+    """
+    Picks the servers one after the other.
+    """
+
+    name = "round_robin"
+    description = "Round-robin"
+
+    def __init__(self):
+
+        self._position = 0
+
+    def select(self, servers, ram=0):
+
+        server = servers[self._position % len(servers)]
+        self._position = (self._position + 1) % len(servers)
+        return server
+
+
+class LeastLoadedPolicy(PlacementPolicy):
+    """
+    Picks the server with the least RAM allocated to its nodes,
+    then with the fewest nodes.
+    """
+
+    name = "least_loaded"
+    description = "Least loaded (allocated RAM and node count)"
+
+    def select(self, servers, ram=0):
+
+        loads = {}
+        for server in servers:
+            node_count, allocated_ram = serverLoad(server)
+            loads[server] = (allocated_ram, node_count)
+        return min(servers, key=lambda server: loads[server])
+
+
+class WeightedCapacityPolicy(PlacementPolicy):
+    """
+    Picks the server with the lowest ratio of allocated RAM to RAM capacity,
+    servers without enough free RAM are only used if no other server fits.
+    Servers with an unknown capacity are given the mean capacity of the others.
+    """
+
+    name = "weighted_capacity"
+    description = "Weighted by RAM capacity"
+
+    def select(self, servers, ram=0):
+
+        capacities = [server.ramCapacity() for server in servers if server.ramCapacity()]
+        default_capacity = sum(capacities) / len(capacities) if capacities else 1
+
+        candidates = []
+        for server in servers:
+            capacity = server.ramCapacity() or default_capacity
+            node_count, allocated_ram = serverLoad(server)
+            usage = (allocated_ram + ram) / capacity
+            fits = not server.ramCapacity() or allocated_ram + ram <= capacity
+            candidates.append((not fits, usage, node_count, server))
+
+        best = min(candidates, key=lambda candidate: candidate[:3])
+        if best[0]:
+            log.warning("no remote server has {} MB of RAM available, using {}:{}".format(ram, best[3].host, best[3].port))
+        return best[3]
+
+
+class LatencyAwarePolicy(PlacementPolicy):
+    """
+    Picks the server answering requests the fastest, the least loaded
+    one among servers with a similar latency. Servers without
+    measurements are tried first so they get measured.
+    """
+
+    name = "latency_aware"
+    description = "Lowest latency"
+
+    # latencies less than this number of milliseconds apart are considered similar
+    TOLERANCE = 10
+
+    def select(self, servers, ram=0):
+
+        def key(server):
+            latency = serverLatency(server)
+            node_count, allocated_ram = serverLoad(server)
+            if latency is None:
+                return (0, allocated_ram, node_count)
+            return (int(latency // self.TOLERANCE) + 1, allocated_ram, node_count)
+
+        return min(servers, key=key)
+
+
+PLACEMENT_POLICIES = OrderedDict((policy.name, policy) for policy in (RoundRobinPolicy,
+                                                                      LeastLoadedPolicy,
+                                                                      WeightedCapacityPolicy,
+                                                                      LatencyAwarePolicy))
+
+
+def createPlacementPolicy(name):
+    """
+    Creates a placement policy.
+
+    :param name: policy name (round-robin is used if unknown)
+
+    :returns: PlacementPolicy instance
+    """
+
+    policy_class = PLACEMENT_POLICIES.get(name)
+    if policy_class is None:
+        log.warning("unknown placement policy {}, using round-robin".format(name))
+        policy_class = RoundRobinPolicy
+    return policy_class()
+
+
+# weight in MB given to nodes without RAM setting when distributing them
+DEFAULT_NODE_WEIGHT = 32
+
+
+def distributeNodes(nodes, links, servers):
+    """
+    Computes an assignment of nodes to servers minimizing the number
+    of links between nodes on different servers, with the RAM of the
+    nodes balanced according to the servers RAM capacity.
+    Builtin nodes (clouds and hosts) are bound to the machine they run on
+    and stay on their server, as do nodes not on one of the given servers.
+
+    :param nodes: list of Node instances
+    :param links: list of Link instances
+    :param servers: list of WebSocketClient instances to distribute the nodes on
+
+    :returns: dictionary node -> WebSocketClient instance
+    """
+
+    from .graph_partition import partitionGraph
+    from .modules.builtin import Builtin
+
+    capacities = [server.ramCapacity() for server in servers if server.ramCapacity()]
+    default_capacity = sum(capacities) / len(capacities) if capacities else 1
+
+    weights = {}
+    fixed = {}
+    for node in nodes:
+        if node.server() not in servers:
+            continue
+        try:
+            ram = int(node.settings().get("ram") or 0)
+        except (NotImplementedError, AttributeError, TypeError, ValueError):
+            ram = 0
+        weights[node] = ram or DEFAULT_NODE_WEIGHT
+        if isinstance(node.module(), Builtin):
+            fixed[node] = servers.index(node.server())
+
+    edges = {}
+    for link in links:
+        source, destination = link.sourceNode(), link.destinationNode()
+        if source in weights and destination in weights:
+            edges[(source, destination)] = edges.get((source, destination), 0) + 1
+
+    assignment = partitionGraph(weights,
+                                edges,
+                                [server.ramCapacity() or default_capacity for server in servers],
+                                fixed)
+    return {node: servers[part] for node, part in assignment.items()}
+
+
+def crossServerLinks(links, assignment=None):
+    """
+    Returns the number of links between nodes on different servers.
+
+    :param links: list of Link instances
+    :param assignment: dictionary node -> WebSocketClient instance overriding
+    the current server of the nodes (optional)
+
+    :returns: integer
+    """
+
+    assignment = assignment or {}
+    count = 0
+    for link in links:
+        source, destination = link.sourceNode(), link.destinationNode()
+        if assignment.get(source, source.server()) is not assignment.get(destination, destination.server()):
+            count += 1
+    return count
@@ -42,12 +42,6 @@ if DEFAULT_BINDING == 'PyQt':
     sys.modules[__name__ + '.QtNetwork'] = QtNetwork
     sys.modules[__name__ + '.QtSvg'] = QtSvg
 
-    try:
-        from PyQt4 import QtWebKit
-        sys.modules[__name__ + '.QtWebKit'] = QtWebKit
-    except ImportError:
-        pass
-
     QtCore.Signal = QtCore.pyqtSignal
     QtCore.Slot = QtCore.pyqtSlot
     QtCore.Property = QtCore.pyqtProperty
@@ -61,14 +55,28 @@ elif DEFAULT_BINDING == 'PySide':
     sys.modules[__name__ + '.QtNetwork'] = QtNetwork
     sys.modules[__name__ + '.QtSvg'] = QtSvg
 
-    try:
-        from PySide import QtWebKit
-        sys.modules[__name__ + '.QtWebKit'] = QtWebKit
-    except ImportError:
-        pass
-
     QtCore.QT_VERSION_STR = QtCore.__version__
     QtCore.BINDING_VERSION_STR = __version__
 
 else:
     raise ImportError("Python binding not specified.")
+
+
+def importWebKit():
+    """
+    Imports QtWebKit on first use, it is large and only
+    needed by the news and getting started web views.
+
+    :returns: QtWebKit module
+
+    :raises ImportError: if QtWebKit is not installed
+    """
+
+    module = sys.modules.get(__name__ + '.QtWebKit')
+    if module is None:
+        if DEFAULT_BINDING == 'PyQt':
+            from PyQt4 import QtWebKit as module
+        else:
+            from PySide import QtWebKit as module
+        sys.modules[__name__ + '.QtWebKit'] = module
+    return module
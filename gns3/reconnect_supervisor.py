@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Reconnects to the servers whose connection has been lost, with a jittered
+exponential backoff, and sends the module settings again once reconnected.
+"""
+
+import random
+import functools
+
+from .qt import QtCore
+
+import logging
+log = logging.getLogger(__name__)
+
+# delay in milliseconds before the first reconnection attempt
+RECONNECT_INITIAL_DELAY = 1000
+
+# maximum delay in milliseconds between two reconnection attempts
+RECONNECT_MAX_DELAY = 60000
+
+# number of attempts before giving up
+RECONNECT_MAX_ATTEMPTS = 10
+
+
+class ReconnectSupervisor(QtCore.QObject):
+    """
+    Supervises the connections lost with servers.
+    """
+
+    # server ID, number of attempts
+    reconnected_signal = QtCore.Signal(int, int)
+
+    # server ID, error message
+    gave_up_signal = QtCore.Signal(int, str)
+
+    def __init__(self):
+
+        QtCore.QObject.__init__(self)
+        self._attempts = {}
+        self._timers = {}
+        self._servers = {}
+        self._stopped = False
+
+    def connectionLost(self, server):
+        """
+        Starts reconnecting to a server.
+
+        :param server: WebSocketClient instance
+        """
+
+        if self._stopped or server.id() in self._servers:
+            return
+
+        log.info("will reconnect to server {}:{}".format(server.host, server.port))
+        self._servers[server.id()] = server
+        self._attempts[server.id()] = 0
+        server.setReconnecting(True)
+        self._scheduleAttempt(server)
+
+    def isReconnecting(self, server):
+        """
+        Returns either a server is being reconnected.
+
+        :param server: WebSocketClient instance
+
+        :returns: boolean
+        """
+
+        return server.id() in self._servers
+
+    def attempts(self, server):
+        """
+        Returns the number of reconnection attempts made to a server.
+
+        :param server: WebSocketClient instance
+
+        :returns: integer
+        """
+
+        return self._attempts.get(server.id(), 0)
+
+    @staticmethod
+    def delay(attempt):
+        """
+        Returns the delay before a reconnection attempt: a random
+        value up to an exponentially growing bound, so that clients
+        losing a server at the same time don't reconnect together.
+
+        :param attempt: attempt number (starting at 0)
+
+        :returns: delay in milliseconds
+        """
+
+        bound = min(RECONNECT_MAX_DELAY, RECONNECT_INITIAL_DELAY * 2 ** attempt)
+        return int(random.uniform(bound / 2, bound))
+
+    def _scheduleAttempt(self, server):
+        """
+        Schedules the next reconnection attempt.
+
+        :param server: WebSocketClient instance
+        """
+
+        delay = self.delay(self._attempts[server.id()])
+        log.debug("reconnecting to server {}:{} in {} ms".format(server.host, server.port, delay))
+        timer = self._timers.get(server.id())
+        if timer is None:
+            timer = self._timers[server.id()] = QtCore.QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(functools.partial(self._attemptSlot, server.id()))
+        timer.start(delay)
+
+    def _attemptSlot(self, server_id):
+        """
+        Slot called to make a reconnection attempt.
+
+        :param server_id: server identifier
+        """
+
+        server = self._servers.get(server_id)
+        if server is None:
+            return
+        self._attempts[server_id] += 1
+        log.info("reconnecting to server {}:{} (attempt {})".format(server.host, server.port, self._attempts[server_id]))
+        server.connectAsync(functools.partial(self._reconnectedCallback, server_id))
+
+    def _reconnectedCallback(self, server_id, result, error=False):
+        """
+        Called when a reconnection attempt is over.
+
+        :param server_id: server identifier
+        :param result: WebSocketClient instance or error dictionary
+        :param error: indicates an error
+        """
+
+        server = self._servers.get(server_id)
+        if server is None:
+            # stopped in the meantime
+            return
+
+        if error:
+            log.warning("could not reconnect to server {}:{}: {}".format(server.host, server.port, result["message"]))
+            if self._attempts[server_id] >= RECONNECT_MAX_ATTEMPTS:
+                self._forget(server)
+                server.failOutgoing("Could not reconnect to server {}:{}: {}".format(server.host, server.port, result["message"]))
+                self.gave_up_signal.emit(server_id, result["message"])
+            else:
+                self._scheduleAttempt(server)
+            return
+
+        attempts = self._attempts[server_id]
+        self._forget(server)
+        log.info("reconnected to server {}:{} after {} attempt(s)".format(server.host, server.port, attempts))
+        self._resynchronize(server)
+        self.reconnected_signal.emit(server_id, attempts)
+
+    def _resynchronize(self, server):
+        """
+        Sends the module settings again, the messages queued while
+        disconnected are sent after them in the same batch.
+
+        :param server: WebSocketClient instance
+        """
+
+        from .modules import MODULES
+        from .config_transfer import ConfigTransferService
+
+        # the server may have been restarted and lost the uploaded configs
+        ConfigTransferService.instance().forget(server)
+
+        server.startBatch()
+        # the server must have the settings before creating or updating nodes
+        queued = server.takeOutgoing()
+        try:
+            for module in MODULES:
+                module.instance().serverReconnected(server)
+        finally:
+            server.requeueOutgoing(queued)
+            server.endBatch()
+
+    def _forget(self, server):
+        """
+        Stops supervising a server.
+
+        :param server: WebSocketClient instance
+        """
+
+        self._servers.pop(server.id(), None)
+        self._attempts.pop(server.id(), None)
+        timer = self._timers.pop(server.id(), None)
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
+        server.setReconnecting(False)
+
+    def stop(self):
+        """
+        Stops all the reconnections, for instance when the application exits.
+        """
+
+        self._stopped = True
+        for server in list(self._servers.values()):
+            self._forget(server)
+            server.failOutgoing("Connection lost with server {}:{}".format(server.host, server.port))
+
+    @staticmethod
+    def instance():
+        """
+        Singleton to return only one instance of ReconnectSupervisor.
+
+        :returns: instance of ReconnectSupervisor
+        """
+
+        if not hasattr(ReconnectSupervisor, "_instance"):
+            ReconnectSupervisor._instance = ReconnectSupervisor()
+        return ReconnectSupervisor._instance
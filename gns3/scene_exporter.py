@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Exports the scene to PNG, SVG or PDF files region by region,
+so large topologies can be exported with bounded memory.
+"""
+
+import os
+import queue
+import struct
+import zlib
+import contextlib
+
+from .qt import QtCore, QtGui, QtSvg
+from .symbol_cache import SymbolCache
+from . import level_of_detail
+
+import logging
+log = logging.getLogger(__name__)
+
+# maximum memory (in bytes) used by a rendered PNG strip
+STRIP_MEMORY = 16 * 1024 * 1024
+
+# number of rendered strips waiting to be written
+QUEUE_SIZE = 2
+
+# size (in pixels) of the regions rendered in vector formats
+VECTOR_TILE_SIZE = 2048
+
+# formats exported region by region
+TILED_FORMATS = ("png", "svg", "pdf")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class ExportCancelled(Exception):
+    """
+    Raised when an export is cancelled.
+    """
+
+    pass
+
+
+class PNGWriter(object):
+    """
+    Writes a RGB PNG image row by row, without keeping
+    the whole image in memory.
+
+    :param stream: binary file object
+    :param width: image width
+    :param height: image height
+    """
+
+    def __init__(self, stream, width, height):
+
+        self._stream = stream
+        self._width = width
+        self._height = height
+        self._rows = 0
+        self._compressor = zlib.compressobj(6)
+        self._stream.write(PNG_SIGNATURE)
+        # 8 bits per channel, RGB, no interlacing
+        self._writeChunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _writeChunk(self, chunk_type, data):
+
+        self._stream.write(struct.pack(">I", len(data)))
+        self._stream.write(chunk_type)
+        self._stream.write(data)
+        self._stream.write(struct.pack(">I", zlib.crc32(chunk_type + data) & 0xffffffff))
+
+    def writeRows(self, rows):
+        """
+        Writes rows of pixels.
+
+        :param rows: iterable of rows, each row is width * 3 bytes (RGB)
+        """
+
+        data = []
+        for row in rows:
+            if len(row) != self._width * 3:
+                raise ValueError("row {} has {} bytes instead of {}".format(self._rows, len(row), self._width * 3))
+            # filter type none
+            data.append(b"\x00")
+            data.append(row)
+            self._rows += 1
+        compressed = self._compressor.compress(b"".join(data))
+        if compressed:
+            self._writeChunk(b"IDAT", compressed)
+
+    def close(self):
+        """
+        Writes the end of the image.
+        """
+
+        if self._rows != self._height:
+            raise ValueError("{} rows written instead of {}".format(self._rows, self._height))
+        self._writeChunk(b"IDAT", self._compressor.flush())
+        self._writeChunk(b"IEND", b"")
+
+
+def imageRows(image):
+    """
+    Returns the rows of pixels of an image.
+
+    :param image: QImage instance in RGB888 format
+
+    :returns: list of rows, each row is width * 3 bytes
+    """
+
+    bits = image.constBits()
+    if hasattr(bits, "asstring"):
+        # PyQt returns a sip.voidptr
+        data = bits.asstring(image.byteCount())
+    else:
+        data = bytes(bits)
+    row_size = image.width() * 3
+    stride = image.bytesPerLine()
+    return [data[offset:offset + row_size] for offset in range(0, stride * image.height(), stride)]
+
+
+class PNGWriterThread(QtCore.QThread):
+    """
+    Thread compressing and writing the rendered strips
+    while the next ones are rendered.
+
+    :param path: path to the PNG file
+    :param width: image width
+    :param height: image height
+    """
+
+    def __init__(self, path, width, height):
+
+        QtCore.QThread.__init__(self)
+        self._path = path
+        self._width = width
+        self._height = height
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._error = None
+
+    def write(self, image):
+        """
+        Queues a rendered strip, blocks if the writer is late
+        so the number of strips in memory stays bounded.
+
+        :param image: QImage instance in RGB888 format or None
+        to finish the image
+        """
+
+        self._queue.put(image)
+
+    def error(self):
+        """
+        Returns the error that stopped the writer.
+
+        :returns: error message or None
+        """
+
+        return self._error
+
+    def run(self):
+        """
+        Thread starting point.
+        """
+
+        try:
+            with open(self._path, "wb") as f:
+                writer = PNGWriter(f, self._width, self._height)
+                while True:
+                    image = self._queue.get()
+                    if image is None:
+                        break
+                    writer.writeRows(imageRows(image))
+                writer.close()
+        except (OSError, ValueError) as e:
+            self._error = str(e)
+            # unblock the renderer
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+
+class SceneExporter(object):
+    """
+    Exports a scene region by region.
+
+    :param scene: QGraphicsScene instance
+    :param rect: scene region to export (QRectF), the items bounding
+    rectangle plus a margin by default
+    :param scale: scale factor of the exported image
+    """
+
+    def __init__(self, scene, rect=None, scale=1.0):
+
+        self._scene = scene
+        if rect is None:
+            rect = scene.itemsBoundingRect().adjusted(-20.0, -20.0, 20.0, 20.0)
+        self._rect = rect
+        self._scale = scale
+        self._cancelled = False
+
+    def size(self):
+        """
+        Returns the size of the exported image.
+
+        :returns: QSize instance
+        """
+
+        return QtCore.QSize(max(1, int(round(self._rect.width() * self._scale))),
+                            max(1, int(round(self._rect.height() * self._scale))))
+
+    def cancel(self):
+        """
+        Cancels the export, can be called from the progress callback.
+        """
+
+        self._cancelled = True
+
+    def wasCancelled(self):
+        """
+        Returns either the last export has been cancelled.
+
+        :returns: boolean
+        """
+
+        return self._cancelled
+
+    def export(self, path, progress_callback=None):
+        """
+        Exports the scene, the file format is given by the extension.
+
+        :param path: path to the file
+        :param progress_callback: called with the number of regions
+        rendered and the total number of regions, the export is
+        cancelled if it returns False
+
+        :returns: True if the file has been written, False if the export
+        has been cancelled or has failed
+        """
+
+        self._cancelled = False
+        file_format = os.path.splitext(path)[1][1:].lower()
+        if file_format not in TILED_FORMATS:
+            log.error("cannot export the scene to {} files".format(file_format))
+            return False
+
+        try:
+            if file_format == "png":
+                self._exportPNG(path, progress_callback)
+            else:
+                self._exportVector(path, file_format, progress_callback)
+        except ExportCancelled:
+            log.info("export to {} cancelled".format(path))
+        except OSError as e:
+            log.error("could not export to {}: {}".format(path, e))
+        else:
+            return True
+
+        # remove the incomplete file
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return False
+
+    def _progress(self, progress_callback, done, total):
+        """
+        Reports the progress and checks for cancellation.
+        """
+
+        if progress_callback is not None and progress_callback(done, total) is False:
+            self._cancelled = True
+        if self._cancelled:
+            raise ExportCancelled()
+
+    def _renderRegion(self, painter, target, y, height, x=0, width=None):
+        """
+        Renders a region of the scene at a position on the painter.
+
+        :param painter: QPainter instance
+        :param target: QRectF instance, where to render on the painter
+        :param x, y: region offset in the exported image
+        :param width, height: region size in the exported image
+        """
+
+        if width is None:
+            width = self.size().width()
+        source = QtCore.QRectF(self._rect.x() + x / self._scale,
+                               self._rect.y() + y / self._scale,
+                               width / self._scale,
+                               height / self._scale)
+        self._scene.render(painter, target, source, QtCore.Qt.IgnoreAspectRatio)
+
+    @staticmethod
+    def _setRenderHints(painter):
+
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+        painter.setRenderHint(QtGui.QPainter.TextAntialiasing, True)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, True)
+
+    def _exportPNG(self, path, progress_callback):
+        """
+        Renders horizontal strips of the scene and streams them
+        to a PNG writer thread.
+        """
+
+        size = self.size()
+        strip_height = max(1, min(size.height(), STRIP_MEMORY // (size.width() * 4)))
+        total = (size.height() + strip_height - 1) // strip_height
+
+        writer = PNGWriterThread(path, size.width(), size.height())
+        writer.start()
+        try:
+            for index, y in enumerate(range(0, size.height(), strip_height)):
+                self._progress(progress_callback, index, total)
+                if writer.error():
+                    break
+                height = min(strip_height, size.height() - y)
+                image = QtGui.QImage(size.width(), height, QtGui.QImage.Format_RGB32)
+                image.fill(QtGui.QColor(QtCore.Qt.white).rgb())
+                painter = QtGui.QPainter(image)
+                self._setRenderHints(painter)
+                self._renderRegion(painter, QtCore.QRectF(0, 0, size.width(), height), y, height)
+                painter.end()
+                writer.write(image.convertToFormat(QtGui.QImage.Format_RGB888))
+            else:
+                self._progress(progress_callback, total, total)
+        except ExportCancelled:
+            # let the writer exit, the file is removed afterwards
+            writer.write(None)
+            writer.wait()
+            raise
+        writer.write(None)
+        writer.wait()
+        if writer.error():
+            raise OSError(writer.error())
+
+    @contextlib.contextmanager
+    def _fullDetail(self):
+        """
+        Context manager drawing the items at full detail and without
+        rasterized symbols, whatever the view zoom and cache settings.
+        """
+
+        symbol_cache = SymbolCache.instance()
+        pixmaps_enabled = symbol_cache.pixmapsEnabled()
+        lod_enabled = level_of_detail.isEnabled()
+        scene_level = None
+        if hasattr(self._scene, "setLevelOfDetail"):
+            scene_level = self._scene.levelOfDetail()
+            self._scene.setLevelOfDetail(level_of_detail.FULL)
+        symbol_cache.setPixmapsEnabled(False)
+        level_of_detail.setEnabled(False)
+        try:
+            yield
+        finally:
+            level_of_detail.setEnabled(lod_enabled)
+            symbol_cache.setPixmapsEnabled(pixmaps_enabled)
+            if scene_level is not None:
+                self._scene.setLevelOfDetail(scene_level)
+
+    def _exportVector(self, path, file_format, progress_callback):
+        """
+        Renders the scene in square regions into a SVG or PDF file,
+        the items crossing several regions are clipped in each of them.
+        """
+
+        size = self.size()
+        if file_format == "svg":
+            device = QtSvg.QSvgGenerator()
+            device.setFileName(path)
+            device.setSize(size)
+            device.setViewBox(QtCore.QRect(0, 0, size.width(), size.height()))
+            device.setTitle("GNS3 topology")
+        else:
+            device = QtGui.QPrinter(QtGui.QPrinter.HighResolution)
+            device.setOutputFormat(QtGui.QPrinter.PdfFormat)
+            device.setOutputFileName(path)
+            device.setFullPage(True)
+            device.setPaperSize(QtCore.QSizeF(size), QtGui.QPrinter.Point)
+
+        painter = QtGui.QPainter()
+        if not painter.begin(device):
+            raise OSError("cannot write {}".format(path))
+        try:
+            with self._fullDetail():
+                self._setRenderHints(painter)
+                if file_format == "pdf":
+                    page = device.pageRect()
+                    painter.scale(page.width() / size.width(), page.height() / size.height())
+                regions = [(x, y) for y in range(0, size.height(), VECTOR_TILE_SIZE)
+                           for x in range(0, size.width(), VECTOR_TILE_SIZE)]
+                for index, (x, y) in enumerate(regions):
+                    self._progress(progress_callback, index, len(regions))
+                    width = min(VECTOR_TILE_SIZE, size.width() - x)
+                    height = min(VECTOR_TILE_SIZE, size.height() - y)
+                    target = QtCore.QRectF(x, y, width, height)
+                    painter.save()
+                    painter.setClipRect(target)
+                    self._renderRegion(painter, target, y, height, x, width)
+                    painter.restore()
+                self._progress(progress_callback, len(regions), len(regions))
+        finally:
+            painter.end()
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Metrics collected on a connection with a server: request round-trip
+times per method, traffic and heartbeat jitter.
+"""
+
+import time
+import bisect
+from collections import OrderedDict
+
+# upper bounds in milliseconds of the latency histogram buckets
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class LatencyHistogram(object):
+    """
+    Histogram of latencies using fixed buckets.
+    """
+
+    __slots__ = ("_buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+
+        # the last bucket holds latencies above the highest bound
+        self._buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, latency):
+        """
+        Records a latency.
+
+        :param latency: latency in milliseconds
+        """
+
+        self._buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.count += 1
+        self.total += latency
+        if self.min is None or latency < self.min:
+            self.min = latency
+        if self.max is None or latency > self.max:
+            self.max = latency
+
+    def mean(self):
+        """
+        Returns the mean latency.
+
+        :returns: milliseconds (0 if nothing has been recorded)
+        """
+
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, percent):
+        """
+        Returns an estimate of a latency percentile:
+        the upper bound of the bucket containing it.
+
+        :param percent: percentile (0-100)
+
+        :returns: milliseconds (0 if nothing has been recorded)
+        """
+
+        if not self.count:
+            return 0.0
+        rank = self.count * percent / 100.0
+        seen = 0
+        for index, count in enumerate(self._buckets):
+            seen += count
+            if seen >= rank and count:
+                if index < len(LATENCY_BUCKETS):
+                    return float(min(LATENCY_BUCKETS[index], self.max))
+                return float(self.max)
+        return float(self.max)
+
+    def buckets(self):
+        """
+        Returns the non-empty buckets.
+
+        :returns: list of (upper bound in milliseconds or None for the last bucket, count) tuples
+        """
+
+        bounds = list(LATENCY_BUCKETS) + [None]
+        return [(bound, count) for bound, count in zip(bounds, self._buckets) if count]
+
+
+class ServerMetrics(object):
+    """
+    Metrics for a connection with a server.
+    """
+
+    def __init__(self):
+
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all the metrics.
+        """
+
+        self._latencies = OrderedDict()
+        self._timeouts = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.frames_in = 0
+        self.frames_out = 0
+        # message sizes before and after compression
+        self.uncompressed_in = 0
+        self.compressed_in = 0
+        self.uncompressed_out = 0
+        self.compressed_out = 0
+        self._heartbeat_interval = None
+        self._last_heartbeat = None
+        self._heartbeat_count = 0
+        self._heartbeat_jitter_total = 0.0
+        self._heartbeat_jitter_max = 0.0
+        self._start_time = time.monotonic()
+
+    def requestCompleted(self, method, rtt):
+        """
+        Records the round-trip time of a request.
+
+        :param method: JSON-RPC method name
+        :param rtt: round-trip time in seconds
+        """
+
+        histogram = self._latencies.get(method)
+        if histogram is None:
+            histogram = self._latencies[method] = LatencyHistogram()
+        histogram.add(rtt * 1000)
+
+    def requestTimedOut(self, method):
+        """
+        Records a request the server didn't answer in time.
+
+        :param method: JSON-RPC method name
+        """
+
+        self._timeouts[method] = self._timeouts.get(method, 0) + 1
+
+    def dataReceived(self, size):
+        """
+        Records data read from the server socket.
+
+        :param size: size in bytes, as received (compressed or not)
+        """
+
+        self.bytes_in += size
+
+    def messageReceived(self):
+        """
+        Records a message received from the server.
+        """
+
+        self.frames_in += 1
+
+    def dataSent(self, size):
+        """
+        Records a frame sent to the server.
+
+        :param size: frame size in bytes
+        """
+
+        self.frames_out += 1
+        self.bytes_out += size
+
+    def messageCompressed(self, size, compressed_size):
+        """
+        Records a message compressed before being sent.
+
+        :param size: message size in bytes
+        :param compressed_size: compressed size in bytes
+        """
+
+        self.uncompressed_out += size
+        self.compressed_out += compressed_size
+
+    def messageDecompressed(self, compressed_size, size):
+        """
+        Records a compressed message received from the server.
+
+        :param compressed_size: compressed size in bytes
+        :param size: message size in bytes
+        """
+
+        self.compressed_in += compressed_size
+        self.uncompressed_in += size
+
+    def compressionRatio(self):
+        """
+        Returns the compression ratio of the messages sent and received.
+
+        :returns: tuple (ratio in, ratio out), 1 when nothing has been compressed
+        """
+
+        ratio_in = self.uncompressed_in / self.compressed_in if self.compressed_in else 1.0
+        ratio_out = self.uncompressed_out / self.compressed_out if self.compressed_out else 1.0
+        return ratio_in, ratio_out
+
+    def setHeartbeatInterval(self, interval):
+        """
+        Sets the expected interval between heartbeats.
+
+        :param interval: interval in milliseconds
+        """
+
+        self._heartbeat_interval = interval / 1000.0
+        self._last_heartbeat = None
+
+    def heartbeatSent(self):
+        """
+        Records a heartbeat, the jitter is the difference between
+        the actual and the expected interval since the previous one.
+        """
+
+        now = time.monotonic()
+        if self._last_heartbeat is not None and self._heartbeat_interval:
+            jitter = abs(now - self._last_heartbeat - self._heartbeat_interval) * 1000
+            self._heartbeat_count += 1
+            self._heartbeat_jitter_total += jitter
+            self._heartbeat_jitter_max = max(self._heartbeat_jitter_max, jitter)
+        self._last_heartbeat = now
+
+    def heartbeatJitter(self):
+        """
+        Returns the heartbeat jitter.
+
+        :returns: (mean, max) tuple in milliseconds
+        """
+
+        if not self._heartbeat_count:
+            return 0.0, 0.0
+        return self._heartbeat_jitter_total / self._heartbeat_count, self._heartbeat_jitter_max
+
+    def latencies(self):
+        """
+        Returns the round-trip time histograms.
+
+        :returns: dictionary method name -> LatencyHistogram instance
+        """
+
+        return self._latencies
+
+    def timeouts(self):
+        """
+        Returns the number of requests that timed out.
+
+        :returns: dictionary method name -> count
+        """
+
+        return self._timeouts
+
+    def dump(self):
+        """
+        Returns a representation of the metrics.
+
+        :returns: dictionary
+        """
+
+        jitter_mean, jitter_max = self.heartbeatJitter()
+        ratio_in, ratio_out = self.compressionRatio()
+        methods = {}
+        for method, histogram in self._latencies.items():
+            methods[method] = {"count": histogram.count,
+                               "mean_ms": round(histogram.mean(), 2),
+                               "p50_ms": histogram.percentile(50),
+                               "p95_ms": histogram.percentile(95),
+                               "max_ms": round(histogram.max, 2),
+                               "timeouts": self._timeouts.get(method, 0)}
+        for method, count in self._timeouts.items():
+            if method not in methods:
+                methods[method] = {"count": 0, "timeouts": count}
+
+        return {"uptime": round(time.monotonic() - self._start_time),
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "frames_in": self.frames_in,
+                "frames_out": self.frames_out,
+                "compression_ratio_in": round(ratio_in, 2),
+                "compression_ratio_out": round(ratio_out, 2),
+                "heartbeat_jitter_mean_ms": round(jitter_mean, 2),
+                "heartbeat_jitter_max_ms": round(jitter_max, 2),
+                "methods": methods}
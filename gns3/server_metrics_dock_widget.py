@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Dock widget showing the metrics collected on the server connections.
+"""
+
+from .qt import QtGui, QtCore
+from .servers import Servers
+
+import logging
+log = logging.getLogger(__name__)
+
+# refresh interval in milliseconds while the dock is visible
+REFRESH_INTERVAL = 2000
+
+
+def formatBytes(size):
+    """
+    Returns a human readable size.
+
+    :param size: size in bytes
+
+    :returns: string
+    """
+
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return "{:.0f} {}".format(size, unit)
+        size /= 1024.0
+    return "{:.1f} GB".format(size)
+
+
+class ServerMetricsDockWidget(QtGui.QDockWidget):
+    """
+    :param parent: parent widget
+    """
+
+    def __init__(self, parent):
+
+        QtGui.QDockWidget.__init__(self, parent)
+        self.setObjectName("uiServerMetricsDockWidget")
+        self.setWindowTitle("Server metrics")
+
+        self.uiMetricsTreeWidget = QtGui.QTreeWidget(self)
+        self.uiMetricsTreeWidget.setHeaderLabels(["Server / method", "Requests", "Mean", "p95", "Max", "Timeouts"])
+        self.uiMetricsTreeWidget.setRootIsDecorated(True)
+        self.uiMetricsTreeWidget.setAlternatingRowColors(True)
+        self.setWidget(self.uiMetricsTreeWidget)
+
+        self._expanded = set()
+        self._refresh_timer = QtCore.QTimer(self)
+        self._refresh_timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._visibilityChangedSlot)
+
+    def _visibilityChangedSlot(self, visible):
+        """
+        Slot for visibility changed signal, metrics
+        are only refreshed while the dock is visible.
+
+        :param visible: either the dock is visible or not
+        """
+
+        if visible:
+            self.refresh()
+            self._refresh_timer.start(REFRESH_INTERVAL)
+        else:
+            self._refresh_timer.stop()
+
+    def refresh(self):
+        """
+        Refreshes the metrics.
+        """
+
+        tree = self.uiMetricsTreeWidget
+        for index in range(tree.topLevelItemCount()):
+            item = tree.topLevelItem(index)
+            if item.isExpanded():
+                self._expanded.add(item.text(0))
+            else:
+                self._expanded.discard(item.text(0))
+        tree.clear()
+
+        for server in Servers.instance().servers():
+            metrics = server.metrics()
+            pending = server.pendingRequests()
+            jitter_mean, jitter_max = metrics.heartbeatJitter()
+            name = "{}:{}".format(server.host, server.port)
+            server_item = QtGui.QTreeWidgetItem(tree, [name,
+                                                       str(pending.count()),
+                                                       "", "", "",
+                                                       str(pending.expiredCount())])
+            server_item.setToolTip(0, "in: {} ({} frames), out: {} ({} frames)\n"
+                                      "pending: {} (oldest {:.1f}s)\n"
+                                      "heartbeat jitter: mean {:.1f}ms, max {:.1f}ms".format(formatBytes(metrics.bytes_in),
+                                                                                             metrics.frames_in,
+                                                                                             formatBytes(metrics.bytes_out),
+                                                                                             metrics.frames_out,
+                                                                                             pending.count(),
+                                                                                             pending.oldestAge(),
+                                                                                             jitter_mean,
+                                                                                             jitter_max))
+            QtGui.QTreeWidgetItem(server_item, ["Traffic in", "{} frames".format(metrics.frames_in), formatBytes(metrics.bytes_in)])
+            QtGui.QTreeWidgetItem(server_item, ["Traffic out", "{} frames".format(metrics.frames_out), formatBytes(metrics.bytes_out)])
+            if server.compressionActive():
+                ratio_in, ratio_out = metrics.compressionRatio()
+                QtGui.QTreeWidgetItem(server_item, ["Compression ratio", "", "in {:.1f}x".format(ratio_in), "", "out {:.1f}x".format(ratio_out)])
+            QtGui.QTreeWidgetItem(server_item, ["Heartbeat jitter", "", "{:.1f}ms".format(jitter_mean), "", "{:.1f}ms".format(jitter_max)])
+
+            timeouts = metrics.timeouts()
+            latencies = metrics.latencies()
+            for method in sorted(latencies, key=lambda method: latencies[method].total, reverse=True):
+                histogram = latencies[method]
+                QtGui.QTreeWidgetItem(server_item, [method,
+                                                    str(histogram.count),
+                                                    "{:.1f}ms".format(histogram.mean()),
+                                                    "{:.0f}ms".format(histogram.percentile(95)),
+                                                    "{:.1f}ms".format(histogram.max),
+                                                    str(timeouts.get(method, 0))])
+            server_item.setExpanded(name in self._expanded)
+
+        for column in range(tree.columnCount()):
+            tree.resizeColumnToContents(column)
@@ -20,22 +20,35 @@ Keeps track of all the local and remote servers and their settings.
 """
 
 import os
+import re
 import sys
 import shlex
 import signal
 import socket
 import subprocess
 import ssl
+import threading
+from collections import deque
 from .qt import QtCore
 from .websocket_client import WebSocketClient, SecureWebSocketClient
+from .placement import createPlacementPolicy
 from .settings import DEFAULT_LOCAL_SERVER_PATH
 from .settings import DEFAULT_LOCAL_SERVER_HOST
 from .settings import DEFAULT_LOCAL_SERVER_PORT
 from .settings import DEFAULT_HEARTBEAT_FREQ
+from .settings import DEFAULT_PLACEMENT_POLICY
+from .settings import DEFAULT_REMOTE_SERVER_COMPRESSION
+from .utils.wait_for_connection_thread import WaitForConnectionThread
 
 import logging
 log = logging.getLogger(__name__)
 
+# number of output lines of the local server kept in memory
+LOCAL_SERVER_OUTPUT_LINES = 200
+
+# line printed by the local server when it starts listening
+LOCAL_SERVER_READY_LINE = re.compile(r"Starting server on|Running on|[Ll]istening on")
+
 
 class Servers(QtCore.QObject):
     """
@@ -55,8 +68,11 @@ class Servers(QtCore.QObject):
         self._local_server_auto_start = True
         self._local_server_allow_console_from_anywhere = False
         self._local_server_proccess = None
+        self._local_server_address = None
+        self._local_server_ready = threading.Event()
+        self._local_server_output = deque(maxlen=LOCAL_SERVER_OUTPUT_LINES)
+        self._placement_policy = createPlacementPolicy(DEFAULT_PLACEMENT_POLICY)
         self._settings = self._loadSettings()
-        self._remote_server_iter_pos = 0
 
     def _loadSettings(self):
         """
@@ -95,9 +111,16 @@ class Servers(QtCore.QObject):
             settings.setArrayIndex(index)
             host = settings.value("host", "")
             port = settings.value("port", 0, type=int)
+            ram_capacity = settings.value("ram_capacity", 0, type=int)
+            compression = settings.value("compression", DEFAULT_REMOTE_SERVER_COMPRESSION, type=bool)
             if host and port:
-                self._addRemoteServer(host, port)
+                server = self._addRemoteServer(host, port)
+                server.setRamCapacity(ram_capacity)
+                server.setCompression(compression)
         settings.endArray()
+
+        # load the placement policy for new nodes on remote servers
+        self._placement_policy = createPlacementPolicy(settings.value("placement_policy", DEFAULT_PLACEMENT_POLICY))
         settings.endGroup()
         return settings
 
@@ -126,8 +149,11 @@ class Servers(QtCore.QObject):
             settings.setArrayIndex(index)
             settings.setValue("host", server.host)
             settings.setValue("port", server.port)
+            settings.setValue("ram_capacity", server.ramCapacity())
+            settings.setValue("compression", server.compression())
             index += 1
         settings.endArray()
+        settings.setValue("placement_policy", self._placement_policy.name)
         settings.endGroup()
 
     def localServerAutoStart(self):
@@ -161,7 +187,14 @@ class Servers(QtCore.QObject):
 
     def startLocalServer(self, path, host, port):
         """
-        Starts the local server process.
+        Starts the local server process, its output is read
+        by a thread to know when it is ready.
+
+        :param path: path to the local server
+        :param host: host or address of the server
+        :param port: port of the server (integer)
+
+        :returns: boolean
         """
 
         command = '"{executable}" --host={host} --port={port} --console_bind_to_any={bind}'.format(executable=path,
@@ -189,17 +222,77 @@ class Servers(QtCore.QObject):
         try:
             if sys.platform.startswith("win"):
                 # use the string on Windows
-                self._local_server_proccess = subprocess.Popen(command, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+                self._local_server_proccess = subprocess.Popen(command,
+                                                               stdout=subprocess.PIPE,
+                                                               stderr=subprocess.STDOUT,
+                                                               creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
             else:
                 # use arguments on other platforms
                 args = shlex.split(command)
-                self._local_server_proccess = subprocess.Popen(args)
+                self._local_server_proccess = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
         except OSError as e:
             log.warning('could not start local server "{}": {}'.format(command, e))
             return False
 
+        self._local_server_address = (host, port)
+        self._local_server_ready = threading.Event()
+        self._local_server_output.clear()
+        reader = threading.Thread(target=self._readLocalServerOutput,
+                                  args=(self._local_server_proccess.stdout, self._local_server_ready),
+                                  name="local server output")
+        reader.daemon = True
+        reader.start()
         return True
 
+    def _readLocalServerOutput(self, stream, ready_event):
+        """
+        Reads the local server output until the process exits.
+        The lines are kept in memory and logged until the server is ready,
+        the pipe must be drained afterwards so the server never blocks.
+
+        :param stream: stdout of the local server process
+        :param ready_event: threading.Event set once the server is ready or has exited
+        """
+
+        try:
+            for line in iter(stream.readline, b""):
+                line = line.decode("utf-8", errors="replace").rstrip()
+                self._local_server_output.append(line)
+                if not ready_event.is_set():
+                    log.info("local server: {}".format(line))
+                    if LOCAL_SERVER_READY_LINE.search(line):
+                        ready_event.set()
+        except (OSError, ValueError) as e:
+            log.debug("stopped reading the local server output: {}".format(e))
+        finally:
+            stream.close()
+            # wake up anyone waiting for the server
+            ready_event.set()
+
+    def localServerOutput(self):
+        """
+        Returns the last lines printed by the local server.
+
+        :returns: list of lines
+        """
+
+        return list(self._local_server_output)
+
+    def waitForLocalServerThread(self):
+        """
+        Returns a thread waiting for the started local server to accept
+        connections. It is woken up by the ready line printed by the server
+        and probes the port with an exponential backoff meanwhile.
+
+        :returns: WaitForConnectionThread instance
+        """
+
+        if self._local_server_address is None:
+            host, port = self._local_server.host, self._local_server.port
+        else:
+            host, port = self._local_server_address
+        return WaitForConnectionThread(host, port, process=self._local_server_proccess, ready_event=self._local_server_ready)
+
     def stopLocalServer(self, wait=False):
 
         if self._local_server and self._local_server.connected() and not sys.platform.startswith('win'):
@@ -265,6 +358,7 @@ class Servers(QtCore.QObject):
         server_socket = "{host}:{port}".format(host=host, port=port)
         url = "ws://{server_socket}".format(server_socket=server_socket)
         server = WebSocketClient(url)
+        server.setCompression(DEFAULT_REMOTE_SERVER_COMPRESSION)
         self._remote_servers[server_socket] = server
         log.info("new remote server connection {} registered".format(url))
         return server
@@ -301,12 +395,16 @@ class Servers(QtCore.QObject):
 
         for server_id, server in servers.items():
             if server_id in self._remote_servers:
+                self._remote_servers[server_id].setRamCapacity(server.get("ram_capacity", 0))
+                self._remote_servers[server_id].setCompression(server.get("compression", DEFAULT_REMOTE_SERVER_COMPRESSION))
                 continue
 
             host = server["host"]
             port = server["port"]
             url = "ws://{host}:{port}".format(host=host, port=port)
             new_server = WebSocketClient(url)
+            new_server.setRamCapacity(server.get("ram_capacity", 0))
+            new_server.setCompression(server.get("compression", DEFAULT_REMOTE_SERVER_COMPRESSION))
             self._remote_servers[server_id] = new_server
             log.info("new remote server connection {} registered".format(url))
 
@@ -370,32 +468,87 @@ class Servers(QtCore.QObject):
             return value
         return None
 
+    def placementPolicy(self):
+        """
+        Returns the policy choosing the remote server for new nodes.
+
+        :returns: PlacementPolicy instance
+        """
+
+        return self._placement_policy
+
+    def setPlacementPolicy(self, name):
+        """
+        Sets the policy choosing the remote server for new nodes.
+
+        :param name: policy name
+        """
+
+        if name != self._placement_policy.name:
+            self._placement_policy = createPlacementPolicy(name)
+            log.info("placement policy for new nodes is now {}".format(self._placement_policy.name))
+
+    def allocateRemoteServer(self, ram=0):
+        """
+        Chooses the remote server where a new node is created.
+
+        :param ram: RAM required by the new node in MB (0 if unknown)
+
+        :returns: remote server (WebSocketClient instance) or None
+        """
+
+        if not self._remote_servers:
+            return None
+
+        return self._placement_policy.select(list(self._remote_servers.values()), ram)
+
     def __iter__(self):
         """
-        Creates a round-robin system to pick up a remote server.
+        Iterating picks up remote servers using the placement policy.
         """
 
         return self
 
     def __next__(self):
         """
-        Returns the next available remote server.
+        Returns the remote server chosen by the placement policy.
 
         :returns: remote server (WebSocketClient instance)
         """
 
-        if not self._remote_servers:
-            return None
+        return self.allocateRemoteServer()
 
-        server_ids = list(self._remote_servers.keys())
-        server_id = server_ids[self._remote_server_iter_pos]
+    def servers(self):
+        """
+        Returns the local, remote and cloud servers.
 
-        if self._remote_server_iter_pos < len(server_ids) - 1:
-            self._remote_server_iter_pos += 1
-        else:
-            self._remote_server_iter_pos = 0
+        :returns: list of WebSocketClient instances
+        """
+
+        servers = []
+        if self._local_server:
+            servers.append(self._local_server)
+        servers.extend(self._remote_servers.values())
+        servers.extend(self._cloud_servers.values())
+        return servers
+
+    def startBatch(self):
+        """
+        Starts grouping the messages sent to all servers,
+        each server receives them in a single JSON-RPC batch
+        when endBatch() is called.
+        """
+
+        for server in self.servers():
+            server.startBatch()
+
+    def endBatch(self):
+        """
+        Sends the messages grouped since startBatch() to all servers.
+        """
 
-        return self._remote_servers[server_id]
+        for server in self.servers():
+            server.endBatch()
 
     def save(self):
         """
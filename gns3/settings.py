@@ -200,6 +200,15 @@ if sys.platform.startswith("win") and "PROGRAMFILES(X86)" in os.environ and os.p
 
 STYLES = ["Charcoal (default)", "Legacy"]
 
+# graphics view rendering options (setting value, description)
+VIEWPORT_UPDATE_MODES = [("smart", "Smart (default)"),
+                         ("minimal", "Minimal"),
+                         ("bounding_rect", "Bounding rectangle"),
+                         ("full", "Full")]
+
+SCENE_INDEX_METHODS = [("bsp", "BSP tree (default)"),
+                       ("none", "No index")]
+
 GENERAL_SETTINGS = {
     "projects_path": DEFAULT_PROJECTS_PATH,
     "images_path": DEFAULT_IMAGES_PATH,
@@ -216,6 +225,8 @@ GENERAL_SETTINGS = {
     "bring_console_to_front": True,
     "delay_console_all": 500,
     "default_local_news": False,
+    "topology_load_window": 10,
+    "json_codec": "json",
 }
 
 GENERAL_SETTING_TYPES = {
@@ -234,6 +245,8 @@ GENERAL_SETTING_TYPES = {
     "bring_console_to_front": bool,
     "delay_console_all": int,
     "default_local_news": bool,
+    "topology_load_window": int,
+    "json_codec": str,
 }
 
 GRAPHICS_VIEW_SETTINGS = {
@@ -243,6 +256,11 @@ GRAPHICS_VIEW_SETTINGS = {
     "draw_link_status_points": True,
     "default_label_font": "TypeWriter,10,-1,5,75,0,0,0,0,0",
     "default_label_color": "#000000",
+    "cache_symbol_pixmaps": True,
+    "level_of_detail": True,
+    "viewport_update_mode": "smart",
+    "scene_index": "bsp",
+    "show_fps": False,
 }
 
 GRAPHICS_VIEW_SETTING_TYPES = {
@@ -252,6 +270,11 @@ GRAPHICS_VIEW_SETTING_TYPES = {
     "draw_link_status_points": bool,
     "default_label_font": str,
     "default_label_color": str,
+    "cache_symbol_pixmaps": bool,
+    "level_of_detail": bool,
+    "viewport_update_mode": str,
+    "scene_index": str,
+    "show_fps": bool,
 }
 
 PACKET_CAPTURE_SETTINGS = {
@@ -308,3 +331,9 @@ CLOUD_PROVIDERS = {
 
 # heartbeat_freq is in milliseconds
 DEFAULT_HEARTBEAT_FREQ = 60000
+
+# permessage-deflate compression offered to remote servers by default
+DEFAULT_REMOTE_SERVER_COMPRESSION = True
+
+# policy choosing the remote server where new nodes are created
+DEFAULT_PLACEMENT_POLICY = "round_robin"
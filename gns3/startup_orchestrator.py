@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Runs the startup steps (server connections, update check, analytics)
+in the background so the main window is usable immediately.
+"""
+
+import os
+import socket
+import platform
+import threading
+import time
+import functools
+from collections import OrderedDict
+
+from .qt import QtCore, QtGui
+from .servers import Servers
+from .version import __version__
+from .utils.analytics import AnalyticsClient
+from .utils.message_box import MessageBox
+
+import logging
+log = logging.getLogger(__name__)
+
+# automatic check for update every week (in seconds)
+UPDATE_CHECK_INTERVAL = 604800
+
+
+class StartupOrchestrator(QtCore.QObject):
+    """
+    Connects the local and remote servers concurrently
+    and records how long each startup step takes.
+
+    :param main_window: MainWindow instance
+    """
+
+    # emitted once all the steps are over
+    finished_signal = QtCore.Signal()
+
+    # emitted from other threads when a step is over
+    _step_done_signal = QtCore.Signal(str, float)
+
+    def __init__(self, main_window):
+
+        QtCore.QObject.__init__(self, main_window)
+        self._main_window = main_window
+        self._started = {}
+        self._timings = OrderedDict()
+        self._wait_thread = None
+        self._finished = False
+        self._step_done_signal.connect(self._stepDoneSlot)
+
+    def start(self):
+        """
+        Starts all the steps, returns immediately.
+        """
+
+        self._begin("startup")
+        self._connectLocalServer()
+        self._connectRemoteServers()
+        self._checkForUpdate()
+        self._sendAnalytics()
+        self._end("startup")
+
+    def timings(self):
+        """
+        Returns the duration of the startup steps.
+
+        :returns: OrderedDict of step name and duration in seconds
+        """
+
+        return self._timings
+
+    def pendingSteps(self):
+        """
+        Returns the steps still running.
+
+        :returns: list of step names
+        """
+
+        return list(self._started)
+
+    def _begin(self, step):
+
+        self._started[step] = time.time()
+
+    def _end(self, step):
+
+        begin = self._started.pop(step, None)
+        if begin is not None:
+            self._stepDoneSlot(step, time.time() - begin)
+
+    def _stepDoneSlot(self, step, duration):
+        """
+        Records the duration of a step.
+
+        :param step: step name
+        :param duration: duration in seconds
+        """
+
+        self._started.pop(step, None)
+        self._timings[step] = duration
+        log.debug("startup step {} done in {:.3f}s".format(step, duration))
+        if not self._started and not self._finished:
+            self._finished = True
+            log.info("startup done: {}".format(", ".join("{} {:.3f}s".format(name, duration)
+                                                          for name, duration in self._timings.items())))
+            self.finished_signal.emit()
+
+    def _connectLocalServer(self):
+        """
+        Connects to the local server, starts it if needed.
+        """
+
+        server = Servers.instance().localServer()
+        if server.connected():
+            return
+
+        self._begin("local server bind check")
+        try:
+            # check if the local address still exists
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.bind((server.host, 0))
+        except OSError as e:
+            self._end("local server bind check")
+            QtGui.QMessageBox.critical(self._main_window, "Local server", "Could not bind with {host}: {error} (please check your host binding setting)".format(host=server.host, error=e))
+            return
+        self._end("local server bind check")
+
+        self._begin("local server connection")
+        server.connectAsync(self._localServerConnectedCallback)
+
+    def _localServerConnectedCallback(self, result, error=False):
+        """
+        Called when the connection to an already started local server is over.
+
+        :param result: WebSocketClient instance or error dictionary
+        :param error: indicates an error
+        """
+
+        servers = Servers.instance()
+        server = servers.localServer()
+        if error and result["errno"] and servers.localServerAutoStart() and servers.localServerPath():
+            # begins before the connection step ends, so the startup isn't seen as over in between
+            self._begin("local server start")
+        self._end("local server connection")
+        if not error:
+            log.info("use an already started local server on {}:{}".format(server.host, server.port))
+            return
+
+        if not result["errno"]:
+            # not a normal OSError, thrown from the Websocket client.
+            MessageBox(self._main_window, "Local server", "Something other than a GNS3 server is already running on {} port {}, please adjust the local server port setting".format(server.host,
+                                                                                                                                                                                    server.port),
+                       result["message"])
+            return
+
+        if not servers.localServerAutoStart():
+            return
+
+        local_server_path = servers.localServerPath()
+        if not local_server_path:
+            log.info("no local server is configured")
+            return
+
+        if not os.path.isfile(local_server_path):
+            self._end("local server start")
+            QtGui.QMessageBox.critical(self._main_window, "Local server", "Could not find local server {}".format(local_server_path))
+            return
+
+        elif not os.access(local_server_path, os.X_OK):
+            self._end("local server start")
+            QtGui.QMessageBox.critical(self._main_window, "Local server", "{} is not an executable".format(local_server_path))
+            return
+
+        log.info("starting local server {} on {}:{}".format(local_server_path, server.host, server.port))
+        if not servers.startLocalServer(local_server_path, server.host, server.port):
+            self._end("local server start")
+            QtGui.QMessageBox.critical(self._main_window, "Local server", "Could not start the local server process: {}".format(local_server_path))
+            return
+
+        self._main_window.uiStatusBar.showMessage("Connecting to the local server on {}:{}...".format(server.host, server.port))
+        self._wait_thread = servers.waitForLocalServerThread()
+        self._wait_thread.completed.connect(self._localServerStartedSlot)
+        self._wait_thread.error.connect(self._localServerStartErrorSlot)
+        self._wait_thread.start()
+
+    def _localServerStartedSlot(self):
+        """
+        Slot called when the started local server accepts connections.
+        """
+
+        self._wait_thread.wait()
+        self._begin("local server connection")
+        self._end("local server start")
+        Servers.instance().localServer().connectAsync(self._startedLocalServerConnectedCallback)
+
+    def _localServerStartErrorSlot(self, message, stop=False):
+        """
+        Slot called when the started local server doesn't accept connections.
+
+        :param message: error message
+        """
+
+        self._wait_thread.wait()
+        self._end("local server start")
+        self._main_window.uiStatusBar.clearMessage()
+        output = Servers.instance().localServerOutput()
+        if output:
+            MessageBox(self._main_window, "Local server", message, "\n".join(output))
+        else:
+            QtGui.QMessageBox.critical(self._main_window, "Local server", message)
+
+    def _startedLocalServerConnectedCallback(self, result, error=False):
+        """
+        Called when the connection to the started local server is over.
+
+        :param result: WebSocketClient instance or error dictionary
+        :param error: indicates an error
+        """
+
+        self._end("local server connection")
+        self._main_window.uiStatusBar.clearMessage()
+        if error:
+            server = Servers.instance().localServer()
+            QtGui.QMessageBox.critical(self._main_window, "Local server", "Could not connect to the local server {host} on port {port}: {error}".format(host=server.host,
+                                                                                                                                                        port=server.port,
+                                                                                                                                                        error=result["message"]))
+
+    def _connectRemoteServers(self):
+        """
+        Connects to all the remote servers at the same time.
+        """
+
+        for server in Servers.instance().remoteServers().values():
+            if server.connected():
+                continue
+            step = "remote server {}:{} connection".format(server.host, server.port)
+            self._begin(step)
+            server.connectAsync(self._remoteServerConnectedCallback(server, step))
+
+    def _remoteServerConnectedCallback(self, server, step):
+        """
+        Returns the callback for a remote server connection, failures are
+        only logged: the connection is made again when the server is used.
+
+        :param server: WebSocketClient instance
+        :param step: step name
+
+        :returns: callback
+        """
+
+        def callback(result, error=False):
+            self._end(step)
+            if error:
+                log.warning("could not connect to remote server {}:{}: {}".format(server.host, server.port, result["message"]))
+                self._main_window.uiStatusBar.showMessage("Could not connect to remote server {}:{}".format(server.host, server.port), 5000)
+        return callback
+
+    def _checkForUpdate(self):
+        """
+        Checks for an update once a week, the request is asynchronous.
+        """
+
+        settings = self._main_window.settings()
+        if not settings["check_for_update"]:
+            return
+
+        current_epoch = int(time.mktime(time.localtime()))
+        if current_epoch - settings["last_check_for_update"] >= UPDATE_CHECK_INTERVAL:
+            # let's check for an update, the step ends with the reply
+            self._begin("update check")
+            self._main_window._checkForUpdateActionSlot(silent=True, callback=functools.partial(self._end, "update check"))
+            settings["last_check_for_update"] = current_epoch
+            self._main_window.setSettings(settings)
+
+    def _sendAnalytics(self):
+        """
+        Sends the analytics event from a background thread.
+        """
+
+        self._begin("analytics")
+        thread = threading.Thread(target=self._analyticsThread, name="analytics")
+        thread.daemon = True
+        thread.start()
+
+    def _analyticsThread(self):
+        """
+        Analytics thread starting point.
+        """
+
+        begin = time.time()
+        AnalyticsClient().send_event("GNS3", "Open", "Version {} on {}".format(__version__, platform.system()))
+        self._step_done_signal.emit("analytics", time.time() - begin)
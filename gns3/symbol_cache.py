@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Cache of the SVG renderers used to draw the node symbols: each symbol
+is parsed once and its renderer is shared by all the items using it.
+Symbols can also be rasterized once per zoom level.
+"""
+
+from .qt import QtCore, QtGui, QtSvg
+
+import logging
+log = logging.getLogger(__name__)
+
+# size of the pixmap cache in KB (Qt default is 10 MB)
+PIXMAP_CACHE_LIMIT = 20480
+
+# zoom levels are rounded to this step to limit the number of rasterized copies
+ZOOM_STEP = 0.125
+
+# paint engines drawing pixels, the others (SVG, PDF, printers) keep vector graphics
+RASTER_PAINT_ENGINES = (QtGui.QPaintEngine.Raster, QtGui.QPaintEngine.OpenGL, QtGui.QPaintEngine.OpenGL2)
+
+
+def isRasterPainter(painter):
+    """
+    Returns either a painter draws on a raster device (image, pixmap or widget),
+    the symbols must not be rasterized on vector devices.
+
+    :param painter: QPainter instance
+
+    :returns: boolean
+    """
+
+    engine = painter.paintEngine()
+    return engine is not None and engine.type() in RASTER_PAINT_ENGINES
+
+
+class SymbolCache(object):
+    """
+    Reference-counted SVG renderers keyed by symbol path or resource.
+    """
+
+    def __init__(self):
+
+        self._renderers = {}
+        self._references = {}
+        self._pixmap_keys = {}
+        self._pixmaps_enabled = True
+        self._parsed = 0
+        QtGui.QPixmapCache.setCacheLimit(max(QtGui.QPixmapCache.cacheLimit(), PIXMAP_CACHE_LIMIT))
+
+    def acquire(self, path):
+        """
+        Returns the renderer for a symbol, parsing the symbol
+        if no item uses it yet. Each call must be balanced
+        by a call to release().
+
+        :param path: symbol path or resource
+
+        :returns: QSvgRenderer instance or None if the symbol is not valid
+        """
+
+        renderer = self._renderers.get(path)
+        if renderer is None:
+            renderer = QtSvg.QSvgRenderer(path)
+            self._parsed += 1
+            if not renderer.isValid():
+                log.warning("invalid symbol {}".format(path))
+                return None
+            renderer.setObjectName(path)
+            self._renderers[path] = renderer
+            self._references[path] = 0
+        self._references[path] += 1
+        return renderer
+
+    def release(self, path):
+        """
+        Releases a symbol, it is evicted when no item uses it anymore.
+
+        :param path: symbol path or resource
+        """
+
+        references = self._references.get(path)
+        if references is None:
+            return
+        if references > 1:
+            self._references[path] = references - 1
+            return
+        log.debug("evicting symbol {}".format(path))
+        del self._references[path]
+        del self._renderers[path]
+        for key in self._pixmap_keys.pop(path, ()):
+            QtGui.QPixmapCache.remove(key)
+
+    def references(self, path):
+        """
+        Returns the number of items using a symbol.
+
+        :param path: symbol path or resource
+
+        :returns: integer
+        """
+
+        return self._references.get(path, 0)
+
+    def setPixmapsEnabled(self, enabled):
+        """
+        Enables or disables the rasterization of the symbols.
+
+        :param enabled: boolean
+        """
+
+        self._pixmaps_enabled = enabled
+        if not enabled:
+            self._clearPixmaps()
+
+    def pixmapsEnabled(self):
+        """
+        Returns either the symbols are rasterized.
+
+        :returns: boolean
+        """
+
+        return self._pixmaps_enabled
+
+    def pixmap(self, renderer, size, zoom):
+        """
+        Returns a symbol rasterized for a zoom level.
+
+        :param renderer: QSvgRenderer instance returned by acquire()
+        :param size: QSizeF instance, size of the item in scene coordinates
+        :param zoom: view scale factor
+
+        :returns: QPixmap instance or None if the symbol cannot be rasterized
+        """
+
+        path = renderer.objectName()
+        zoom = max(ZOOM_STEP, round(zoom / ZOOM_STEP) * ZOOM_STEP)
+        width = int(round(size.width() * zoom))
+        height = int(round(size.height() * zoom))
+        if not path or width <= 0 or height <= 0:
+            return None
+
+        key = "symbol:{}:{}x{}".format(path, width, height)
+        pixmap = QtGui.QPixmap()
+        if QtGui.QPixmapCache.find(key, pixmap):
+            return pixmap
+
+        pixmap = QtGui.QPixmap(width, height)
+        pixmap.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(pixmap)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        renderer.render(painter)
+        painter.end()
+        QtGui.QPixmapCache.insert(key, pixmap)
+        self._pixmap_keys.setdefault(path, set()).add(key)
+        return pixmap
+
+    def _clearPixmaps(self):
+
+        for keys in self._pixmap_keys.values():
+            for key in keys:
+                QtGui.QPixmapCache.remove(key)
+        self._pixmap_keys.clear()
+
+    def clear(self):
+        """
+        Drops all the symbols, when all the items have been removed.
+        """
+
+        self._renderers.clear()
+        self._references.clear()
+        self._clearPixmaps()
+
+    def stats(self):
+        """
+        Returns cache statistics.
+
+        :returns: dictionary
+        """
+
+        return {"symbols": len(self._renderers),
+                "references": sum(self._references.values()),
+                "parsed": self._parsed,
+                "pixmaps": sum(len(keys) for keys in self._pixmap_keys.values())}
+
+    @staticmethod
+    def instance():
+        """
+        Singleton to return only one instance of SymbolCache.
+
+        :returns: instance of SymbolCache
+        """
+
+        if not hasattr(SymbolCache, "_instance"):
+            SymbolCache._instance = SymbolCache()
+        return SymbolCache._instance
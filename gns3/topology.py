@@ -21,15 +21,19 @@ Handles the saving and loading of a topology.
 """
 
 import os
+import contextlib
+from collections import OrderedDict
 
-from .qt import QtCore, QtGui, QtSvg
+from .qt import QtGui
 from .items.node_item import NodeItem
-from .items.link_item import LinkItem
 from .items.note_item import NoteItem
 from .items.rectangle_item import RectangleItem
 from .items.ellipse_item import EllipseItem
 from .items.image_item import ImageItem
 from .servers import Servers
+from .config_transfer import ConfigTransferService
+from .topology_loader import TopologyLoader
+from .udp_port_pool import UDPPortPool
 from .modules import MODULES
 from .modules.module_error import ModuleError
 from .utils.message_box import MessageBox
@@ -76,16 +80,118 @@ class Topology(object):
 
     def __init__(self):
 
-        self._nodes = []
-        self._links = []
+        # nodes and links are indexed by their identifiers,
+        # OrderedDict keeps the insertion order for dumps.
+        self._nodes = OrderedDict()
+        self._links = OrderedDict()
+        self._nodes_by_name = {}
+        self._nodes_by_server = {}
+        self._nodes_by_module = {}
         self._notes = []
         self._rectangles = []
         self._ellipses = []
         self._images = []
         self._topology = None
-        self._initialized_nodes = []
+        self._initialized_nodes = set()
         self._resources_type = "local"
         self._instances = []
+        self._instances_by_id = {}
+        self._loader = None
+        self._bulk_depth = 0
+        self._deferred = OrderedDict()
+
+    def beginBulk(self):
+        """
+        Starts a bulk operation: until it ends, the refreshes
+        requested with defer() run only once and the views
+        are not repainted. Bulk operations can be nested.
+        """
+
+        if self._bulk_depth == 0:
+            self._setViewUpdatesEnabled(False)
+        self._bulk_depth += 1
+
+    def endBulk(self):
+        """
+        Ends a bulk operation, the deferred refreshes are run
+        when the outermost bulk operation ends.
+        """
+
+        if not self._bulk_depth:
+            log.warning("no bulk operation to end")
+            return
+        self._bulk_depth -= 1
+        if self._bulk_depth:
+            return
+
+        log.debug("bulk operation ended, running {} deferred refreshes".format(len(self._deferred)))
+        # refreshes can defer other refreshes while running
+        self._bulk_depth += 1
+        try:
+            while self._deferred:
+                deferred = self._deferred
+                self._deferred = OrderedDict()
+                for callback in deferred.values():
+                    try:
+                        callback()
+                    except RuntimeError as e:
+                        # the Qt object has been deleted during the bulk operation
+                        log.debug("skipping deferred refresh: {}".format(e))
+        finally:
+            self._bulk_depth -= 1
+            self._setViewUpdatesEnabled(True)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Context manager wrapping a bulk operation.
+        """
+
+        self.beginBulk()
+        try:
+            yield self
+        finally:
+            self.endBulk()
+
+    def inBulk(self):
+        """
+        Returns either a bulk operation is in progress.
+
+        :returns: boolean
+        """
+
+        return self._bulk_depth > 0
+
+    def defer(self, callback):
+        """
+        Defers a refresh until the end of the bulk operation in progress,
+        a callback deferred several times only runs once.
+
+        :param callback: callback without argument (e.g. a bound method)
+
+        :returns: True if the callback has been deferred, False if
+        there is no bulk operation and it must run now
+        """
+
+        if not self._bulk_depth:
+            return False
+        if callback not in self._deferred:
+            self._deferred[callback] = callback
+        return True
+
+    def _setViewUpdatesEnabled(self, enabled):
+        """
+        Enables or disables the repaint of the topology views.
+
+        :param enabled: boolean
+        """
+
+        from .main_window import MainWindow
+        if not hasattr(MainWindow, "_instance"):
+            return
+        main_window = MainWindow.instance()
+        main_window.uiGraphicsView.viewport().setUpdatesEnabled(enabled)
+        main_window.uiTopologySummaryTreeWidget.setUpdatesEnabled(enabled)
 
     def addNode(self, node):
         """
@@ -94,8 +200,10 @@ class Topology(object):
         :param node: Node instance
         """
 
-        #self._topology.add_node(node)
-        self._nodes.append(node)
+        self._nodes[node.id()] = node
+        self._nodes_by_name[node.name()] = node
+        self._nodes_by_server.setdefault(node.server(), OrderedDict())[node.id()] = node
+        self._nodes_by_module.setdefault(node.module(), OrderedDict())[node.id()] = node
 
     def removeNode(self, node):
         """
@@ -104,8 +212,21 @@ class Topology(object):
         :param node: Node instance
         """
 
-        if node in self._nodes:
-            self._nodes.remove(node)
+        node_id = node.id()
+        if self._nodes.get(node_id) is not node:
+            return
+
+        del self._nodes[node_id]
+        if self._nodes_by_name.get(node.name()) is node:
+            del self._nodes_by_name[node.name()]
+        for index, key in ((self._nodes_by_server, node.server()), (self._nodes_by_module, node.module())):
+            nodes = index.get(key)
+            if nodes is not None:
+                nodes.pop(node_id, None)
+                if not nodes:
+                    del index[key]
+        self._initialized_nodes.discard(node_id)
+        UDPPortPool.instance().discardNode(node)
 
     def getNode(self, node_id):
         """
@@ -114,10 +235,56 @@ class Topology(object):
         :returns: Node instance or None
         """
 
-        for node in self._nodes:
-            if node.id() == node_id:
-                return node
-        return None
+        return self._nodes.get(node_id)
+
+    def getNodeByName(self, name):
+        """
+        Lookups for a node using its name.
+
+        Names are allocated asynchronously and can be changed by the user,
+        the name index is rebuilt when it doesn't match anymore.
+
+        :param name: node name
+
+        :returns: Node instance or None
+        """
+
+        node = self._nodes_by_name.get(name)
+        if node is not None and node.name() == name and node.id() in self._nodes:
+            return node
+
+        self._nodes_by_name = {}
+        for node in self._nodes.values():
+            self._nodes_by_name[node.name()] = node
+        return self._nodes_by_name.get(name)
+
+    def nodesByServer(self, server):
+        """
+        Returns all the nodes running on a server.
+
+        :param server: WebSocketClient instance
+
+        :returns: list of Node instances
+        """
+
+        nodes = self._nodes_by_server.get(server)
+        if nodes is None:
+            return []
+        return list(nodes.values())
+
+    def nodesByModule(self, module):
+        """
+        Returns all the nodes handled by a module.
+
+        :param module: Module instance
+
+        :returns: list of Node instances
+        """
+
+        nodes = self._nodes_by_module.get(module)
+        if nodes is None:
+            return []
+        return list(nodes.values())
 
     def addLink(self, link):
         """
@@ -126,8 +293,7 @@ class Topology(object):
         :param link: Link instance
         """
 
-        #self._topology.add_node(node)
-        self._links.append(link)
+        self._links[link.id()] = link
 
     def removeLink(self, link):
         """
@@ -136,8 +302,8 @@ class Topology(object):
         :param link: Link instance
         """
 
-        if link in self._links:
-            self._links.remove(link)
+        if self._links.get(link.id()) is link:
+            del self._links[link.id()]
 
     def getLink(self, link_id):
         """
@@ -146,10 +312,7 @@ class Topology(object):
         :returns: Link instance or None
         """
 
-        for link in self._links:
-            if link.id() == link_id:
-                return link
-        return None
+        return self._links.get(link_id)
 
     def addNote(self, note):
         """
@@ -237,10 +400,11 @@ class Topology(object):
                              private_key=private_key, public_key=public_key, host=host,
                              port=port, ssl_ca=ssl_ca, ssl_ca_file=ssl_ca_file)
 
-        self._instances.append(i)
+        self.addInstance2(i)
 
     def addInstance2(self, topology_instance):
         self._instances.append(topology_instance)
+        self._instances_by_id.setdefault(topology_instance.id, topology_instance)
 
     def removeInstance(self, id):
         """
@@ -249,9 +413,15 @@ class Topology(object):
         :param name: the name of the instance
         """
 
-        for instance in self._instances:
-            if instance.id == id:
-                self._instances.remove(instance)
+        instance = self._instances_by_id.pop(id, None)
+        if instance is None:
+            return
+
+        self._instances.remove(instance)
+        # another instance may share the same identifier
+        for other_instance in self._instances:
+            if other_instance.id == id:
+                self._instances_by_id[id] = other_instance
                 break
 
     def getInstance(self, id):
@@ -262,9 +432,7 @@ class Topology(object):
         :return: a TopologyInstance object
         """
 
-        for instance in self._instances:
-            if instance.id == id:
-                return instance
+        return self._instances_by_id.get(id)
 
     def anyInstance(self):
         # For now, just return the first instance
@@ -273,16 +441,20 @@ class Topology(object):
     def nodes(self):
         """
         Returns all the nodes in this topology.
+
+        :returns: list of Node instances
         """
 
-        return self._nodes
+        return list(self._nodes.values())
 
     def links(self):
         """
         Returns all the links in this topology.
+
+        :returns: list of Link instances
         """
 
-        return self._links
+        return list(self._links.values())
 
     def notes(self):
         """
@@ -324,16 +496,27 @@ class Topology(object):
         Resets this topology.
         """
 
-        #self._topology.clear()
+        if self._loader:
+            self._loader.cancel()
+            self._loader = None
         self._links.clear()
         self._nodes.clear()
+        self._nodes_by_name.clear()
+        self._nodes_by_server.clear()
+        self._nodes_by_module.clear()
         self._notes.clear()
         self._rectangles.clear()
         self._ellipses.clear()
         self._images.clear()
         self._initialized_nodes.clear()
+        # the deferred refreshes are bound to the removed nodes and items,
+        # a bulk operation in progress still ends normally
+        self._deferred.clear()
+        UDPPortPool.instance().reset()
+        ConfigTransferService.instance().clear()
         self._resources_type = "local"
         self._instances = []
+        self._instances_by_id = {}
         log.info("topology has been reset")
 
     def _dump_gui_settings(self, topology):
@@ -347,32 +530,36 @@ class Topology(object):
         main_window = MainWindow.instance()
         view = main_window.uiGraphicsView
 
+        scene = view.scene()
         if "nodes" in topology["topology"]:
-            for item in view.scene().items():
-                if isinstance(item, NodeItem):
-                    for node in topology["topology"]["nodes"]:
-                        if node["id"] == item.node().id():
-                            node["x"] = item.x()
-                            node["y"] = item.y()
-                            if item.zValue() != 1.0:
-                                node["z"] = item.zValue()
-                            if item.label():
-                                node["label"] = item.label().dump()
-                            default_symbol_path = item.defaultRenderer().objectName()
-                            if default_symbol_path:
-                                node["default_symbol"] = default_symbol_path
-                            hover_symbol_path = item.hoverRenderer().objectName()
-                            if hover_symbol_path:
-                                node["hover_symbol"] = hover_symbol_path
-                if isinstance(item, LinkItem):
-                    for link in topology["topology"]["links"]:
-                        if link["id"] == item.link().id():
-                            source_port_label = item.sourcePort().label()
-                            destination_port_label = item.destinationPort().label()
-                            if source_port_label:
-                                link["source_port_label"] = source_port_label.dump()
-                            if destination_port_label:
-                                link["destination_port_label"] = destination_port_label.dump()
+            for node in topology["topology"]["nodes"]:
+                item = scene.nodeItem(node["id"])
+                if item is None:
+                    continue
+                node["x"] = item.x()
+                node["y"] = item.y()
+                if item.zValue() != 1.0:
+                    node["z"] = item.zValue()
+                if item.label():
+                    node["label"] = item.label().dump()
+                default_symbol_path = item.defaultSymbol()
+                if default_symbol_path != item.node().defaultSymbol():
+                    node["default_symbol"] = default_symbol_path
+                hover_symbol_path = item.hoverSymbol()
+                if hover_symbol_path != item.node().hoverSymbol():
+                    node["hover_symbol"] = hover_symbol_path
+
+        if "links" in topology["topology"]:
+            for link in topology["topology"]["links"]:
+                item = scene.linkItem(link["id"])
+                if item is None:
+                    continue
+                source_port_label = item.sourcePort().label()
+                destination_port_label = item.destinationPort().label()
+                if source_port_label:
+                    link["source_port_label"] = source_port_label.dump()
+                if destination_port_label:
+                    link["destination_port_label"] = destination_port_label.dump()
 
         # notes
         if self._notes:
@@ -428,7 +615,7 @@ class Topology(object):
         # nodes
         if self._nodes:
             topology_nodes = topology["topology"]["nodes"] = []
-            for node in self._nodes:
+            for node in self._nodes.values():
                 if node.server().id() not in servers:
                     servers[node.server().id()] = node.server()
                 log.info("saving node: {}".format(node.name()))
@@ -437,7 +624,7 @@ class Topology(object):
         # links
         if self._links:
             topology_links = topology["topology"]["links"] = []
-            for link in self._links:
+            for link in self._links.values():
                 log.info("saving {}".format(str(link)))
                 topology_links.append(link.dump())
 
@@ -482,15 +669,20 @@ class Topology(object):
             log.warn("not a topology file")
             return
 
-        # deactivate the unsaved state support
+        # deactivate the unsaved state support until all nodes and links are created
         main_window.ignoreUnsavedState(True)
-        # trick: no matter what, reactivate the unsaved state support after 3 seconds
-        QtCore.QTimer.singleShot(3000, self._reactivateUnsavedState)
+
+        if self._loader:
+            self._loader.cancel()
+        self._loader = TopologyLoader(window=main_window.settings()["topology_load_window"])
+        self._loader.progress_signal.connect(self._loadingProgressSlot)
+        self._loader.finished_signal.connect(self._loadingFinishedSlot)
 
         self._node_to_links_mapping = {}
         # create a mapping node ID to links
         if "links" in topology["topology"]:
             links = topology["topology"]["links"]
+            self._loader.setTopologyLinks(links)
             for topology_link in links:
                 log.debug("mapping node to link with ID {}".format(topology_link["id"]))
                 source_id = topology_link["source_node_id"]
@@ -563,8 +755,9 @@ class Topology(object):
                 # we want to know when the node has been created
                 node.created_signal.connect(self._nodeCreatedSlot)
 
-                # load the settings
-                node.load(topology_node)
+                # load the settings, the node is created on the server
+                # when the loader has room for it.
+                self._loader.addNode(node, topology_node)
 
                 # create the node item and restore GUI settings
                 node_item = NodeItem(node)
@@ -581,20 +774,13 @@ class Topology(object):
                 if "z" in topology_node:
                     node_item.setZValue(topology_node["z"])
 
+                default_symbol_valid = True
                 if "default_symbol" in topology_node:
-                    path = topology_node["default_symbol"]
-                    default_renderer = QtSvg.QSvgRenderer(path)
-                    if default_renderer.isValid():
-                        default_renderer.setObjectName(path)
-                        node_item.setDefaultRenderer(default_renderer)
-
-                if "hover_symbol" in topology_node:
-                    path = topology_node["hover_symbol"]
-                    hover_renderer = QtSvg.QSvgRenderer(path)
-                    if hover_renderer.isValid() and default_renderer.isValid():
-                        # default renderer must be valid too
-                        hover_renderer.setObjectName(path)
-                        node_item.setHoverRenderer(hover_renderer)
+                    default_symbol_valid = node_item.setDefaultSymbol(topology_node["default_symbol"])
+
+                if "hover_symbol" in topology_node and default_symbol_valid:
+                    # default symbol must be valid too
+                    node_item.setHoverSymbol(topology_node["hover_symbol"])
 
                 view.scene().addItem(node_item)
                 self.addNode(node)
@@ -661,6 +847,14 @@ class Topology(object):
                                  instance["image_id"],
                                  instance["private_key"], instance["public_key"])
 
+        # links to nodes that could not be loaded will never be created
+        for node_id, topology_links in self._node_to_links_mapping.items():
+            if node_id not in self._nodes:
+                for topology_link in topology_links:
+                    self._loader.addLink(topology_link["id"], None)
+
+        self._loader.start()
+
         if topology_file_errors:
             errors = "\n".join(topology_file_errors)
             MessageBox(main_window, "Topology", "Errors detected while importing the topology", errors)
@@ -682,10 +876,25 @@ class Topology(object):
         view = MainWindow.instance().uiGraphicsView
 
         log.debug("node {} has initialized".format(node.name()))
-        self._initialized_nodes.append(node_id)
+        self._initialized_nodes.add(node_id)
 
         if node_id in self._node_to_links_mapping:
             topology_link = self._node_to_links_mapping[node_id]
+
+            # request UDP ports for both ends of the links created once the other
+            # nodes are created, so these links don't wait for port allocations.
+            waiting_ports = {}
+            for link in topology_link:
+                for link_node_id in (link["source_node_id"], link["destination_node_id"]):
+                    if link_node_id not in self._initialized_nodes:
+                        peer = self.getNode(link_node_id)
+                        if peer:
+                            waiting_ports[node] = waiting_ports.get(node, 0) + 1
+                            waiting_ports[peer] = waiting_ports.get(peer, 0) + 1
+            port_pool = UDPPortPool.instance()
+            for waiting_node, count in waiting_ports.items():
+                port_pool.prefetch(waiting_node, count)
+
             for link in topology_link:
                 source_node_id = link["source_node_id"]
                 destination_node_id = link["destination_node_id"]
@@ -715,8 +924,11 @@ class Topology(object):
                                 destination_port.setLabel(self._createPortLabel(destination_node, link["destination_port_label"]))
                             break
 
+                    new_link = None
                     if source_port and destination_port:
-                        view.addLink(source_node, source_port, destination_node, destination_port)
+                        new_link = view.addLink(source_node, source_port, destination_node, destination_port)
+                    if self._loader:
+                        self._loader.addLink(link["id"], new_link)
 
     def _createPortLabel(self, node, label_info):
         """
@@ -731,22 +943,45 @@ class Topology(object):
         from .main_window import MainWindow
         view = MainWindow.instance().uiGraphicsView
 
-        for item in view.scene().items():
-            if isinstance(item, NodeItem) and node.id() == item.node().id():
-                port_label = NoteItem(item)
-                port_label.load(label_info)
-                port_label.hide()
-                return port_label
-        return None
+        item = view.scene().nodeItem(node.id())
+        if item is None:
+            return None
+        port_label = NoteItem(item)
+        port_label.load(label_info)
+        port_label.hide()
+        return port_label
 
-    def _reactivateUnsavedState(self):
+    def _loadingProgressSlot(self, done, total):
         """
-        Slots to reactivate the unsaved state support
-        when the QTimer timeouts
+        Slot to show the topology loading progress.
+
+        :param done: number of nodes and links processed
+        :param total: total number of nodes and links
         """
 
         from .main_window import MainWindow
-        MainWindow.instance().ignoreUnsavedState(False)
+        MainWindow.instance().uiStatusBar.showMessage("Loading topology: {}/{} nodes and links".format(done, total), 2000)
+
+    def _loadingFinishedSlot(self):
+        """
+        Slot called when all the nodes and links have been loaded.
+        Reactivates the unsaved state support.
+        """
+
+        from .main_window import MainWindow
+        main_window = MainWindow.instance()
+        main_window.ignoreUnsavedState(False)
+        if self._loader and self._loader.failures():
+            main_window.uiStatusBar.showMessage("Topology loaded with {} error(s)".format(self._loader.failures()), 5000)
+
+    def loader(self):
+        """
+        Returns the loader used by the last topology load.
+
+        :returns: TopologyLoader instance or None
+        """
+
+        return self._loader
 
     def __str__(self):
 
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Pipelined topology loading: schedules node creation on each server
+with a bounded number of requests in flight and keeps track of the links
+being set up between created nodes.
+"""
+
+import time
+import functools
+from collections import OrderedDict, deque
+
+from .qt import QtCore
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class TopologyLoader(QtCore.QObject):
+    """
+    Topology loader.
+
+    :param window: maximum number of nodes being created on a server at the same time
+    :param stall_timeout: time in milliseconds without any progress after which
+    the nodes and links still in flight are considered as failed
+    """
+
+    # signals to let the GUI know about the loading progress
+    progress_signal = QtCore.Signal(int, int)
+    finished_signal = QtCore.Signal()
+
+    def __init__(self, window=10, stall_timeout=60000):
+
+        super(TopologyLoader, self).__init__()
+        self._window = max(1, window)
+        self._pending = OrderedDict()
+        self._in_flight = {}
+        self._links = {}
+        self._settled_nodes = set()
+        self._settled_links = set()
+        self._node_to_link_ids = {}
+        self._total_nodes = 0
+        self._total_links = 0
+        self._failures = 0
+        self._running = False
+        self._timings = {}
+        self._start_time = None
+        self._links_start_time = None
+        self._stall_timer = QtCore.QTimer(self)
+        self._stall_timer.setSingleShot(True)
+        self._stall_timer.setInterval(stall_timeout)
+        self._stall_timer.timeout.connect(self._stalledSlot)
+
+    def setTopologyLinks(self, topology_links):
+        """
+        Sets the links described in the topology file.
+
+        :param topology_links: list of link representations
+        """
+
+        self._total_links = len(topology_links)
+        for topology_link in topology_links:
+            for node_id in (topology_link["source_node_id"], topology_link["destination_node_id"]):
+                self._node_to_link_ids.setdefault(node_id, []).append(topology_link["id"])
+
+    def addNode(self, node, topology_node):
+        """
+        Schedules the creation of a node.
+
+        :param node: Node instance
+        :param topology_node: node representation (dictionary)
+        """
+
+        self._pending.setdefault(node.server(), deque()).append((node, topology_node))
+        self._total_nodes += 1
+
+    def start(self):
+        """
+        Starts creating the scheduled nodes.
+        """
+
+        self._running = True
+        self._start_time = time.time()
+        log.info("loading {} nodes and {} links, {} node(s) in flight per server".format(self._total_nodes,
+                                                                                        self._total_links,
+                                                                                        self._window))
+        self._stall_timer.start()
+        for server in list(self._pending.keys()):
+            self._dispatch(server)
+        self._checkFinished()
+
+    def cancel(self):
+        """
+        Cancels the loading, nodes not created yet are dropped.
+        """
+
+        if not self._running:
+            return
+
+        log.info("topology loading has been canceled")
+        for nodes in self._in_flight.values():
+            for node in list(nodes.keys()):
+                self._disconnectNode(node)
+        self._pending.clear()
+        self._in_flight.clear()
+        self._running = False
+        self._stall_timer.stop()
+
+    def isRunning(self):
+        """
+        Returns either the loading is in progress.
+
+        :returns: boolean
+        """
+
+        return self._running
+
+    def timings(self):
+        """
+        Returns the time spent in each loading phase.
+
+        :returns: dictionary phase name -> seconds
+        """
+
+        return self._timings
+
+    def failures(self):
+        """
+        Returns the number of nodes and links that could not be created.
+
+        :returns: integer
+        """
+
+        return self._failures
+
+    def _dispatch(self, server):
+        """
+        Creates nodes on a server until the window is full.
+
+        :param server: WebSocketClient instance
+        """
+
+        pending = self._pending.get(server)
+        in_flight = self._in_flight.setdefault(server, OrderedDict())
+        if not pending or len(in_flight) >= self._window:
+            return
+
+        # the create requests go to the server in a single batch
+        server.startBatch()
+        try:
+            while pending and len(in_flight) < self._window and self._running:
+                node, topology_node = pending.popleft()
+                in_flight[node] = time.time()
+                node.created_signal.connect(self._nodeCreatedSlot)
+                node.error_signal.connect(self._nodeErrorSlot)
+                node.server_error_signal.connect(self._nodeServerErrorSlot)
+                log.debug("creating node with ID {} on {}:{}".format(node.id(), server.host, server.port))
+                node.load(topology_node)
+        finally:
+            server.endBatch()
+
+    def _disconnectNode(self, node):
+        """
+        Stops listening to a node signals.
+
+        :param node: Node instance
+        """
+
+        try:
+            node.created_signal.disconnect(self._nodeCreatedSlot)
+            node.error_signal.disconnect(self._nodeErrorSlot)
+            node.server_error_signal.disconnect(self._nodeServerErrorSlot)
+        except TypeError:
+            # ignore TypeError: 'method' object is not connected
+            pass
+
+    def _findInFlightNode(self, node_id):
+        """
+        Lookups for a node being created.
+
+        :param node_id: node identifier
+
+        :returns: Node instance or None
+        """
+
+        for nodes in self._in_flight.values():
+            for node in nodes:
+                if node.id() == node_id:
+                    return node
+        return None
+
+    def _nodeSettled(self, node, success):
+        """
+        Called when a node has been created or has failed.
+
+        :param node: Node instance
+        :param success: boolean
+        """
+
+        server = node.server()
+        in_flight = self._in_flight.get(server)
+        if in_flight is None or node not in in_flight:
+            return
+
+        self._disconnectNode(node)
+        del in_flight[node]
+        self._settled_nodes.add(node.id())
+        if not success:
+            self._failures += 1
+            # links connected to this node will never be created
+            for link_id in self._node_to_link_ids.get(node.id(), []):
+                self._linkSettled(link_id, False)
+
+        if len(self._settled_nodes) == self._total_nodes:
+            self._timings["nodes"] = time.time() - self._start_time
+
+        self._progress()
+        self._dispatch(server)
+        self._checkFinished()
+
+    def _nodeCreatedSlot(self, node_id):
+        """
+        Slot called when a node has been created.
+
+        :param node_id: node identifier
+        """
+
+        node = self._findInFlightNode(node_id)
+        if node:
+            self._nodeSettled(node, True)
+
+    def _nodeErrorSlot(self, node_id, message):
+        """
+        Slot called when a node reports an error while being created.
+
+        :param node_id: node identifier
+        :param message: error message
+        """
+
+        node = self._findInFlightNode(node_id)
+        if node:
+            log.warning("could not create node {}: {}".format(node.name(), message))
+            self._nodeSettled(node, False)
+
+    def _nodeServerErrorSlot(self, node_id, code, message):
+        """
+        Slot called when the server returns an error while creating a node.
+
+        :param node_id: node identifier
+        :param code: error code
+        :param message: error message
+        """
+
+        self._nodeErrorSlot(node_id, message)
+
+    def addLink(self, topology_link_id, link):
+        """
+        Tracks a link being set up between two created nodes.
+
+        :param topology_link_id: link identifier in the topology file
+        :param link: Link instance (None if the link could not be created)
+        """
+
+        if link is None:
+            self._linkSettled(topology_link_id, False)
+            self._checkFinished()
+            return
+
+        # links to nodes that were never loaded are settled before start()
+        if self._links_start_time is None:
+            self._links_start_time = time.time()
+        self._links[topology_link_id] = link
+        link.add_link_signal.connect(functools.partial(self._linkSlot, topology_link_id, True))
+        link.cancel_link_signal.connect(functools.partial(self._linkSlot, topology_link_id, False))
+
+    def _linkSlot(self, topology_link_id, success, link_id):
+        """
+        Slot called when a link has been created or canceled.
+
+        :param topology_link_id: link identifier in the topology file
+        :param success: boolean
+        :param link_id: link identifier
+        """
+
+        self._linkSettled(topology_link_id, success)
+        self._checkFinished()
+
+    def _linkSettled(self, topology_link_id, success):
+        """
+        Called when a link has been created or has failed.
+
+        :param topology_link_id: link identifier in the topology file
+        :param success: boolean
+        """
+
+        if topology_link_id in self._settled_links:
+            return
+
+        self._settled_links.add(topology_link_id)
+        self._links.pop(topology_link_id, None)
+        if not success:
+            self._failures += 1
+        self._progress()
+
+    def _progress(self):
+        """
+        Emits the loading progress.
+        """
+
+        if self._running:
+            self._stall_timer.start()
+            self.progress_signal.emit(len(self._settled_nodes) + len(self._settled_links),
+                                      self._total_nodes + self._total_links)
+
+    def _stalledSlot(self):
+        """
+        Slot called when the loading hasn't progressed for a while.
+        Nodes and links still in flight are considered as failed.
+        """
+
+        if not self._running:
+            return
+
+        log.warning("topology loading is stalled, giving up on nodes and links still being created")
+        for nodes in list(self._in_flight.values()):
+            for node in list(nodes.keys()):
+                self._nodeSettled(node, False)
+        for topology_link_id in list(self._links.keys()):
+            self._linkSettled(topology_link_id, False)
+        self._checkFinished()
+
+    def _checkFinished(self):
+        """
+        Emits the finished signal once all nodes and links have settled.
+        """
+
+        if not self._running:
+            return
+
+        if len(self._settled_nodes) < self._total_nodes or len(self._settled_links) < self._total_links:
+            return
+
+        self._running = False
+        self._stall_timer.stop()
+        now = time.time()
+        self._timings.setdefault("nodes", now - self._start_time)
+        if self._links_start_time is not None:
+            self._timings["links"] = now - self._links_start_time
+        self._timings["total"] = now - self._start_time
+        log.info("topology loaded in {:.2f} seconds ({}), {} failure(s)".format(self._timings["total"],
+                                                                             ", ".join("{} {:.2f}s".format(phase, duration)
+                                                                                       for phase, duration in sorted(self._timings.items())),
+                                                                             self._failures))
+        self.finished_signal.emit()
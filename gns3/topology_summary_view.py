@@ -19,112 +19,361 @@
 Topology summary view that list all the nodes, their status and connections.
 """
 
+import functools
+
 from .qt import QtGui, QtCore
 from .node import Node
 from .topology import Topology
 from .items.node_item import NodeItem
-from .items.link_item import LinkItem
 
 import logging
 log = logging.getLogger(__name__)
 
 
-class TopologyNodeItem(QtGui.QTreeWidgetItem):
+class TopologySummaryModel(QtCore.QAbstractItemModel):
     """
-    Custom item for the QTreeWidget instance
-    (topology summary view).
+    Model listing the nodes and, as their children, their connected ports.
+    Nodes are updated incrementally when they emit signals.
 
-    :param parent: parent widget
-    :param node: Node instance
+    :param parent: parent object
     """
 
-    def __init__(self, parent, node):
+    _status_icons = {}
+    _capture_icon = None
+
+    def __init__(self, parent=None):
 
-        QtGui.QTreeWidgetItem.__init__(self, parent)
-        self._node = node
-        self._parent = parent
+        QtCore.QAbstractItemModel.__init__(self, parent)
+        self._nodes = []
+        self._rows = {}
+        self._ports = {}
+        self._dirty_nodes = []
 
-        # we want to know about the node events
-        node.started_signal.connect(self._refreshStatusSlot)
-        node.stopped_signal.connect(self._refreshStatusSlot)
-        node.suspended_signal.connect(self._refreshStatusSlot)
-        node.updated_signal.connect(self._refreshNodeSlot)
-        node.deleted_signal.connect(self._deletedNodeSlot)
+    @classmethod
+    def statusIcon(cls, status):
+        """
+        Returns the icon showing a node status, icons are loaded once.
 
-        self._refreshStatusSlot()
-        self._refreshNodeSlot()
+        :param status: node status
 
-    def _refreshStatusSlot(self):
+        :returns: QIcon instance
         """
-        Changes the icon to show the node status (started, stopped etc.)
+
+        if not cls._status_icons:
+            cls._status_icons = {Node.started: QtGui.QIcon(":/icons/led_green.svg"),
+                                 Node.suspended: QtGui.QIcon(":/icons/led_yellow.svg"),
+                                 Node.stopped: QtGui.QIcon(":/icons/led_red.svg")}
+        return cls._status_icons.get(status, cls._status_icons[Node.stopped])
+
+    @classmethod
+    def captureIcon(cls):
         """
+        Returns the icon showing a port is capturing, loaded once.
 
-        self.setText(0, self._node.name())
-        if self._node.status() == Node.started:
-            self.setIcon(0, QtGui.QIcon(':/icons/led_green.svg'))
-        elif self._node.status() == Node.suspended:
-            self.setIcon(0, QtGui.QIcon(':/icons/led_yellow.svg'))
-        else:
-            self.setIcon(0, QtGui.QIcon(':/icons/led_red.svg'))
+        :returns: QIcon instance
+        """
+
+        if cls._capture_icon is None:
+            cls._capture_icon = QtGui.QIcon(":/icons/inspect.svg")
+        return cls._capture_icon
+
+    @staticmethod
+    def _connectedPorts(node):
+        """
+        Returns the connected ports of a node, sorted by name.
+
+        :param node: Node instance
+
+        :returns: list of Port instances
+        """
+
+        ports = [port for port in node.ports() if not port.isFree()]
+        ports.sort(key=lambda port: "{} {}".format(port.name(), port.description()))
+        return ports
+
+    def addNode(self, node):
+        """
+        Adds a node to the model.
+
+        :param node: Node instance
+        """
 
-    def _refreshNodeSlot(self):
+        if node in self._rows:
+            return
+        row = len(self._nodes)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._nodes.append(node)
+        self._rows[node] = row
+        self._ports[node] = self._connectedPorts(node)
+        self.endInsertRows()
+
+        node.started_signal.connect(functools.partial(self._nodeStatusSlot, node))
+        node.stopped_signal.connect(functools.partial(self._nodeStatusSlot, node))
+        node.suspended_signal.connect(functools.partial(self._nodeStatusSlot, node))
+        node.updated_signal.connect(functools.partial(self._nodeUpdatedSlot, node))
+        node.deleted_signal.connect(functools.partial(self.removeNode, node))
+
+    def removeNode(self, node):
+        """
+        Removes a node from the model.
+
+        :param node: Node instance
+        """
+
+        row = self._rows.get(node)
+        if row is None:
+            return
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._nodes[row]
+        del self._rows[node]
+        del self._ports[node]
+        for index in range(row, len(self._nodes)):
+            self._rows[self._nodes[index]] = index
+        self.endRemoveRows()
+
+    def clear(self):
         """
-        Slot to update the node.
+        Removes all the nodes.
         """
 
-        self.refresh()
+        self.beginResetModel()
+        self._nodes = []
+        self._rows = {}
+        self._ports = {}
+        self._dirty_nodes = []
+        self.endResetModel()
 
-    def node(self):
+    def nodeIndex(self, node):
         """
-        Returns the node.
+        Returns the index of a node.
 
-        :return: Node instance
+        :param node: Node instance
+
+        :returns: QModelIndex instance (invalid if the node is unknown)
         """
 
-        return self._node
+        row = self._rows.get(node)
+        if row is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(row, 0)
 
-    def refresh(self):
+    def refreshAll(self):
         """
-        Updates the widget item with the current node name and list all the connections
-        as children.
+        Refreshes all the nodes.
         """
 
-        if self._node.name() != self.text(0):
-            # refresh all the other item if the node name has changed
-            self._parent.refreshAll(self)
+        for node in self._nodes:
+            self._refreshNode(node)
 
-        self.setText(0, self._node.name())
-        ports = self._node.ports()
-        self.takeChildren()
+    def _nodeStatusSlot(self, node):
+        """
+        Slot called when a node has been started, stopped or suspended.
 
-        capturing = False
-        for port in ports:
-            if not port.isFree():
-                item = QtGui.QTreeWidgetItem()
-                item.setText(0, "{} {}".format(port.name(), port.description()))
-                item.setData(0, QtCore.Qt.UserRole, port)
-                if port.capturing():
-                    item.setIcon(0, QtGui.QIcon(':/icons/inspect.svg'))
-                    capturing = True
-                self.addChild(item)
+        :param node: Node instance
+        """
 
-        if self._parent.show_only_devices_with_capture and capturing is False:
-            self.setHidden(True)
-        else:
-            self.setHidden(False)
+        index = self.nodeIndex(node)
+        if index.isValid():
+            self.dataChanged.emit(index, index)
+
+    def _nodeUpdatedSlot(self, node):
+        """
+        Slot called when a node has been updated, the refresh is
+        deferred when a bulk operation is in progress.
+
+        :param node: Node instance
+        """
 
-        self.sortChildren(0, QtCore.Qt.AscendingOrder)
+        if node not in self._dirty_nodes:
+            self._dirty_nodes.append(node)
+        if not Topology.instance().defer(self._refreshDirtyNodes):
+            self._refreshDirtyNodes()
 
-    def _deletedNodeSlot(self):
+    def _refreshDirtyNodes(self):
         """
-        Removes the node from the view.
+        Refreshes the nodes updated since the last refresh.
         """
 
-        tree = self.treeWidget()
-        tree.takeTopLevelItem(tree.indexOfTopLevelItem(self))
+        dirty_nodes = self._dirty_nodes
+        self._dirty_nodes = []
+        for node in dirty_nodes:
+            self._refreshNode(node)
 
+    def _refreshNode(self, node, refresh_peers=True):
+        """
+        Refreshes a node: its name, status and connected ports.
+        Only the ports that have been connected or disconnected
+        are inserted or removed.
+
+        :param node: Node instance
+        :param refresh_peers: also refreshes the nodes connected to this node,
+        their ports show its name
+        """
+
+        node_index = self.nodeIndex(node)
+        if not node_index.isValid():
+            return
+
+        ports = self._ports[node]
+        new_ports = self._connectedPorts(node)
+        if new_ports != ports:
+            kept = set(new_ports)
+            for row in range(len(ports) - 1, -1, -1):
+                if ports[row] not in kept:
+                    self.beginRemoveRows(node_index, row, row)
+                    del ports[row]
+                    self.endRemoveRows()
+            existing = set(ports)
+            for row, port in enumerate(new_ports):
+                if port not in existing:
+                    row = min(row, len(ports))
+                    self.beginInsertRows(node_index, row, row)
+                    ports.insert(row, port)
+                    self.endInsertRows()
+            # ports can only be out of order if their names changed
+            if ports != new_ports:
+                self.layoutAboutToBeChanged.emit()
+                old_rows = {port: row for row, port in enumerate(ports)}
+                ports[:] = new_ports
+                # the views and proxies keep pointing to the same ports
+                for row, port in enumerate(ports):
+                    if old_rows[port] != row:
+                        self.changePersistentIndex(self.createIndex(old_rows[port], 0, node), self.createIndex(row, 0, node))
+                self.layoutChanged.emit()
+
+        self.dataChanged.emit(node_index, node_index)
+        if ports:
+            self.dataChanged.emit(self.index(0, 0, node_index), self.index(len(ports) - 1, 0, node_index))
+
+        if refresh_peers:
+            peers = []
+            for port in ports:
+                peer = port.destinationNode()
+                if peer is not None and peer is not node and peer not in peers:
+                    peers.append(peer)
+            for peer in peers:
+                self._refreshNode(peer, refresh_peers=False)
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+
+        if column != 0 or row < 0:
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            if row >= len(self._nodes):
+                return QtCore.QModelIndex()
+            return self.createIndex(row, column)
+        if parent.parent().isValid():
+            # ports have no children
+            return QtCore.QModelIndex()
+        node = self._nodes[parent.row()]
+        if row >= len(self._ports[node]):
+            return QtCore.QModelIndex()
+        # the node is kept in the index of its ports
+        return self.createIndex(row, column, node)
+
+    def parent(self, index):
+
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        node = index.internalPointer()
+        if node is None:
+            return QtCore.QModelIndex()
+        return self.nodeIndex(node)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+
+        if not parent.isValid():
+            return len(self._nodes)
+        if parent.internalPointer() is None:
+            return len(self._ports[self._nodes[parent.row()]])
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+
+        return 1
+
+    def item(self, index):
+        """
+        Returns the node or the port of an index.
+
+        :param index: QModelIndex instance
+
+        :returns: Node or Port instance (None if the index is invalid)
+        """
+
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if node is None:
+            return self._nodes[index.row()]
+        return self._ports[node][index.row()]
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+
+        item = self.item(index)
+        if item is None:
+            return None
+        is_node = index.internalPointer() is None
+        if role == QtCore.Qt.DisplayRole:
+            if is_node:
+                return item.name()
+            return "{} {}".format(item.name(), item.description())
+        if role == QtCore.Qt.DecorationRole:
+            if is_node:
+                return self.statusIcon(item.status())
+            if item.capturing():
+                return self.captureIcon()
+        elif role == QtCore.Qt.UserRole:
+            return item
+        return None
+
+
+class CaptureFilterProxyModel(QtGui.QSortFilterProxyModel):
+    """
+    Proxy model showing either all the nodes or only the nodes
+    with at least one port capturing packets.
+
+    :param parent: parent object
+    """
+
+    def __init__(self, parent=None):
+
+        QtGui.QSortFilterProxyModel.__init__(self, parent)
+        self._only_capturing = False
+        self.setDynamicSortFilter(True)
+
+    def setOnlyCapturing(self, only_capturing):
+        """
+        Shows only the nodes capturing packets or all the nodes.
+
+        :param only_capturing: boolean
+        """
+
+        self._only_capturing = only_capturing
+        self.invalidateFilter()
+
+    def onlyCapturing(self):
+        """
+        Returns either only the nodes capturing packets are shown.
+
+        :returns: boolean
+        """
+
+        return self._only_capturing
 
-class TopologySummaryView(QtGui.QTreeWidget):
+    def filterAcceptsRow(self, source_row, source_parent):
+
+        if not self._only_capturing or source_parent.isValid():
+            return True
+        model = self.sourceModel()
+        node_index = model.index(source_row, 0, source_parent)
+        for row in range(model.rowCount(node_index)):
+            if model.item(model.index(row, 0, node_index)).capturing():
+                return True
+        return False
+
+
+class TopologySummaryView(QtGui.QTreeView):
     """
     Topology summary view implementation.
 
@@ -133,10 +382,34 @@ class TopologySummaryView(QtGui.QTreeWidget):
 
     def __init__(self, parent):
 
-        QtGui.QTreeWidget.__init__(self, parent)
+        QtGui.QTreeView.__init__(self, parent)
         self._topology = Topology.instance()
-        self.itemSelectionChanged.connect(self._itemSelectionChangedSlot)
-        self.show_only_devices_with_capture = False
+        self._model = TopologySummaryModel(self)
+        self._proxy_model = CaptureFilterProxyModel(self)
+        self._proxy_model.setSourceModel(self._model)
+        self.setModel(self._proxy_model)
+        self.setUniformRowHeights(True)
+        self.setHeaderHidden(True)
+        self.selectionModel().currentChanged.connect(self._currentChangedSlot)
+
+    @property
+    def show_only_devices_with_capture(self):
+
+        return self._proxy_model.onlyCapturing()
+
+    @show_only_devices_with_capture.setter
+    def show_only_devices_with_capture(self, value):
+
+        self._proxy_model.setOnlyCapturing(value)
+
+    def summaryModel(self):
+        """
+        Returns the summary model (not the proxy model used by the view).
+
+        :returns: TopologySummaryModel instance
+        """
+
+        return self._model
 
     def addNode(self, node):
         """
@@ -153,19 +426,14 @@ class TopologySummaryView(QtGui.QTreeWidget):
         Clears all the topology summary.
         """
 
-        QtGui.QTreeWidget.clear(self)
+        self._model.clear()
 
-    def refreshAll(self, source_child=None):
+    def refreshAll(self):
         """
         Refreshes all the items.
         """
 
-        root = self.invisibleRootItem()
-        for index in range(0, root.childCount()):
-            child = root.child(index)
-            if source_child and source_child == child:
-                continue
-            child.refresh()
+        self._model.refreshAll()
 
     def _createdNodeSlot(self, node_id):
         """
@@ -183,28 +451,43 @@ class TopologySummaryView(QtGui.QTreeWidget):
             log.error("could not find node with ID {}".format(node_id))
             return
 
-        TopologyNodeItem(self, node)
+        self._model.addNode(node)
 
-    def _itemSelectionChangedSlot(self):
+    def currentItem(self):
         """
-        Slot called when an item is selected in the TreeWidget.
+        Returns the current node or port.
+
+        :returns: Node or Port instance (None if there is no current item)
         """
 
-        current_item = self.currentItem()
+        return self._model.item(self._proxy_model.mapToSource(self.currentIndex()))
+
+    def _currentChangedSlot(self, current, previous):
+        """
+        Slot called when an item is selected in the view.
+
+        :param current: current QModelIndex instance
+        :param previous: previous QModelIndex instance
+        """
+
+        current_item = self._model.item(self._proxy_model.mapToSource(current))
         if current_item:
             from .main_window import MainWindow
-            view = MainWindow.instance().uiGraphicsView
-            for item in view.scene().items():
+            scene = MainWindow.instance().uiGraphicsView.scene()
+            for item in scene.selectedItems():
                 if isinstance(item, NodeItem):
                     item.setSelected(False)
-                    if isinstance(current_item, TopologyNodeItem) and item.node().id() == current_item.node().id():
-                        item.setSelected(True)
-                if isinstance(item, LinkItem):
+            for item in scene.linkItems():
+                if item.isHovered():
                     item.setHovered(False)
-                    if not isinstance(current_item, TopologyNodeItem):
-                        port = current_item.data(0, QtCore.Qt.UserRole)
-                        if item.sourcePort() == port or item.destinationPort() == port:
-                            item.setHovered(True)
+            if isinstance(current_item, Node):
+                item = scene.nodeItem(current_item.id())
+                if item:
+                    item.setSelected(True)
+            else:
+                item = scene.linkItem(current_item.linkId())
+                if item:
+                    item.setHovered(True)
 
     def mousePressEvent(self, event):
         """
@@ -216,7 +499,7 @@ class TopologySummaryView(QtGui.QTreeWidget):
         if event.button() == QtCore.Qt.RightButton:
             self._showContextualMenu()
         else:
-            QtGui.QTreeWidget.mousePressEvent(self, event)
+            QtGui.QTreeView.mousePressEvent(self, event)
 
     def _showContextualMenu(self):
         """
@@ -253,16 +536,14 @@ class TopologySummaryView(QtGui.QTreeWidget):
         current_item = self.currentItem()
         from .main_window import MainWindow
         view = MainWindow.instance().uiGraphicsView
-        if current_item and not current_item.isHidden():
+        if current_item:
             menu.addSeparator()
-            if isinstance(current_item, TopologyNodeItem):
+            if isinstance(current_item, Node):
                 view.populateDeviceContextualMenu(menu)
             else:
-                port = current_item.data(0, QtCore.Qt.UserRole)
-                for item in view.scene().items():
-                    if isinstance(item, LinkItem) and (item.sourcePort() == port or item.destinationPort() == port):
-                        item.populateLinkContextualMenu(menu)
-                        break
+                item = view.scene().linkItem(current_item.linkId())
+                if item:
+                    item.populateLinkContextualMenu(menu)
 
         menu.exec_(QtGui.QCursor.pos())
 
@@ -286,7 +567,6 @@ class TopologySummaryView(QtGui.QTreeWidget):
         """
 
         self.show_only_devices_with_capture = True
-        self.refreshAll()
 
     def _showAllDevicesSlot(self):
         """
@@ -294,7 +574,6 @@ class TopologySummaryView(QtGui.QTreeWidget):
         """
 
         self.show_only_devices_with_capture = False
-        self.refreshAll()
 
     def _stopAllCapturesSlot(self):
         """
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Pools of UDP ports allocated ahead of demand on the servers, so
+links can get their UDP ports without waiting for a round trip.
+"""
+
+from collections import deque
+
+import logging
+log = logging.getLogger(__name__)
+
+# number of ports requested at once when a pool runs low
+PREFETCH_COUNT = 4
+
+# a pool is refilled when it has fewer ports available (or being requested)
+LOW_WATERMARK = 2
+
+
+class _Pool(object):
+    """
+    UDP ports allocated on a server for a module.
+    """
+
+    __slots__ = ("ports", "requested", "waiters", "carrier")
+
+    def __init__(self):
+
+        # (UDP port, node the port has been requested for)
+        self.ports = deque()
+        # number of prefetch requests without reply
+        self.requested = 0
+        # (node, port identifier) waiting for a prefetched port
+        self.waiters = deque()
+        # initialized node the ports can be requested for
+        self.carrier = None
+
+
+class UDPPortPool(object):
+    """
+    UDP port pools for each server and module.
+
+    The server allocates UDP ports module-wide (or from a range owned
+    by each Dynamips hypervisor), the node a port is requested for
+    only identifies the server-side instance making the request:
+    a port requested for one node can be given to any other node
+    of the same module on the same server.
+    """
+
+    def __init__(self):
+
+        self._pools = {}
+        self._discarded = set()
+        self._hits = 0
+        self._misses = 0
+
+    def _pool(self, node):
+
+        key = (node.server(), node.module())
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _Pool()
+        return pool
+
+    def allocate(self, node, port_id):
+        """
+        Allocates an UDP port for a node, the node emits its
+        allocate_udp_nio_signal when the port is available:
+        immediately if the pool has a port, when a prefetch
+        request completes or when the node request completes.
+
+        :param node: Node instance
+        :param port_id: port identifier
+        """
+
+        pool = self._pool(node)
+        if pool.ports:
+            lport, _ = pool.ports.popleft()
+            self._hits += 1
+            log.debug("{} is using pooled UDP port {}".format(node.name(), lport))
+            self._refill(node, pool)
+            node.allocate_udp_nio_signal.emit(node.id(), port_id, lport)
+        elif pool.requested > len(pool.waiters):
+            # a prefetch request will give a port to this node
+            self._hits += 1
+            pool.waiters.append((node, port_id))
+        else:
+            self._misses += 1
+            method, params = node.udpPortRequest(port_id)
+            node.server().send_message(method, params, node._allocateUDPPortCallback)
+            self._refill(node, pool)
+
+    def prefetch(self, node, count=PREFETCH_COUNT):
+        """
+        Requests UDP ports ahead of demand, for instance when
+        the nodes a new link will connect are being created.
+
+        :param node: Node instance which will need the ports, if it's not
+        created yet the ports are requested for another node of the same
+        module on the same server.
+        :param count: number of ports
+        """
+
+        pool = self._pool(node)
+        if node.initialized():
+            carrier = node
+        else:
+            carrier = pool.carrier
+        if carrier is None:
+            return
+        try:
+            carrier.udpPortRequest(0)
+        except NotImplementedError:
+            # this node doesn't support UDP NIOs
+            return
+        missing = count - (len(pool.ports) + pool.requested - len(pool.waiters))
+        if missing > 0:
+            self._request(carrier, pool, missing)
+
+    def _refill(self, node, pool):
+        """
+        Requests more ports if a pool runs low.
+
+        :param node: Node instance the ports are requested for
+        :param pool: _Pool instance
+        """
+
+        if len(pool.ports) + pool.requested - len(pool.waiters) < LOW_WATERMARK:
+            self._request(node, pool, PREFETCH_COUNT)
+
+    def _request(self, node, pool, count):
+        """
+        Sends UDP port allocation requests, in a single batch if possible.
+
+        :param node: Node instance the ports are requested for
+        :param pool: _Pool instance
+        :param count: number of ports
+        """
+
+        pool.carrier = node
+        server = node.server()
+        log.debug("prefetching {} UDP ports on {}:{} for {}".format(count, server.host, server.port, node.name()))
+        server.startBatch()
+        try:
+            for _ in range(count):
+                pool.requested += 1
+                method, params = node.udpPortRequest(0)
+                server.send_message(method, params, self._prefetchCallback(node, pool))
+        finally:
+            server.endBatch()
+
+    def _prefetchCallback(self, node, pool):
+        """
+        Returns the callback for a prefetch request.
+
+        :param node: Node instance the port is requested for
+        :param pool: _Pool instance
+
+        :returns: callback
+        """
+
+        def callback(result, error=False):
+            if self._pools.get((node.server(), node.module())) is not pool:
+                # the pool has been reset
+                return
+            pool.requested -= 1
+            if error or node.id() in self._discarded:
+                if error:
+                    log.warning("could not prefetch an UDP port for {}: {}".format(node.name(), result.get("message")))
+                # the nodes waiting for this port request it themselves
+                if pool.waiters:
+                    waiter, port_id = pool.waiters.popleft()
+                    method, params = waiter.udpPortRequest(port_id)
+                    waiter.server().send_message(method, params, waiter._allocateUDPPortCallback)
+                return
+            lport = result["lport"]
+            if pool.waiters:
+                waiter, port_id = pool.waiters.popleft()
+                log.debug("{} is using prefetched UDP port {}".format(waiter.name(), lport))
+                waiter.allocate_udp_nio_signal.emit(waiter.id(), port_id, lport)
+            else:
+                pool.ports.append((lport, node))
+        return callback
+
+    def discardNode(self, node):
+        """
+        Forgets the ports requested for a node that is deleted
+        (the server releases them with the node).
+
+        :param node: Node instance
+        """
+
+        self._discarded.add(node.id())
+        pool = self._pools.get((node.server(), node.module()))
+        if pool is None:
+            return
+        pool.ports = deque(entry for entry in pool.ports if entry[1] is not node)
+        pool.waiters = deque(entry for entry in pool.waiters if entry[0] is not node)
+        if pool.carrier is node:
+            pool.carrier = None
+
+    def available(self, server=None):
+        """
+        Returns the number of ports available in the pools.
+
+        :param server: only count the ports of this server (optional)
+
+        :returns: integer
+        """
+
+        return sum(len(pool.ports) for (pool_server, _), pool in self._pools.items()
+                   if server is None or pool_server is server)
+
+    def hitRatio(self):
+        """
+        Returns the ratio of allocations served by the pools.
+
+        :returns: float between 0 and 1
+        """
+
+        total = self._hits + self._misses
+        if not total:
+            return 0.0
+        return self._hits / total
+
+    def reset(self):
+        """
+        Drops all the pools. The unused ports are released by
+        the servers when the modules are reset.
+        """
+
+        self._pools.clear()
+        self._discarded.clear()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def instance():
+        """
+        Singleton to return only one instance of UDPPortPool.
+
+        :returns: instance of UDPPortPool
+        """
+
+        if not hasattr(UDPPortPool, "_instance"):
+            UDPPortPool._instance = UDPPortPool()
+        return UDPPortPool._instance
@@ -243,6 +243,29 @@ class Ui_GeneralPreferencesPageWidget(object):
         self.uiDrawLinkStatusPointsCheckBox.setChecked(True)
         self.uiDrawLinkStatusPointsCheckBox.setObjectName(_fromUtf8("uiDrawLinkStatusPointsCheckBox"))
         self.verticalLayout_2.addWidget(self.uiDrawLinkStatusPointsCheckBox)
+        self.uiCacheSymbolPixmapsCheckBox = QtGui.QCheckBox(self.uiSceneTab)
+        self.uiCacheSymbolPixmapsCheckBox.setChecked(True)
+        self.uiCacheSymbolPixmapsCheckBox.setObjectName(_fromUtf8("uiCacheSymbolPixmapsCheckBox"))
+        self.verticalLayout_2.addWidget(self.uiCacheSymbolPixmapsCheckBox)
+        self.uiLevelOfDetailCheckBox = QtGui.QCheckBox(self.uiSceneTab)
+        self.uiLevelOfDetailCheckBox.setChecked(True)
+        self.uiLevelOfDetailCheckBox.setObjectName(_fromUtf8("uiLevelOfDetailCheckBox"))
+        self.verticalLayout_2.addWidget(self.uiLevelOfDetailCheckBox)
+        self.uiShowFPSCheckBox = QtGui.QCheckBox(self.uiSceneTab)
+        self.uiShowFPSCheckBox.setObjectName(_fromUtf8("uiShowFPSCheckBox"))
+        self.verticalLayout_2.addWidget(self.uiShowFPSCheckBox)
+        self.uiViewportUpdateModeLabel = QtGui.QLabel(self.uiSceneTab)
+        self.uiViewportUpdateModeLabel.setObjectName(_fromUtf8("uiViewportUpdateModeLabel"))
+        self.verticalLayout_2.addWidget(self.uiViewportUpdateModeLabel)
+        self.uiViewportUpdateModeComboBox = QtGui.QComboBox(self.uiSceneTab)
+        self.uiViewportUpdateModeComboBox.setObjectName(_fromUtf8("uiViewportUpdateModeComboBox"))
+        self.verticalLayout_2.addWidget(self.uiViewportUpdateModeComboBox)
+        self.uiSceneIndexLabel = QtGui.QLabel(self.uiSceneTab)
+        self.uiSceneIndexLabel.setObjectName(_fromUtf8("uiSceneIndexLabel"))
+        self.verticalLayout_2.addWidget(self.uiSceneIndexLabel)
+        self.uiSceneIndexComboBox = QtGui.QComboBox(self.uiSceneTab)
+        self.uiSceneIndexComboBox.setObjectName(_fromUtf8("uiSceneIndexComboBox"))
+        self.verticalLayout_2.addWidget(self.uiSceneIndexComboBox)
         self.uiLabelPreviewLabel = QtGui.QLabel(self.uiSceneTab)
         self.uiLabelPreviewLabel.setObjectName(_fromUtf8("uiLabelPreviewLabel"))
         self.verticalLayout_2.addWidget(self.uiLabelPreviewLabel)
@@ -326,6 +349,11 @@ class Ui_GeneralPreferencesPageWidget(object):
         self.uiSceneHeightSpinBox.setSuffix(_translate("GeneralPreferencesPageWidget", " pixels", None))
         self.uiRectangleSelectedItemCheckBox.setText(_translate("GeneralPreferencesPageWidget", "Draw a rectangle when an item is selected", None))
         self.uiDrawLinkStatusPointsCheckBox.setText(_translate("GeneralPreferencesPageWidget", "Draw link status points", None))
+        self.uiCacheSymbolPixmapsCheckBox.setText(_translate("GeneralPreferencesPageWidget", "Cache the rasterized symbols", None))
+        self.uiLevelOfDetailCheckBox.setText(_translate("GeneralPreferencesPageWidget", "Draw fewer details when zoomed out", None))
+        self.uiShowFPSCheckBox.setText(_translate("GeneralPreferencesPageWidget", "Show the frame rate in the status bar", None))
+        self.uiViewportUpdateModeLabel.setText(_translate("GeneralPreferencesPageWidget", "Viewport update mode:", None))
+        self.uiSceneIndexLabel.setText(_translate("GeneralPreferencesPageWidget", "Scene index method:", None))
         self.uiLabelPreviewLabel.setText(_translate("GeneralPreferencesPageWidget", "Default label style:", None))
         self.uiDefaultLabelStylePlainTextEdit.setPlainText(_translate("GeneralPreferencesPageWidget", "AaBbYyZz", None))
         self.uiDefaultLabelFontPushButton.setText(_translate("GeneralPreferencesPageWidget", "&Select default font", None))
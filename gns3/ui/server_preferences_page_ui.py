@@ -101,8 +101,20 @@ class Ui_ServerPreferencesPageWidget(object):
         self.gridLayout_2.addLayout(self.horizontalLayout_3, 5, 0, 1, 1)
         spacerItem1 = QtGui.QSpacerItem(206, 20, QtGui.QSizePolicy.Expanding, QtGui.QSizePolicy.Minimum)
         self.gridLayout_2.addItem(spacerItem1, 5, 1, 1, 1)
+        self.uiRemoteServerRamCapacityLabel = QtGui.QLabel(self.uiRemoteTabWidget)
+        self.uiRemoteServerRamCapacityLabel.setObjectName(_fromUtf8("uiRemoteServerRamCapacityLabel"))
+        self.gridLayout_2.addWidget(self.uiRemoteServerRamCapacityLabel, 6, 0, 1, 2)
+        self.uiRemoteServerRamCapacitySpinBox = QtGui.QSpinBox(self.uiRemoteTabWidget)
+        self.uiRemoteServerRamCapacitySpinBox.setSuffix(_fromUtf8(" MB"))
+        self.uiRemoteServerRamCapacitySpinBox.setMaximum(16777216)
+        self.uiRemoteServerRamCapacitySpinBox.setSingleStep(1024)
+        self.uiRemoteServerRamCapacitySpinBox.setObjectName(_fromUtf8("uiRemoteServerRamCapacitySpinBox"))
+        self.gridLayout_2.addWidget(self.uiRemoteServerRamCapacitySpinBox, 7, 0, 1, 2)
+        self.uiRemoteServerCompressionCheckBox = QtGui.QCheckBox(self.uiRemoteTabWidget)
+        self.uiRemoteServerCompressionCheckBox.setObjectName(_fromUtf8("uiRemoteServerCompressionCheckBox"))
+        self.gridLayout_2.addWidget(self.uiRemoteServerCompressionCheckBox, 8, 0, 1, 2)
         spacerItem2 = QtGui.QSpacerItem(390, 12, QtGui.QSizePolicy.Minimum, QtGui.QSizePolicy.Expanding)
-        self.gridLayout_2.addItem(spacerItem2, 6, 0, 1, 2)
+        self.gridLayout_2.addItem(spacerItem2, 9, 0, 1, 2)
         self.uiRemoteServerPortSpinBox = QtGui.QSpinBox(self.uiRemoteTabWidget)
         self.uiRemoteServerPortSpinBox.setSuffix(_fromUtf8(" TCP"))
         self.uiRemoteServerPortSpinBox.setMaximum(65535)
@@ -111,6 +123,17 @@ class Ui_ServerPreferencesPageWidget(object):
         self.gridLayout_2.addWidget(self.uiRemoteServerPortSpinBox, 4, 0, 1, 2)
         self.uiTabWidget.addTab(self.uiRemoteTabWidget, _fromUtf8(""))
         self.vboxlayout.addWidget(self.uiTabWidget)
+        self.uiPlacementPolicyGroupBox = QtGui.QGroupBox(ServerPreferencesPageWidget)
+        self.uiPlacementPolicyGroupBox.setObjectName(_fromUtf8("uiPlacementPolicyGroupBox"))
+        self.horizontalLayout_4 = QtGui.QHBoxLayout(self.uiPlacementPolicyGroupBox)
+        self.horizontalLayout_4.setObjectName(_fromUtf8("horizontalLayout_4"))
+        self.uiPlacementPolicyLabel = QtGui.QLabel(self.uiPlacementPolicyGroupBox)
+        self.uiPlacementPolicyLabel.setObjectName(_fromUtf8("uiPlacementPolicyLabel"))
+        self.horizontalLayout_4.addWidget(self.uiPlacementPolicyLabel)
+        self.uiPlacementPolicyComboBox = QtGui.QComboBox(self.uiPlacementPolicyGroupBox)
+        self.uiPlacementPolicyComboBox.setObjectName(_fromUtf8("uiPlacementPolicyComboBox"))
+        self.horizontalLayout_4.addWidget(self.uiPlacementPolicyComboBox)
+        self.vboxlayout.addWidget(self.uiPlacementPolicyGroupBox)
         self.horizontalLayout_2 = QtGui.QHBoxLayout()
         self.horizontalLayout_2.setObjectName(_fromUtf8("horizontalLayout_2"))
         spacerItem3 = QtGui.QSpacerItem(164, 20, QtGui.QSizePolicy.Expanding, QtGui.QSizePolicy.Minimum)
@@ -141,12 +164,17 @@ class Ui_ServerPreferencesPageWidget(object):
         self.uiTabWidget.setTabText(self.uiTabWidget.indexOf(self.uiLocalTabWidget), _translate("ServerPreferencesPageWidget", "Local server", None))
         self.uiRemoteServersTreeWidget.headerItem().setText(0, _translate("ServerPreferencesPageWidget", "Host", None))
         self.uiRemoteServersTreeWidget.headerItem().setText(1, _translate("ServerPreferencesPageWidget", "Port", None))
+        self.uiRemoteServersTreeWidget.headerItem().setText(2, _translate("ServerPreferencesPageWidget", "RAM capacity", None))
         self.uiRemoteServerHostLabel.setText(_translate("ServerPreferencesPageWidget", "Host:", None))
         self.uiRemoteServerPortLineEdit.setText(_translate("ServerPreferencesPageWidget", "192.168.56.101", None))
         self.uiRemoteServerPortLabel.setText(_translate("ServerPreferencesPageWidget", "Port:", None))
         self.uiAddRemoteServerPushButton.setText(_translate("ServerPreferencesPageWidget", "&Add", None))
         self.uiDeleteRemoteServerPushButton.setText(_translate("ServerPreferencesPageWidget", "&Delete", None))
+        self.uiRemoteServerRamCapacityLabel.setText(_translate("ServerPreferencesPageWidget", "RAM capacity (0 if unknown):", None))
+        self.uiRemoteServerCompressionCheckBox.setText(_translate("ServerPreferencesPageWidget", "Compress the traffic if supported by the server", None))
         self.uiTabWidget.setTabText(self.uiTabWidget.indexOf(self.uiRemoteTabWidget), _translate("ServerPreferencesPageWidget", "Remote servers", None))
+        self.uiPlacementPolicyGroupBox.setTitle(_translate("ServerPreferencesPageWidget", "Load balancing between remote servers", None))
+        self.uiPlacementPolicyLabel.setText(_translate("ServerPreferencesPageWidget", "Place new nodes using:", None))
         self.uiTestSettingsPushButton.setText(_translate("ServerPreferencesPageWidget", "Test settings", None))
         self.uiRestoreDefaultsPushButton.setText(_translate("ServerPreferencesPageWidget", "Restore defaults", None))
 
@@ -17,12 +17,25 @@
 
 """
 Thread to repeatedly try to connect to a network resource.
+
+Connection attempts are spaced with an exponential backoff. When waiting
+for a process we have started, the thread is woken up as soon as the
+process reports it is ready (or exits) instead of probing blindly.
 """
 
 import socket
 import time
 from ..qt import QtCore
 
+# delay (in seconds) before the second connection attempt, doubled after each failure
+PROBE_INITIAL_DELAY = 0.01
+
+# maximum delay (in seconds) between two connection attempts
+PROBE_MAX_DELAY = 0.5
+
+# how long (in seconds) to try to connect
+CONNECTION_TIMEOUT = 30.0
+
 
 class WaitForConnectionThread(QtCore.QThread):
     """
@@ -30,6 +43,10 @@ class WaitForConnectionThread(QtCore.QThread):
 
     :param host: destination host or IP address
     :param port: destination port
+    :param process: optional subprocess.Popen instance listening on the port,
+    stops waiting if it exits
+    :param ready_event: optional threading.Event set when the process
+    reports it is ready or has exited
     """
 
     # signals to update the progress dialog.
@@ -37,11 +54,59 @@ class WaitForConnectionThread(QtCore.QThread):
     completed = QtCore.pyqtSignal()
     update = QtCore.pyqtSignal(int)
 
-    def __init__(self, host, port):
+    def __init__(self, host, port, process=None, ready_event=None):
 
         QtCore.QThread.__init__(self)
         self._host = host
         self._port = port
+        self._process = process
+        self._ready_event = ready_event
+        self._attempts = 0
+
+    def attempts(self):
+        """
+        Returns the number of connection attempts made.
+
+        :returns: integer
+        """
+
+        return self._attempts
+
+    def _probe(self):
+        """
+        Tries to connect once.
+
+        :returns: None if successful, the OSError otherwise
+        """
+
+        self._attempts += 1
+        sock = None
+        try:
+            sock = socket.create_connection((self._host, self._port), timeout=10)
+        except OSError as e:
+            return e
+        finally:
+            if sock:
+                sock.close()
+        return None
+
+    def _wait(self, delay):
+        """
+        Waits before the next connection attempt.
+
+        :param delay: maximum delay in seconds
+
+        :returns: True if woken up by the ready event
+        """
+
+        if self._ready_event is None:
+            time.sleep(delay)
+            return False
+        if self._ready_event.wait(delay):
+            # the event stays set, only wake up once
+            self._ready_event = None
+            return True
+        return False
 
     def run(self):
         """
@@ -49,35 +114,35 @@ class WaitForConnectionThread(QtCore.QThread):
         """
 
         self._is_running = True
-        connection_success = False
-        begin = time.time()
+        deadline = time.time() + CONNECTION_TIMEOUT
+        delay = PROBE_INITIAL_DELAY
+
+        while self._is_running:
+            if self._process is not None and self._process.poll() is not None:
+                self.error.emit("Process listening on {} port {} has exited with code {}".format(self._host,
+                                                                                                  self._port,
+                                                                                                  self._process.returncode), True)
+                return
 
-        # try to connect for 30 seconds
-        while (time.time() - begin < 30.0):
-            if not self._is_running:
+            last_exception = self._probe()
+            if last_exception is None:
+                # connection has been successful, let's inform the GUI before the thread exits
+                self.completed.emit()
                 return
-            time.sleep(0.01)
-            sock = None
-            try:
-                sock = socket.create_connection((self._host, self._port), timeout=10)
-            except OSError as e:
-                last_exception = e
-                continue
-            finally:
-                if sock:
-                    sock.close()
-            connection_success = True
-            break
-
-        if not connection_success:
-            # let the GUI know about the connection was unsuccessful and finish the thread
-            self.error.emit("Could not connect to {} on port {}: {}".format(self._host,
-                                                                            self._port,
-                                                                            last_exception), True)
-            return
-
-        # connection has been successful, let's inform the GUI before the thread exits
-        self.completed.emit()
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                # let the GUI know about the connection was unsuccessful and finish the thread
+                self.error.emit("Could not connect to {} on port {}: {}".format(self._host,
+                                                                                self._port,
+                                                                                last_exception), True)
+                return
+
+            if self._wait(min(delay, remaining)):
+                # the process says it's listening, probe right away
+                delay = PROBE_INITIAL_DELAY
+            else:
+                delay = min(delay * 2, PROBE_MAX_DELAY)
 
     def stop(self):
         """
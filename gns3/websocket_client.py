@@ -22,10 +22,18 @@ Based on the ws4py websocket client.
 
 import json
 import socket
+import threading
+import functools
 import urllib.request
 
 from .version import __version__
 from . import jsonrpc
+from .pending_requests import PendingRequests, CONNECTION_LOST_ERROR_CODE
+from .network_thread import NetworkThread
+from .server_metrics import ServerMetrics
+from .reconnect_supervisor import ReconnectSupervisor
+from .websocket_compression import PerMessageDeflate, FrameInflater, extensionOffer, buildFrame
+from .websocket_compression import COMPRESSION_THRESHOLD, READING_SIZE, OPCODE_TEXT, OPCODE_BINARY
 from ws4py.client import WebSocketBaseClient
 from ws4py import WS_VERSION
 from .qt import QtCore
@@ -33,6 +41,19 @@ from .qt import QtCore
 import logging
 log = logging.getLogger(__name__)
 
+# timeout in seconds for the HTTP requests made while connecting
+HTTP_TIMEOUT = 10
+
+# time in milliseconds during which outgoing messages are held
+# so that redundant updates and settings can be coalesced
+COALESCING_WINDOW = 20
+
+# requests with these method suffixes targeting the same id are merged
+COALESCED_REQUEST_SUFFIXES = (".update",)
+
+# notifications with these method suffixes supersede the previous ones
+COALESCED_NOTIFICATION_SUFFIXES = (".settings",)
+
 
 class WebSocketClient(WebSocketBaseClient):
     """
@@ -53,15 +74,48 @@ class WebSocketClient(WebSocketBaseClient):
                                      ssl_options,
                                      headers)
 
-        self.callbacks = {}
+        self._metrics = ServerMetrics()
+        self._pending_requests = PendingRequests(metrics=self._metrics)
         self._connected = False
         self._local = False
         self._cloud = False
         self._version = ""
-        self._fd_notifier = None
         self._heartbeat_timer = None
         self._tunnel = None
         self._instance_id = instance_id
+        self._ram_capacity = 0
+
+        # the socket is read from the network thread and
+        # the decoded messages are queued to the GUI thread
+        self._write_lock = threading.RLock()
+        # connections are made from the GUI thread or the connection pool
+        self._connect_lock = threading.Lock()
+        self._handshaked = False
+        # messages are queued while the connection is being restored
+        self._reconnecting = False
+
+        # permessage-deflate, offered if enabled and used if accepted by the server
+        self._compression = False
+        self._deflate = None
+        self._inflater = None
+
+        self._reader = NetworkThread.instance().createReader(self)
+        self._reader.opened_signal.connect(self.opened, QtCore.Qt.QueuedConnection)
+        self._reader.message_signal.connect(self._dispatchMessage, QtCore.Qt.QueuedConnection)
+        self._reader.disconnected_signal.connect(self._connectionLostSlot, QtCore.Qt.QueuedConnection)
+
+        # JSON-RPC batch support
+        self._batch_supported = None
+        self._batch_probe_id = None
+        self._batch_depth = 0
+
+        # outgoing queue: list of [destination, params, callbacks] entries,
+        # callbacks is None for notifications
+        self._outgoing = []
+        self._coalesced_count = 0
+        self._flush_timer = QtCore.QTimer()
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flushOutgoing)
 
         # create an unique ID
         self._id = WebSocketClient._instance_count
@@ -115,6 +169,54 @@ class WebSocketClient(WebSocketBaseClient):
 
         return self._local
 
+    def setRamCapacity(self, ram_capacity):
+        """
+        Sets the RAM available for nodes on this server,
+        used to balance nodes between servers.
+
+        :param ram_capacity: RAM in MB (0 if unknown)
+        """
+
+        self._ram_capacity = ram_capacity
+
+    def ramCapacity(self):
+        """
+        Returns the RAM available for nodes on this server.
+
+        :returns: RAM in MB (0 if unknown)
+        """
+
+        return self._ram_capacity
+
+    def setCompression(self, value):
+        """
+        Sets either compression is offered to the server,
+        takes effect at the next connection.
+
+        :param value: boolean
+        """
+
+        self._compression = value
+
+    def compression(self):
+        """
+        Returns either compression is offered to the server.
+
+        :returns: boolean
+        """
+
+        return self._compression
+
+    def compressionActive(self):
+        """
+        Returns either the server has accepted compression
+        on the current connection.
+
+        :returns: boolean
+        """
+
+        return self._deflate is not None
+
     def setCloud(self, value):
         self._cloud = value
 
@@ -126,8 +228,15 @@ class WebSocketClient(WebSocketBaseClient):
         Called when the connection with the server is successful.
         """
 
+        if self._connected:
+            # already called by reconnect()
+            return
+
         log.info("connected to {}:{}".format(self.host, self.port))
         self._connected = True
+        if self._heartbeat_timer is not None and not self._heartbeat_timer.isActive():
+            self._heartbeat_timer.start()
+        self._probeBatchSupport()
 
     def connect(self):
         """
@@ -163,7 +272,7 @@ class WebSocketClient(WebSocketBaseClient):
 
         This is an http (or https) request.
         """
-        content = self.opener.open(self.version_url).read()
+        content = self.opener.open(self.version_url, timeout=HTTP_TIMEOUT).read()
         try:
             json_data = json.loads(content.decode("utf-8"))
             self._version = json_data.get("version")
@@ -183,20 +292,33 @@ class WebSocketClient(WebSocketBaseClient):
         Reconnects to the server.
         """
 
-        WebSocketBaseClient.__init__(self,
-                                     self.url,
-                                     self.protocols,
-                                     self.extensions,
-                                     self.heartbeat_freq,
-                                     self.ssl_options,
-                                     self.extra_headers)
-
-        if self._local:
-            # check the local host address is still valid
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.bind((self.host, 0))
-
-        self.connect()
+        with self._connect_lock:
+            if self._handshaked:
+                # connected from another thread in the meantime, the queued
+                # call to opened() may not have been processed yet
+                if NetworkThread.isGuiThread():
+                    self.opened()
+                return
+
+            WebSocketBaseClient.__init__(self,
+                                         self.url,
+                                         self.protocols,
+                                         self.extensions,
+                                         self.heartbeat_freq,
+                                         self.ssl_options,
+                                         self.extra_headers)
+
+            if self._local:
+                # check the local host address is still valid
+                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                    sock.bind((self.host, 0))
+
+            try:
+                self.connect()
+            except OSError:
+                # for instance the server version doesn't match
+                self._handshaked = False
+                raise
 
     def connected(self):
         """
@@ -207,17 +329,157 @@ class WebSocketClient(WebSocketBaseClient):
 
         return self._connected
 
+    def setReconnecting(self, value):
+        """
+        Sets either the connection is being restored, the messages
+        sent in the meantime are queued instead of being dropped.
+
+        :param value: boolean
+        """
+
+        self._reconnecting = value
+
+    def isReconnecting(self):
+        """
+        Returns either the connection is being restored.
+
+        :returns: boolean
+        """
+
+        return self._reconnecting
+
+    def connectAsync(self, callback):
+        """
+        Connects to the server without blocking the GUI.
+
+        :param callback: callback to call once connected, on failure
+        with a dictionary with the error message and errno
+        and error set to True.
+        """
+
+        NetworkThread.instance().connectServer(self, callback)
+
     def handshake_ok(self):
         """
         Called when the connection has been established with the server and
-        monitors the connection using the QSocketNotifier.
+        monitors the connection from the network thread.
         """
 
-        fd = self.connection.fileno()
         # we are interested in all data received.
-        self._fd_notifier = QtCore.QSocketNotifier(fd, QtCore.QSocketNotifier.Read)
-        self._fd_notifier.activated.connect(self.data_received)
-        self.opened()
+        self._handshaked = True
+        self._reader.watch(self.connection.fileno())
+        if not NetworkThread.isGuiThread():
+            self._reader.opened_signal.emit()
+        else:
+            self.opened()
+
+    @property
+    def handshake_headers(self):
+        """
+        Headers of the upgrade handshake, offers compression if enabled.
+        """
+
+        headers = WebSocketBaseClient.handshake_headers.fget(self)
+        if self._compression:
+            headers.append(("Sec-WebSocket-Extensions", extensionOffer()))
+        return headers
+
+    def process_handshake_header(self, headers):
+        """
+        Processes the handshake response headers, the extensions accepted
+        by the server are handled here instead of by ws4py.
+
+        :param headers: response headers (bytes)
+        """
+
+        self._deflate = None
+        self._inflater = None
+        lines = []
+        for line in headers.split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() != b"sec-websocket-extensions":
+                lines.append(line)
+                continue
+            if not self._compression:
+                raise OSError("Server {}:{} uses extensions that have not been requested: {}".format(self.host, self.port, value.decode("utf-8", errors="replace")))
+            try:
+                self._deflate = PerMessageDeflate.fromResponse(value.decode("utf-8"))
+            except (UnicodeDecodeError, ValueError) as e:
+                raise OSError("Server {}:{} sent invalid compression parameters: {}".format(self.host, self.port, e))
+
+        if self._deflate is not None:
+            self._inflater = FrameInflater(self._deflate, self._metrics)
+            log.info("compression enabled with server {}:{}".format(self.host, self.port))
+        elif self._compression:
+            log.info("server {}:{} doesn't support compression".format(self.host, self.port))
+        return WebSocketBaseClient.process_handshake_header(self, b"\r\n".join(lines))
+
+    def process(self, data):
+        """
+        Processes the data read from the socket, compressed
+        messages are inflated before being handed to ws4py.
+
+        :param data: bytes
+
+        :returns: False if the connection must be closed
+        """
+
+        # bytes on the wire, before any decompression
+        self._metrics.dataReceived(len(data))
+
+        # close_connection() may drop the inflater from the GUI thread
+        inflater = self._inflater
+        if inflater is None or not data:
+            # no data means the connection has been closed
+            return WebSocketBaseClient.process(self, data)
+
+        try:
+            frames = inflater.feed(data)
+        except ValueError as e:
+            log.error("invalid compressed message from {}:{}: {}".format(self.host, self.port, e))
+            return False
+
+        # one frame at a time, ws4py handles a single message per call
+        for frame in frames:
+            if not WebSocketBaseClient.process(self, frame):
+                return False
+        # ws4py would otherwise read the few bytes its parser asked for last
+        self.reading_buffer_size = READING_SIZE
+        return True
+
+    def send(self, payload, binary=False):
+        """
+        Sends a message, compressed if the server supports
+        compression and the message is large enough.
+
+        :param payload: message (string or bytes)
+        :param binary: sends a binary message
+        """
+
+        deflate = self._deflate
+        if deflate is None or len(payload) < COMPRESSION_THRESHOLD:
+            WebSocketBaseClient.send(self, payload, binary)
+            return
+
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        with self._write_lock:
+            # the compression context must follow the order of the frames
+            compressed = deflate.compress(payload)
+            self._metrics.messageCompressed(len(payload), len(compressed))
+            self._write(buildFrame(OPCODE_BINARY if binary else OPCODE_TEXT, compressed, compressed=True))
+
+    def _write(self, data):
+        """
+        Writes data to the socket, both the GUI and network threads write
+        to it (messages, pings and pongs).
+
+        :param data: bytes to write
+        """
+
+        with self._write_lock:
+            WebSocketBaseClient._write(self, data)
+            self._metrics.dataSent(len(data))
 
     def closed(self, code, reason):
         """
@@ -228,14 +490,25 @@ class WebSocketClient(WebSocketBaseClient):
         """
 
         log.info("connection closed down: {} (code {})".format(reason, code))
+        self._handshaked = False
+        if not NetworkThread.isGuiThread():
+            # timers and the tunnel belong to the GUI thread
+            self._reader.disconnected_signal.emit()
+            return
+
         if self._heartbeat_timer is not None:
             self._heartbeat_timer.stop()
         self._connected = False
-        self._tunnel.disconnect()
+        self._batch_supported = None
+        self._batch_probe_id = None
+        if self._tunnel:
+            self._tunnel.disconnect()
 
     def received_message(self, message):
         """
         Called when a new message has been received from the server.
+        Runs in the network thread, the message is decoded there
+        and queued to the GUI thread.
 
         :param message: message instance
         """
@@ -245,33 +518,70 @@ class WebSocketClient(WebSocketBaseClient):
             log.warning("received data is not text")
             return
 
+        self._metrics.messageReceived()
         try:
-            reply = json.loads(message.data.decode("utf-8"))
+            reply = jsonrpc.loads(message.data.decode("utf-8"))
         except:
             log.warning("received data is not valid JSON")
             return
 
+        self._reader.message_signal.emit(reply)
+
+    def _dispatchMessage(self, reply):
+        """
+        Handles a decoded message in the GUI thread.
+
+        :param reply: JSON-RPC message (dictionary or list for a batch)
+        """
+
+        if isinstance(reply, list):
+            # This is a JSON-RPC batch reply
+            probe_id = self._batch_probe_id
+            if probe_id is not None:
+                self._batchProbeReplied(True)
+            for item in reply:
+                if isinstance(item, dict) and (probe_id is None or item.get("id") != probe_id):
+                    self._handleReply(item)
+            return
+
+        if self._batch_probe_id is not None and "error" in reply and reply.get("id") in (None, self._batch_probe_id):
+            # the server doesn't understand JSON-RPC batches
+            self._batchProbeReplied(False)
+            return
+
+        self._handleReply(reply)
+
+    def _handleReply(self, reply):
+        """
+        Handles a JSON-RPC result, error or notification.
+
+        :param reply: JSON-RPC message (dictionary)
+        """
+
         if "result" in reply:
         # This is a JSON-RPC result
             request_id = reply.get("id")
             result = reply.get("result")
-            if request_id in self.callbacks:
-                self.callbacks[request_id](result)
-                if request_id in self.callbacks:  #FIXME: strange bug with cloud device setup callback, the request is received twice, bug in Qt?
-                    del self.callbacks[request_id]
-                else:
-                    log.warning("JSON-RPC reply received twice: {}".format(reply))
+            # the request is unregistered before calling back so a reply
+            # received twice or after the request expired is ignored.
+            request = self._pending_requests.take(request_id)
+            if request:
+                callback, method, rtt = request
+                self._metrics.requestCompleted(method, rtt)
+                callback(result)
             else:
-                log.warning("unknown JSON-RPC request ID received {}".format(request_id))
+                log.warning("unknown or expired JSON-RPC request ID received {}".format(request_id))
 
         elif "error" in reply:
             # This is a JSON-RPC error
             error_message = reply["error"].get("message")
             error_code = reply["error"].get("code")
             request_id = reply.get("id")
-            if request_id in self.callbacks:
-                self.callbacks[request_id](reply["error"], True)
-                del self.callbacks[request_id]
+            request = self._pending_requests.take(request_id)
+            if request:
+                callback, method, rtt = request
+                self._metrics.requestCompleted(method, rtt)
+                callback(reply["error"], True)
             else:
                 log.warning("received JSON-RPC error {}: {} for request ID {}".format(error_code,
                                                                                       error_message,
@@ -298,12 +608,16 @@ class WebSocketClient(WebSocketBaseClient):
         :param callback: callback method to call when the server replies.
         """
 
-        if not self.connected():
+        if not self.connected() and not self._reconnecting:
             log.warning("connection with server {}:{} is down".format(self.host, self.port))
             return
 
+        if self._batch_depth or self._outgoing or self._reconnecting or destination.endswith(COALESCED_REQUEST_SUFFIXES):
+            self._queueOutgoing(destination, params, callback)
+            return
+
         request = jsonrpc.JSONRPCRequest(destination, params)
-        self.callbacks[request.id] = callback
+        self._pending_requests.add(request.id, destination, callback)
         self.send(str(request))
 
     def send_notification(self, destination, params=None):
@@ -314,36 +628,326 @@ class WebSocketClient(WebSocketBaseClient):
         :param params: params to send (dictionary)
         """
 
-        if not self.connected():
+        if not self.connected() and not self._reconnecting:
             log.warning("connection with server {}:{} is down".format(self.host, self.port))
             return
 
+        if self._batch_depth or self._outgoing or self._reconnecting or destination.endswith(COALESCED_NOTIFICATION_SUFFIXES):
+            self._queueOutgoing(destination, params, None)
+            return
+
         request = jsonrpc.JSONRPCNotification(destination, params)
         self.send(str(request))
 
+    def send_batch(self, messages):
+        """
+        Sends several messages to the server in a single JSON-RPC batch.
+        Messages are sent one by one if the server doesn't support batches.
+
+        :param messages: list of (destination, params, callback) tuples,
+        a notification is sent when callback is None.
+        """
+
+        if not messages:
+            return
+
+        if not self.connected():
+            if self._reconnecting:
+                # sent once reconnected
+                for destination, params, callback in messages:
+                    self._queueOutgoing(destination, params, callback)
+            else:
+                log.warning("connection with server {}:{} is down".format(self.host, self.port))
+            return
+
+        if len(messages) == 1 or not self._batch_supported:
+            for destination, params, callback in messages:
+                if callback is None:
+                    jsonrpc_message = jsonrpc.JSONRPCNotification(destination, params)
+                else:
+                    jsonrpc_message = jsonrpc.JSONRPCRequest(destination, params)
+                    self._pending_requests.add(jsonrpc_message.id, destination, callback)
+                self.send(str(jsonrpc_message))
+            return
+
+        batch = jsonrpc.JSONRPCBatch()
+        for destination, params, callback in messages:
+            if callback is None:
+                batch.add(jsonrpc.JSONRPCNotification(destination, params))
+            else:
+                request = batch.add(jsonrpc.JSONRPCRequest(destination, params))
+                self._pending_requests.add(request.id, destination, callback)
+        log.debug("sending a batch of {} messages to {}:{}".format(len(batch), self.host, self.port))
+        self.send(str(batch))
+
+    def pendingRequests(self):
+        """
+        Returns the requests waiting for a reply from the server.
+
+        :returns: PendingRequests instance
+        """
+
+        return self._pending_requests
+
+    def pendingRequestCount(self):
+        """
+        Returns the number of requests waiting for a reply.
+
+        :returns: integer
+        """
+
+        return self._pending_requests.count()
+
+    def oldestPendingRequestAge(self):
+        """
+        Returns the time the oldest request has been waiting for a reply.
+
+        :returns: seconds
+        """
+
+        return self._pending_requests.oldestAge()
+
+    def startBatch(self):
+        """
+        Starts grouping the messages sent to the server,
+        they are sent as a single batch by endBatch().
+        Calls can be nested.
+        """
+
+        self._batch_depth += 1
+
+    def endBatch(self):
+        """
+        Sends the messages grouped since startBatch().
+        """
+
+        if self._batch_depth == 0:
+            return
+
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._flushOutgoing()
+
+    def _queueOutgoing(self, destination, params, callback):
+        """
+        Queues a message, merging it with a queued message it supersedes.
+
+        Updates for the same method and id are merged, and so are settings
+        notifications (they only carry the changed settings), as long as no other message
+        for the same node (or for the whole module) has been queued in between,
+        so messages concerning a node are always sent in order.
+
+        :param destination: server destination method
+        :param params: params to send (dictionary)
+        :param callback: callback method to call when the server replies (None for a notification)
+        """
+
+        if callback is None:
+            coalesced = destination.endswith(COALESCED_NOTIFICATION_SUFFIXES)
+        else:
+            coalesced = destination.endswith(COALESCED_REQUEST_SUFFIXES)
+
+        if coalesced:
+            module = destination.split(".", 1)[0]
+            target_id = params.get("id") if params else None
+            for entry in reversed(self._outgoing):
+                entry_destination, entry_params, entry_callbacks = entry
+                if entry_destination.split(".", 1)[0] != module:
+                    continue
+                entry_id = entry_params.get("id") if entry_params else None
+                if target_id is not None and entry_id is not None and entry_id != target_id:
+                    # message for another node
+                    continue
+                if entry_destination == destination and (entry_callbacks is None) == (callback is None):
+                    # settings are sent as deltas: the new values are merged with the queued ones
+                    if entry_params is None:
+                        entry[1] = dict(params) if params else params
+                    elif params:
+                        entry_params.update(params)
+                    if callback is not None:
+                        entry_callbacks.append(callback)
+                    self._coalesced_count += 1
+                    log.debug("coalesced {} message for {}:{}".format(destination, self.host, self.port))
+                    return
+                # another message for the same node is queued: keep the order
+                break
+
+        # the caller may modify its params once the message is queued
+        params = dict(params) if params else params
+        self._outgoing.append([destination, params, None if callback is None else [callback]])
+        if not self._batch_depth and not self._flush_timer.isActive():
+            self._flush_timer.start(COALESCING_WINDOW)
+
+    def _flushOutgoing(self):
+        """
+        Sends the queued messages.
+        """
+
+        if self._batch_depth or not self._outgoing or not self.connected():
+            # kept until the connection is restored
+            return
+
+        self._flush_timer.stop()
+        messages = []
+        for destination, params, callbacks in self._outgoing:
+            if callbacks is None:
+                messages.append((destination, params, None))
+            elif len(callbacks) == 1:
+                messages.append((destination, params, callbacks[0]))
+            else:
+                messages.append((destination, params, functools.partial(self._coalescedCallback, callbacks)))
+        self._outgoing = []
+        self.send_batch(messages)
+
+    def takeOutgoing(self):
+        """
+        Removes the queued messages, the messages queued afterwards
+        are sent before them once they are queued again.
+
+        :returns: list of queued messages, for requeueOutgoing()
+        """
+
+        outgoing = self._outgoing
+        self._outgoing = []
+        return outgoing
+
+    def requeueOutgoing(self, outgoing):
+        """
+        Queues again the messages removed by takeOutgoing(),
+        after the messages queued since.
+
+        :param outgoing: list of messages returned by takeOutgoing()
+        """
+
+        self._outgoing.extend(outgoing)
+        if self._outgoing and not self._batch_depth and not self._flush_timer.isActive():
+            self._flush_timer.start(COALESCING_WINDOW)
+
+    def failOutgoing(self, message):
+        """
+        Fails the queued requests and drops the queued notifications,
+        when the connection with the server cannot be restored.
+
+        :param message: error message given to the callbacks
+        """
+
+        outgoing = self._outgoing
+        self._outgoing = []
+        self._flush_timer.stop()
+        for destination, params, callbacks in outgoing:
+            if callbacks is None:
+                continue
+            error = jsonrpc.JSONRPCCustomError(CONNECTION_LOST_ERROR_CODE, message).error
+            for callback in callbacks:
+                callback(error, True)
+
+    @staticmethod
+    def _coalescedCallback(callbacks, result, error=False):
+        """
+        Calls back all the senders of a coalesced request.
+
+        :param callbacks: list of callbacks
+        :param result: server response
+        :param error: indicates an error (boolean)
+        """
+
+        for callback in callbacks:
+            callback(result, error)
+
+    def coalescedCount(self):
+        """
+        Returns the number of messages merged into others before being sent.
+
+        :returns: integer
+        """
+
+        return self._coalesced_count
+
+    def supportsBatch(self):
+        """
+        Returns either the server supports JSON-RPC batches.
+
+        :returns: boolean (None if unknown yet)
+        """
+
+        return self._batch_supported
+
+    def _probeBatchSupport(self):
+        """
+        Sends a batch containing a single request to find out
+        if the server supports JSON-RPC batches.
+        """
+
+        request = jsonrpc.JSONRPCRequest("batch.probe")
+        self._batch_supported = None
+        self._batch_probe_id = request.id
+        self.send(str(jsonrpc.JSONRPCBatch([request])))
+        QtCore.QTimer.singleShot(5000, functools.partial(self._batchProbeTimeout, request.id))
+
+    def _batchProbeReplied(self, supported):
+        """
+        Records the result of the batch support probe.
+
+        :param supported: boolean
+        """
+
+        self._batch_probe_id = None
+        self._batch_supported = supported
+        log.info("server {}:{} {} JSON-RPC batches".format(self.host,
+                                                           self.port,
+                                                           "supports" if supported else "doesn't support"))
+
+    def _batchProbeTimeout(self, probe_id):
+        """
+        Called when the server hasn't replied to the batch support probe.
+
+        :param probe_id: request ID of the probe, a probe sent
+        on a previous connection is ignored
+        """
+
+        if probe_id == self._batch_probe_id:
+            self._batchProbeReplied(False)
+
     def close_connection(self):
         """
-        Closes the connection to the server and remove the monitoring by
-        the QSocketNotifier.
+        Closes the connection to the server and stops
+        monitoring it from the network thread.
         """
 
         self._connected = False
+        self._handshaked = False
         self._version = ""
-        WebSocketBaseClient.close_connection(self)
-        if self._fd_notifier:
-            self._fd_notifier.setEnabled(False)
-            self._fd_notifier = None
+        self._batch_supported = None
+        self._batch_probe_id = None
+        self._deflate = None
+        self._inflater = None
+        # the network thread must not read from the closed socket
+        self._reader.unwatch()
+        with self._write_lock:
+            WebSocketBaseClient.close_connection(self)
         log.info("connection closed with server {}:{}".format(self.host, self.port))
 
-    def data_received(self, fd):
+    def _connectionLostSlot(self):
         """
-        Callback called when data is received from the server.
+        Slot called in the GUI thread when the connection
+        has been lost or closed by the server.
         """
 
-        # read the data, if successful received_message() is called by once()
-        if self.once() == False:
-            log.warning("lost connection with server {}:{}".format(self.host, self.port))
-            self.close_connection()
+        if not self._connected:
+            return
+
+        log.warning("lost connection with server {}:{}".format(self.host, self.port))
+        if self._heartbeat_timer is not None:
+            self._heartbeat_timer.stop()
+        if self._tunnel:
+            self._tunnel.disconnect()
+        self.close_connection()
+
+        # the requests already sent may or may not have been processed by the server,
+        # they cannot be safely sent again
+        self._pending_requests.failAll("Connection lost with server {}:{}".format(self.host, self.port),
+                                       CONNECTION_LOST_ERROR_CODE)
+        ReconnectSupervisor.instance().connectionLost(self)
 
     def dump(self):
         """
@@ -357,10 +961,21 @@ class WebSocketClient(WebSocketBaseClient):
                 "port": self.port,
                 "local": self._local}
 
+    def metrics(self):
+        """
+        Returns the metrics collected on this connection.
+
+        :returns: ServerMetrics instance
+        """
+
+        return self._metrics
+
     def _heartbeat(self):
+        self._metrics.heartbeatSent()
         self.send_notification("deadman.heartbeat")
 
     def enableHeartbeatsAt(self, interval):
+        self._metrics.setHeartbeatInterval(interval)
         self._heartbeat_timer = QtCore.QTimer()
         self._heartbeat_timer.timeout.connect(self._heartbeat)
         self._heartbeat_timer.start(interval)
@@ -453,6 +1068,9 @@ class SecureWebSocketClient(WebSocketClient):
         if self.extra_headers:
             headers.extend(self.extra_headers)
 
+        if self._compression:
+            headers.append(("Sec-WebSocket-Extensions", extensionOffer()))
+
         return headers
 
     @property
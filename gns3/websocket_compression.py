@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+WebSocket permessage-deflate extension (RFC 7692).
+
+ws4py doesn't support extensions at the frame level: compressed frames
+are built here and the compressed frames received from the server are
+inflated before being handed to ws4py.
+"""
+
+import os
+import struct
+import zlib
+
+import logging
+log = logging.getLogger(__name__)
+
+EXTENSION_NAME = "permessage-deflate"
+
+# messages smaller than this number of bytes are sent uncompressed
+COMPRESSION_THRESHOLD = 256
+
+# zlib compression level
+COMPRESSION_LEVEL = 6
+
+# appended by a sync flush, removed from the compressed messages
+DEFLATE_TRAILER = b"\x00\x00\xff\xff"
+
+# bytes read from the socket at once while compression is active,
+# the frames are reassembled here so ws4py's read sizes don't apply
+READING_SIZE = 65536
+
+# frame opcodes
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+
+
+def extensionOffer():
+    """
+    Returns the Sec-WebSocket-Extensions header value offered to the server.
+
+    :returns: string
+    """
+
+    return "{}; client_max_window_bits".format(EXTENSION_NAME)
+
+
+def mask(data, masking_key):
+    """
+    Masks (or unmasks) a frame payload.
+
+    :param data: payload (bytes)
+    :param masking_key: 4 bytes
+
+    :returns: bytes
+    """
+
+    if not data:
+        return b""
+    size = len(data)
+    key = (masking_key * (size // 4 + 1))[:size]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(size, "big")
+
+
+def buildFrame(opcode, payload, compressed=False, masked=True):
+    """
+    Builds a single (final) frame.
+
+    :param opcode: frame opcode
+    :param payload: payload (bytes)
+    :param compressed: sets the RSV1 bit of compressed messages
+    :param masked: masks the payload, required for frames sent by a client
+
+    :returns: bytes
+    """
+
+    first_byte = 0x80 | opcode
+    if compressed:
+        first_byte |= 0x40
+    mask_bit = 0x80 if masked else 0
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", first_byte, mask_bit | length)
+    elif length < 65536:
+        header = struct.pack("!BBH", first_byte, mask_bit | 126, length)
+    else:
+        header = struct.pack("!BBQ", first_byte, mask_bit | 127, length)
+    if masked:
+        masking_key = os.urandom(4)
+        return header + masking_key + mask(payload, masking_key)
+    return header + payload
+
+
+class PerMessageDeflate(object):
+    """
+    Compression context negotiated with a server.
+
+    :param client_no_context_takeover: the compression context is reset for each message sent
+    :param server_no_context_takeover: the compression context is reset for each message received
+    :param client_max_window_bits: LZ77 window size used to compress
+    """
+
+    def __init__(self, client_no_context_takeover=False, server_no_context_takeover=False, client_max_window_bits=15):
+
+        self._client_no_context_takeover = client_no_context_takeover
+        self._server_no_context_takeover = server_no_context_takeover
+        self._client_max_window_bits = client_max_window_bits
+        self._compressor = None
+        self._decompressor = None
+
+    @classmethod
+    def fromResponse(cls, value):
+        """
+        Creates the compression context from the extensions accepted by the server.
+
+        :param value: Sec-WebSocket-Extensions header value sent by the server
+
+        :returns: PerMessageDeflate instance or None if not accepted by the server
+
+        :raises ValueError: if the server accepted the extension with parameters we cannot honor
+        """
+
+        for extension in value.split(","):
+            params = [param.strip() for param in extension.split(";")]
+            if params[0] != EXTENSION_NAME:
+                continue
+
+            options = {}
+            for param in params[1:]:
+                name, _, param_value = param.partition("=")
+                name = name.strip()
+                param_value = param_value.strip().strip('"')
+                if name == "client_no_context_takeover":
+                    options["client_no_context_takeover"] = True
+                elif name == "server_no_context_takeover":
+                    options["server_no_context_takeover"] = True
+                elif name == "client_max_window_bits":
+                    bits = int(param_value) if param_value else 15
+                    # zlib doesn't support raw deflate with an 8 bits window
+                    if not 9 <= bits <= 15:
+                        raise ValueError("unsupported client_max_window_bits {}".format(param_value))
+                    options["client_max_window_bits"] = bits
+                elif name == "server_max_window_bits":
+                    # inflating with the maximum window handles any window size
+                    if not param_value or not 8 <= int(param_value) <= 15:
+                        raise ValueError("invalid server_max_window_bits {}".format(param_value))
+                else:
+                    raise ValueError("unknown {} parameter {}".format(EXTENSION_NAME, name))
+            return cls(**options)
+        return None
+
+    def compress(self, data):
+        """
+        Compresses a message.
+
+        :param data: message payload (bytes)
+
+        :returns: compressed payload (bytes)
+        """
+
+        if self._compressor is None or self._client_no_context_takeover:
+            self._compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -self._client_max_window_bits)
+        compressed = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if compressed.endswith(DEFLATE_TRAILER):
+            compressed = compressed[:-len(DEFLATE_TRAILER)]
+        return compressed
+
+    def decompress(self, data):
+        """
+        Decompresses a message.
+
+        :param data: compressed payload (bytes)
+
+        :returns: message payload (bytes)
+        """
+
+        if self._decompressor is None or self._server_no_context_takeover:
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        try:
+            return self._decompressor.decompress(data + DEFLATE_TRAILER)
+        except zlib.error as e:
+            raise ValueError("could not decompress message: {}".format(e))
+
+
+class FrameInflater(object):
+    """
+    Parses the frames received from the server and replaces the
+    compressed messages by uncompressed frames, the other frames
+    are passed through untouched.
+
+    :param deflate: PerMessageDeflate instance
+    :param metrics: ServerMetrics instance recording the compression ratio (optional)
+    """
+
+    def __init__(self, deflate, metrics=None):
+
+        self._deflate = deflate
+        self._metrics = metrics
+        self._buffer = bytearray()
+        self._compressed = False
+        self._opcode = None
+        self._fragments = []
+
+    def feed(self, data):
+        """
+        Feeds data received from the server.
+
+        :param data: bytes
+
+        :returns: list of complete frames (bytes) to be processed by ws4py
+        """
+
+        self._buffer.extend(data)
+        output = []
+        while True:
+            frame = self._nextFrame()
+            if frame is None:
+                break
+            raw, fin, rsv1, opcode, payload = frame
+            if opcode >= 0x8:
+                # control frames are never compressed
+                output.append(raw)
+                continue
+
+            if opcode != OPCODE_CONTINUATION:
+                self._compressed = bool(rsv1)
+                self._opcode = opcode
+
+            if not self._compressed:
+                output.append(raw)
+                continue
+
+            self._fragments.append(payload)
+            if fin:
+                compressed = b"".join(self._fragments)
+                self._fragments = []
+                message = self._deflate.decompress(compressed)
+                if self._metrics is not None:
+                    self._metrics.messageDecompressed(len(compressed), len(message))
+                output.append(buildFrame(self._opcode, message, masked=False))
+        return output
+
+    def _nextFrame(self):
+        """
+        Extracts the next complete frame from the buffer.
+
+        :returns: tuple (raw bytes, fin, rsv1, opcode, unmasked payload) or None
+        """
+
+        buffer = self._buffer
+        if len(buffer) < 2:
+            return None
+
+        first_byte, second_byte = buffer[0], buffer[1]
+        offset = 2
+        length = second_byte & 0x7f
+        if length == 126:
+            if len(buffer) < 4:
+                return None
+            length = struct.unpack_from("!H", buffer, 2)[0]
+            offset = 4
+        elif length == 127:
+            if len(buffer) < 10:
+                return None
+            length = struct.unpack_from("!Q", buffer, 2)[0]
+            offset = 10
+
+        masking_key = None
+        if second_byte & 0x80:
+            if len(buffer) < offset + 4:
+                return None
+            masking_key = bytes(buffer[offset:offset + 4])
+            offset += 4
+
+        end = offset + length
+        if len(buffer) < end:
+            return None
+
+        raw = bytes(buffer[:end])
+        payload = raw[offset:]
+        if masking_key is not None:
+            payload = mask(payload, masking_key)
+        del buffer[:end]
+        return raw, first_byte & 0x80, first_byte & 0x40, first_byte & 0x0f, payload
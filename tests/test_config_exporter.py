@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import shutil
+import tarfile
+import zipfile
+import tempfile
+from unittest import TestCase
+
+from gns3.qt import QtGui
+from gns3.config_exporter import ConfigExporter, archiveFormat
+
+
+class FakeServer(object):
+    host = "127.0.0.1"
+    port = 8000
+
+    def __init__(self, connected=True):
+        self.sent = []
+        self.batches = 0
+        self._connected = connected
+
+    def connected(self):
+        return self._connected
+
+    def isReconnecting(self):
+        return False
+
+    def startBatch(self):
+        pass
+
+    def endBatch(self):
+        self.batches += 1
+
+    def send_message(self, destination, params, callback):
+        self.sent.append((destination, params, callback))
+
+    def reply(self, result=None, error=False):
+        destination, params, callback = self.sent.pop(0)
+        if result is None:
+            result = {"config": "hostname {}\n".format(params["id"])}
+        callback(result, error)
+
+
+class FakeNode(object):
+
+    def __init__(self, node_id, server, initialized=True):
+        self._id = node_id
+        self._server = server
+        self._initialized = initialized
+
+    def server(self):
+        return self._server
+
+    def initialized(self):
+        return self._initialized
+
+    def name(self):
+        return "R{}".format(self._id)
+
+    def exportConfigMessage(self):
+        return "dynamips.vm.export_config", {"id": self._id}
+
+    def exportedConfigs(self, result):
+        yield "{}_startup-config.cfg".format(self.name()), result["config"].encode("utf-8")
+
+
+class TestConfigExporter(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv)
+        self.directory = tempfile.mkdtemp()
+        self.finished = []
+        self.progress = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _exporter(self, nodes, file_name, window=2):
+        exporter = ConfigExporter(nodes, os.path.join(self.directory, file_name), window=window)
+        exporter.finished_signal.connect(lambda: self.finished.append(True))
+        exporter.progress_signal.connect(lambda done, total: self.progress.append((done, total)))
+        return exporter
+
+    def test_archive_format(self):
+        self.assertEqual(archiveFormat("configs.ZIP"), "zip")
+        self.assertEqual(archiveFormat("configs.tar.gz"), "gztar")
+        self.assertEqual(archiveFormat("configs.tar"), "tar")
+        self.assertIsNone(archiveFormat("configs"))
+
+    def test_window_per_server(self):
+        server1 = FakeServer()
+        server2 = FakeServer()
+        nodes = [FakeNode(i, server1) for i in range(5)] + [FakeNode(i, server2) for i in range(5, 7)]
+        exporter = self._exporter(nodes + [FakeNode(7, server1, initialized=False)], "configs.zip")
+        exporter.start()
+        self.assertEqual(exporter.total(), 7)
+        self.assertEqual(len(server1.sent), 2)
+        self.assertEqual(len(server2.sent), 2)
+
+        server1.reply()
+        self.assertEqual(len(server1.sent), 2)
+        while server1.sent or server2.sent:
+            for server in (server1, server2):
+                if server.sent:
+                    server.reply()
+
+        self.assertEqual(self.finished, [True])
+        self.assertEqual(self.progress[-1], (7, 7))
+        with zipfile.ZipFile(exporter.path()) as archive:
+            self.assertEqual(len(archive.namelist()), 7)
+            self.assertEqual(archive.read("R3_startup-config.cfg"), b"hostname 3\n")
+
+    def test_failures(self):
+        server = FakeServer()
+        exporter = self._exporter([FakeNode(1, server), FakeNode(2, server)], "configs.tar.gz")
+        exporter.start()
+        server.reply({"message": "timeout", "code": -32001}, error=True)
+        server.reply()
+        self.assertEqual(exporter.failures(), [("R1", "timeout")])
+        self.assertEqual(exporter.exportedCount(), 1)
+        with tarfile.open(exporter.path()) as archive:
+            self.assertEqual(archive.getnames(), ["R2_startup-config.cfg"])
+
+    def test_disconnected_server(self):
+        server = FakeServer()
+        disconnected_server = FakeServer(connected=False)
+        nodes = [FakeNode(1, server), FakeNode(2, disconnected_server), FakeNode(3, disconnected_server)]
+        exporter = self._exporter(nodes, "configs.zip")
+        exporter.start()
+        self.assertEqual(disconnected_server.sent, [])
+        self.assertEqual([name for name, message in exporter.failures()], ["R2", "R3"])
+        self.assertTrue(exporter.isRunning())
+        server.reply()
+        self.assertEqual(self.finished, [True])
+        self.assertEqual(self.progress[-1], (3, 3))
+
+    def test_directory(self):
+        server = FakeServer()
+        exporter = self._exporter([FakeNode(1, server)], "configs")
+        exporter.start()
+        server.reply()
+        with open(os.path.join(exporter.path(), "R1_startup-config.cfg"), "rb") as f:
+            self.assertEqual(f.read(), b"hostname 1\n")
+
+    def test_cancel(self):
+        server = FakeServer()
+        exporter = self._exporter([FakeNode(i, server) for i in range(4)], "configs.zip")
+        exporter.start()
+        server.reply()
+        exporter.cancel()
+        self.assertTrue(exporter.isCancelled())
+        self.assertEqual(self.finished, [True])
+        self.assertFalse(os.path.exists(exporter.path()))
+
+        # late replies are ignored and nothing else is sent
+        server.reply()
+        self.assertEqual(len(server.sent), 1)
+        self.assertEqual(self.finished, [True])
+
+    def test_no_nodes(self):
+        exporter = self._exporter([], "configs.zip")
+        exporter.start()
+        self.assertEqual(self.finished, [True])
+        self.assertFalse(exporter.isRunning())
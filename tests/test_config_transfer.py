@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import os
+import base64
+import shutil
+import tempfile
+from unittest import TestCase
+
+from gns3 import config_transfer
+from gns3.config_transfer import ConfigTransferService, encodeConfig
+
+
+class FakeServer(object):
+
+    def __init__(self, server_id):
+        self._id = server_id
+
+    def id(self):
+        return self._id
+
+
+class TestConfigTransfer(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "startup-config.cfg")
+        self.service = ConfigTransferService()
+        self.server = FakeServer(1)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, content):
+        with open(self.path, "w", newline="") as f:
+            f.write(content)
+        # make sure the modification is seen even within the same timestamp
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+    def test_encode_across_chunks(self):
+        content = "hostname R1\r\n" + "interface f0/0\r\n no shutdown\r\n" * 5000
+        self._write(content)
+        self.assertGreater(len(content), config_transfer.CHUNK_SIZE)
+        expected = base64.b64encode(("!\n" + content.replace("\r", "")).encode("utf-8")).decode("ascii")
+        self.assertEqual(encodeConfig(self.path, prefix="!\n"), expected)
+
+    def test_unchanged_config_not_sent_again(self):
+        self._write("hostname R1\n")
+        first = self.service.upload(self.server, ("dynamips", 1), "startup_config", self.path, prefix="!\n")
+        self.assertEqual(base64.b64decode(first), b"!\nhostname R1\n")
+        self.assertIsNone(self.service.upload(self.server, ("dynamips", 1), "startup_config", self.path, prefix="!\n"))
+
+        # another device or config still needs it
+        self.assertIsNotNone(self.service.upload(self.server, ("dynamips", 2), "startup_config", self.path, prefix="!\n"))
+        self.assertIsNotNone(self.service.upload(self.server, ("dynamips", 1), "private_config", self.path, prefix="!\n"))
+        self.assertEqual(self.service.stats(), {"uploads": 3, "skipped": 1})
+
+    def test_changed_config_sent_again(self):
+        self._write("hostname R1\n")
+        self.service.upload(self.server, ("iou", 1), "initial_config", self.path)
+        self._write("hostname R2\n")
+        self.assertEqual(base64.b64decode(self.service.upload(self.server, ("iou", 1), "initial_config", self.path)), b"hostname R2\n")
+
+    def test_forget(self):
+        self._write("ip 10.0.0.1\n")
+        self.service.upload(self.server, ("vpcs", 1), "script_file", self.path)
+        self.service.forget(self.server)
+        self.assertIsNotNone(self.service.upload(self.server, ("vpcs", 1), "script_file", self.path))
+
+    def test_received(self):
+        self._write("hostname R1\r\n")
+        self.service.received(self.server, ("iou", 1), "initial_config", b"hostname R1\n")
+        self.assertIsNone(self.service.upload(self.server, ("iou", 1), "initial_config", self.path))
+
+    def test_unreadable_config(self):
+        self.assertEqual(self.service.upload(self.server, ("iou", 1), "initial_config", os.path.join(self.directory, "missing")), "")
+
+
+class FakeVPCSServer(FakeServer):
+
+    def __init__(self, server_id):
+        FakeServer.__init__(self, server_id)
+        self.updates = []
+
+    def isLocal(self):
+        return False
+
+    def send_message(self, destination, params, callback):
+        if destination == "vpcs.create":
+            # the server hands out the ID of the deleted device again
+            callback({"id": 1, "name": params["name"]})
+        elif destination == "vpcs.update":
+            self.updates.append(params)
+        elif destination == "vpcs.delete":
+            callback({})
+
+
+class FakeModule(object):
+
+    def addNode(self, node):
+        pass
+
+    def removeNode(self, node):
+        pass
+
+
+class TestDeviceIdReuse(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "startup.vpc")
+        with open(self.path, "w") as f:
+            f.write("ip 10.0.0.1\n")
+        ConfigTransferService.instance().clear()
+
+    def tearDown(self):
+        ConfigTransferService.instance().clear()
+        shutil.rmtree(self.directory)
+
+    def test_delete_then_recreate_with_same_id(self):
+        from gns3.modules.vpcs.vpcs_device import VPCSDevice
+
+        server = FakeVPCSServer(1)
+        device = VPCSDevice(FakeModule(), server)
+        device.setup("PC1", initial_settings={"script_file": self.path})
+        self.assertIn("script_file_base64", server.updates[-1])
+        device.delete()
+
+        device = VPCSDevice(FakeModule(), server)
+        device.setup("PC2", initial_settings={"script_file": self.path})
+        self.assertIn("script_file_base64", server.updates[-1])
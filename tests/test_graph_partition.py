@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+
+from gns3.graph_partition import partitionGraph, cutWeight
+
+
+def grid(width, height):
+
+    weights = {(x, y): 1 for x in range(width) for y in range(height)}
+    edges = {}
+    for x in range(width):
+        for y in range(height):
+            if x < width - 1:
+                edges[((x, y), (x + 1, y))] = 1
+            if y < height - 1:
+                edges[((x, y), (x, y + 1))] = 1
+    return weights, edges
+
+
+class TestGraphPartition(TestCase):
+
+    def test_two_clusters(self):
+        weights = {vertex: 1 for vertex in range(20)}
+        edges = {}
+        for source in range(10):
+            for destination in range(source + 1, 10):
+                edges[(source, destination)] = 1
+                edges[(source + 10, destination + 10)] = 1
+        edges[(0, 10)] = 1
+        assignment = partitionGraph(weights, edges, [1, 1])
+        self.assertEqual(cutWeight(edges, assignment), 1)
+        self.assertEqual(len({assignment[vertex] for vertex in range(10)}), 1)
+
+    def test_grid_balanced(self):
+        weights, edges = grid(10, 10)
+        assignment = partitionGraph(weights, edges, [1, 1, 1, 1])
+        sizes = [list(assignment.values()).count(part) for part in range(4)]
+        self.assertTrue(all(20 <= size <= 30 for size in sizes))
+        # a good 4-way cut of a 10x10 grid is 20 edges, a random one ~135
+        self.assertLessEqual(cutWeight(edges, assignment), 30)
+
+    def test_capacities(self):
+        weights, edges = grid(10, 10)
+        assignment = partitionGraph(weights, edges, [1, 3])
+        self.assertAlmostEqual(list(assignment.values()).count(0), 25, delta=6)
+
+    def test_fixed(self):
+        weights, edges = grid(6, 6)
+        fixed = {(0, 0): 1, (5, 5): 0}
+        assignment = partitionGraph(weights, edges, [1, 1], fixed)
+        self.assertEqual(assignment[(0, 0)], 1)
+        self.assertEqual(assignment[(5, 5)], 0)
+
+    def test_single_part(self):
+        weights, edges = grid(3, 3)
+        self.assertEqual(set(partitionGraph(weights, edges, [1]).values()), {0})
+        self.assertEqual(partitionGraph({}, {}, [1, 1]), {})
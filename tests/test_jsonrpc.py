@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import sys
+import json
+import time
+from unittest import TestCase
+
+from gns3 import jsonrpc
+from gns3.qt import QtGui
+from gns3.websocket_client import WebSocketClient
+from gns3.jsonrpc import JSONRPCBatch, JSONRPCRequest, JSONRPCNotification, JSONRPCCustomError
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class ReflectionRequest(object):
+    """
+    Request encoded by looking up its fields,
+    the way messages used to be encoded.
+    """
+
+    def __init__(self, method, params, request_id):
+        self.id = request_id
+        self.method = method
+        self.params = params
+
+
+def reflection_encode(obj):
+    message = {"jsonrpc": 2.0}
+    for field in dir(obj):
+        if not field.startswith('_'):
+            message[field] = getattr(obj, field)
+    return json.dumps(message)
+
+
+class TestJSONRPC(TestCase):
+
+    def test_request(self):
+        first = JSONRPCRequest("vpcs.start", {"id": 1})
+        second = JSONRPCRequest("vpcs.stop")
+        self.assertIsInstance(first.id, int)
+        self.assertGreater(second.id, first.id)
+        self.assertEqual(json.loads(str(first)), {"jsonrpc": 2.0, "id": first.id, "method": "vpcs.start", "params": {"id": 1}})
+        self.assertEqual(json.loads(str(second)), {"jsonrpc": 2.0, "id": second.id, "method": "vpcs.stop"})
+        self.assertFalse(hasattr(first, "__dict__"))
+
+    def test_error(self):
+        error = JSONRPCCustomError(-3200, "error", 42)
+        self.assertEqual(json.loads(str(error)), {"jsonrpc": 2.0, "id": 42, "error": {"code": -3200, "message": "error"}})
+
+    def test_batch(self):
+        batch = JSONRPCBatch()
+        request = batch.add(JSONRPCRequest("vpcs.start", {"id": 1}))
+        batch.add(JSONRPCNotification("vpcs.settings", {"path": "/tmp"}))
+        self.assertEqual(len(batch), 2)
+
+        messages = json.loads(str(batch))
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0]["method"], "vpcs.start")
+        self.assertEqual(messages[0]["id"], request.id)
+        self.assertEqual(messages[0]["params"], {"id": 1})
+        self.assertEqual(messages[1]["method"], "vpcs.settings")
+        self.assertNotIn("id", messages[1])
+
+    def test_codecs(self):
+        message = {"jsonrpc": 2.0, "id": 1, "result": {"name": "R1", "ports": [1, 2, 3]}}
+        try:
+            for codec in jsonrpc.availableJSONCodecs():
+                self.assertEqual(jsonrpc.setJSONCodec(codec), codec)
+                self.assertEqual(jsonrpc.loads(jsonrpc.dumps(message)), message)
+            self.assertEqual(jsonrpc.setJSONCodec("unknown"), "json")
+            self.assertIn(jsonrpc.setJSONCodec("auto"), jsonrpc.availableJSONCodecs())
+        finally:
+            jsonrpc.setJSONCodec("json")
+
+    def test_encode_benchmark(self):
+        params = {"id": 1, "name": "R1", "settings": {"ram": 256, "nvram": 128}}
+        count = 20000
+
+        start = time.perf_counter()
+        for request_id in range(count):
+            reflection_encode(ReflectionRequest("dynamips.vm.update", params, request_id))
+        reflection = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for request_id in range(count):
+            str(JSONRPCRequest("dynamips.vm.update", params, request_id))
+        direct = time.perf_counter() - start
+
+        log.info("encoding {} requests: {:.3f}s (reflection {:.3f}s)".format(count, direct, reflection))
+        self.assertEqual(json.loads(str(JSONRPCRequest("dynamips.vm.update", params, 1))),
+                         json.loads(reflection_encode(ReflectionRequest("dynamips.vm.update", params, 1))))
+
+    def test_decode_benchmark(self):
+        count = 20000
+        data = str(JSONRPCNotification("vpcs.settings", {"id": 1, "name": "PC1", "console": 2001, "script_file": "/tmp/startup.vpc"}))
+        durations = {}
+        try:
+            for codec in jsonrpc.availableJSONCodecs():
+                jsonrpc.setJSONCodec(codec)
+                loads = jsonrpc.loads
+                start = time.perf_counter()
+                for _ in range(count):
+                    loads(data)
+                durations[codec] = time.perf_counter() - start
+                log.info("decoding {} notifications with {}: {:.3f}s".format(count, codec, durations[codec]))
+                self.assertEqual(loads(data)["method"], "vpcs.settings")
+
+            self.assertIn(jsonrpc.setJSONCodec("auto"), durations)
+        finally:
+            jsonrpc.setJSONCodec("json")
+
+
+class TestBatchDispatch(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv)
+        self.client = WebSocketClient("ws://127.0.0.1:8000")
+        self.client._connected = True
+        self.sent = []
+        self.client.send = lambda data: self.sent.append(json.loads(data))
+        self.replies = []
+
+    def callback(self, result, error=False):
+        self.replies.append((result, error))
+
+    def _probe(self):
+        self.client._probeBatchSupport()
+        probe = self.sent.pop()
+        self.assertIsInstance(probe, list)
+        return probe[0]["id"]
+
+    def _sendTwo(self):
+        self.client.send_batch([("vpcs.start", {"id": 1}, self.callback),
+                                ("vpcs.start", {"id": 2}, self.callback)])
+
+    def test_batch_reply(self):
+        probe_id = self._probe()
+        self.client._dispatchMessage([{"jsonrpc": 2.0, "id": probe_id, "error": {"code": -32601, "message": "Method not found"}}])
+        self.assertTrue(self.client.supportsBatch())
+
+        self._sendTwo()
+        self.assertEqual(len(self.sent), 1)
+        batch = self.sent[0]
+        self.assertEqual(len(batch), 2)
+
+        # the replies of a batch can come in any order
+        self.client._dispatchMessage([{"jsonrpc": 2.0, "id": batch[1]["id"], "result": 2},
+                                      {"jsonrpc": 2.0, "id": batch[0]["id"], "error": {"code": -3200, "message": "error"}}])
+        self.assertEqual(self.replies, [(2, False), ({"code": -3200, "message": "error"}, True)])
+
+    def test_probe_fallback(self):
+        self._probe()
+        # servers without batch support reply with a single error
+        self.client._dispatchMessage({"jsonrpc": 2.0, "id": None, "error": {"code": -32600, "message": "Invalid Request"}})
+        self.assertFalse(self.client.supportsBatch())
+
+        self._sendTwo()
+        self.assertEqual([message["params"]["id"] for message in self.sent], [1, 2])
+
+    def test_stale_probe_timeout(self):
+        stale_probe_id = self._probe()
+        # connection lost and restored: a new probe is sent
+        probe_id = self._probe()
+        self.client._batchProbeTimeout(stale_probe_id)
+        self.assertIsNone(self.client.supportsBatch())
+        self.client._batchProbeTimeout(probe_id)
+        self.assertFalse(self.client.supportsBatch())
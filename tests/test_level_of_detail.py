@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import sys
+from unittest import TestCase
+
+from gns3.qt import QtGui
+from gns3 import level_of_detail
+from gns3.graphics_scene import GraphicsScene
+from gns3.items.shape_item import ShapeItem
+
+
+class FakeShapeItem(ShapeItem, QtGui.QGraphicsRectItem):
+
+    def __init__(self):
+        QtGui.QGraphicsRectItem.__init__(self, 0, 0, 200, 100)
+
+
+class TestLevelOfDetail(TestCase):
+
+    def tearDown(self):
+        level_of_detail.setEnabled(True)
+
+    def test_level_for_scale(self):
+        self.assertEqual(level_of_detail.levelForScale(1.0), level_of_detail.FULL)
+        self.assertEqual(level_of_detail.levelForScale(0.5), level_of_detail.FULL)
+        self.assertEqual(level_of_detail.levelForScale(0.4), level_of_detail.REDUCED)
+        self.assertEqual(level_of_detail.levelForScale(0.1), level_of_detail.MINIMAL)
+
+    def test_disabled(self):
+        level_of_detail.setEnabled(False)
+        self.assertFalse(level_of_detail.isEnabled())
+        self.assertEqual(level_of_detail.levelForScale(0.1), level_of_detail.FULL)
+
+
+class TestSceneLevelOfDetail(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv)
+        self.scene = GraphicsScene()
+
+    def test_added_items_use_current_level(self):
+        self.scene.setLevelOfDetail(level_of_detail.REDUCED)
+        item = FakeShapeItem()
+        self.scene.addItem(item)
+        self.assertEqual(item.cacheMode(), QtGui.QGraphicsItem.ItemCoordinateCache)
+
+        # added again once zoomed in
+        self.scene.removeItem(item)
+        self.scene.setLevelOfDetail(level_of_detail.FULL)
+        self.scene.addItem(item)
+        self.assertEqual(item.cacheMode(), QtGui.QGraphicsItem.NoCache)
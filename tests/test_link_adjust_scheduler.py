@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import sys
+from unittest import TestCase
+
+from gns3.qt import QtGui
+from gns3.link_adjust_scheduler import LinkAdjustScheduler
+
+
+class FakeLinkItem(object):
+
+    def __init__(self, in_scene=True):
+        self.adjusted = 0
+        self._in_scene = in_scene
+
+    def scene(self):
+        return object() if self._in_scene else None
+
+    def adjust(self):
+        self.adjusted += 1
+
+
+class TestLinkAdjustScheduler(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.scheduler = LinkAdjustScheduler()
+
+    def test_coalesced(self):
+        shared = FakeLinkItem()
+        other = FakeLinkItem()
+        # two nodes of a dragged selection moving twice
+        for _ in range(2):
+            for link_item in (shared, other, shared):
+                self.scheduler.schedule(link_item)
+        self.assertEqual(self.scheduler.pending(), 2)
+        self.scheduler.flush()
+        self.assertEqual((shared.adjusted, other.adjusted), (1, 1))
+        self.assertEqual(self.scheduler.stats(), {"scheduled": 6, "adjusted": 2})
+
+    def test_removed_links_skipped(self):
+        removed = FakeLinkItem(in_scene=False)
+        cancelled = FakeLinkItem()
+        self.scheduler.schedule(removed)
+        self.scheduler.schedule(cancelled)
+        self.scheduler.cancel(cancelled)
+        self.scheduler.flush()
+        self.assertEqual((removed.adjusted, cancelled.adjusted), (0, 0))
+        self.assertEqual(self.scheduler.pending(), 0)
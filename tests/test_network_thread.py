@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import sys
+import threading
+from unittest import TestCase
+
+from gns3.qt import QtGui
+from gns3.network_thread import SocketReader, NetworkThread
+
+
+class FakeClient(object):
+
+    def __init__(self, result=True):
+        self.reads = 0
+        self.result = result
+        self.reading = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def once(self):
+        self.reads += 1
+        self.reading.set()
+        self.release.wait(5)
+        return self.result
+
+
+class TestSocketReader(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.disconnected = []
+
+    def tearDown(self):
+        del self.app
+
+    def _reader(self, client):
+        reader = SocketReader(client)
+        reader.disconnected_signal.connect(lambda: self.disconnected.append(True))
+        # no socket notifier
+        reader.watch_signal.disconnect()
+        reader.unwatch_signal.disconnect()
+        return reader
+
+    def test_no_read_once_unwatched(self):
+        client = FakeClient()
+        reader = self._reader(client)
+        reader._readSlot(0)
+        self.assertEqual(client.reads, 0)
+
+        reader.watch(0)
+        reader._readSlot(0)
+        self.assertEqual(client.reads, 1)
+
+        reader.unwatch()
+        reader._readSlot(0)
+        self.assertEqual(client.reads, 1)
+
+    def test_unwatch_waits_for_read(self):
+        client = FakeClient()
+        client.release.clear()
+        reader = self._reader(client)
+        reader.watch(0)
+
+        read_thread = threading.Thread(target=reader._readSlot, args=(0,))
+        read_thread.start()
+        self.assertTrue(client.reading.wait(5))
+
+        unwatched = threading.Event()
+        unwatch_thread = threading.Thread(target=lambda: (reader.unwatch(), unwatched.set()))
+        unwatch_thread.start()
+        # the socket is still being read
+        self.assertFalse(unwatched.wait(0.1))
+
+        client.release.set()
+        read_thread.join(5)
+        unwatch_thread.join(5)
+        self.assertTrue(unwatched.is_set())
+
+    def test_disconnected(self):
+        client = FakeClient(result=False)
+        reader = self._reader(client)
+        reader.watch(0)
+        reader._readSlot(0)
+        self.assertEqual(self.disconnected, [True])
+
+        # nothing is read after a disconnection
+        reader._readSlot(0)
+        self.assertEqual(client.reads, 1)
+
+
+class TestConnectionResult(TestCase):
+
+    def test_callbacks(self):
+        thread = NetworkThread()
+        results = []
+        client = object()
+        thread._callbacks[client] = [lambda result, error=False: results.append((result, error))] * 2
+        self.assertTrue(thread.isConnecting(client))
+
+        thread._connectionResultSlot(client, "Connection refused", 111)
+        self.assertEqual(results, [({"message": "Connection refused", "errno": 111}, True)] * 2)
+        self.assertFalse(thread.isConnecting(client))
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import sys
+from unittest import TestCase
+
+from gns3.qt import QtGui
+from gns3.pending_requests import PendingRequests, REQUEST_TIMEOUT_ERROR_CODE
+
+
+class TestPendingRequests(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.replies = []
+
+    def tearDown(self):
+        del self.app
+
+    def callback(self, result, error=False):
+        self.replies.append((result, error))
+
+    def test_timeouts(self):
+        pending = PendingRequests(default_timeout=30, timeouts={".start": 120, ".vm.start": 300})
+        self.assertEqual(pending.timeout("vpcs.delete"), 30)
+        self.assertEqual(pending.timeout("vpcs.start"), 120)
+        self.assertEqual(pending.timeout("dynamips.vm.start"), 300)
+
+    def test_reply(self):
+        pending = PendingRequests()
+        pending.add(1, "vpcs.create", self.callback)
+        self.assertEqual(pending.count(), 1)
+        self.assertEqual(pending.pop(1), self.callback)
+        # a reply received twice is ignored
+        self.assertIsNone(pending.pop(1))
+        self.assertEqual(pending.count(), 0)
+        self.assertEqual(pending.oldestAge(), 0)
+
+    def test_expiry(self):
+        pending = PendingRequests()
+        pending.add(1, "vpcs.create", self.callback, timeout=0)
+        pending.add(2, "vpcs.start", self.callback, timeout=0)
+        pending.add(3, "vpcs.stop", self.callback, timeout=3600)
+        pending.pop(2)
+        pending._expireSlot()
+
+        self.assertEqual(len(self.replies), 1)
+        error, is_error = self.replies[0]
+        self.assertTrue(is_error)
+        self.assertEqual(error["code"], REQUEST_TIMEOUT_ERROR_CODE)
+        self.assertEqual(pending.count(), 1)
+        self.assertEqual(pending.expiredCount(), 1)
+        self.assertIsNone(pending.pop(1))
+        self.assertIn(3, pending)
+
+        pending.failAll("Connection lost")
+        self.assertEqual(len(self.replies), 2)
+        self.assertEqual(pending.count(), 0)
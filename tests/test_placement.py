@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+from unittest.mock import patch
+
+from gns3.placement import RoundRobinPolicy, LeastLoadedPolicy, WeightedCapacityPolicy, createPlacementPolicy
+
+
+class FakeServer(object):
+
+    def __init__(self, name, ram_capacity=0, node_count=0, allocated_ram=0):
+        self.host = name
+        self.port = 8000
+        self._ram_capacity = ram_capacity
+        self.load = (node_count, allocated_ram)
+
+    def ramCapacity(self):
+        return self._ram_capacity
+
+
+def fake_load(server):
+    return server.load
+
+
+@patch("gns3.placement.serverLoad", fake_load)
+class TestPlacement(TestCase):
+
+    def test_round_robin(self):
+        servers = [FakeServer("a"), FakeServer("b")]
+        policy = RoundRobinPolicy()
+        self.assertEqual([policy.select(servers).host for _ in range(3)], ["a", "b", "a"])
+
+    def test_least_loaded(self):
+        servers = [FakeServer("a", node_count=1, allocated_ram=512),
+                   FakeServer("b", node_count=3, allocated_ram=256)]
+        self.assertEqual(LeastLoadedPolicy().select(servers).host, "b")
+
+    def test_weighted_capacity(self):
+        small = FakeServer("small", ram_capacity=4096, allocated_ram=1024)
+        big = FakeServer("big", ram_capacity=16384, allocated_ram=3072)
+        policy = WeightedCapacityPolicy()
+        self.assertEqual(policy.select([small, big], ram=256).host, "big")
+
+        # a server without enough RAM is only used if nothing else fits
+        full = FakeServer("full", ram_capacity=1024)
+        unknown = FakeServer("unknown", allocated_ram=4096)
+        self.assertEqual(policy.select([full, unknown], ram=2048).host, "unknown")
+        self.assertEqual(policy.select([full], ram=2048).host, "full")
+
+    def test_unknown_policy(self):
+        self.assertIsInstance(createPlacementPolicy("unknown"), RoundRobinPolicy)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import sys
+import json
+from unittest import TestCase
+from unittest import mock
+
+from gns3.qt import QtGui
+from gns3 import reconnect_supervisor
+from gns3.reconnect_supervisor import ReconnectSupervisor
+from gns3.websocket_client import WebSocketClient
+
+
+class FakeServer(object):
+
+    def __init__(self, server_id):
+        self.host = "10.0.0.{}".format(server_id)
+        self.port = 8000
+        self._id = server_id
+        self.reconnecting = False
+        self.callbacks = []
+        self.failed = None
+
+    def id(self):
+        return self._id
+
+    def setReconnecting(self, value):
+        self.reconnecting = value
+
+    def connectAsync(self, callback):
+        self.callbacks.append(callback)
+
+    def failOutgoing(self, message):
+        self.failed = message
+
+
+@mock.patch("gns3.reconnect_supervisor.ReconnectSupervisor._resynchronize")
+class TestReconnectSupervisor(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.supervisor = ReconnectSupervisor()
+        self.server = FakeServer(1)
+
+    def tearDown(self):
+        del self.app
+
+    def test_delay(self, resynchronize):
+        for attempt in range(20):
+            bound = min(reconnect_supervisor.RECONNECT_MAX_DELAY, reconnect_supervisor.RECONNECT_INITIAL_DELAY * 2 ** attempt)
+            delay = ReconnectSupervisor.delay(attempt)
+            self.assertGreaterEqual(delay, bound // 2)
+            self.assertLessEqual(delay, bound)
+
+    def test_reconnected(self, resynchronize):
+        reconnected = []
+        self.supervisor.reconnected_signal.connect(lambda server_id, attempts: reconnected.append((server_id, attempts)))
+        self.supervisor.connectionLost(self.server)
+        # only one reconnection at a time
+        self.supervisor.connectionLost(self.server)
+        self.assertTrue(self.server.reconnecting)
+        self.assertTrue(self.supervisor.isReconnecting(self.server))
+
+        self.supervisor._attemptSlot(self.server.id())
+        self.server.callbacks[-1]({"message": "Connection refused", "errno": 111}, True)
+        self.assertTrue(self.supervisor.isReconnecting(self.server))
+        self.supervisor._attemptSlot(self.server.id())
+        self.server.callbacks[-1](self.server)
+
+        self.assertEqual(reconnected, [(1, 2)])
+        self.assertFalse(self.server.reconnecting)
+        self.assertFalse(self.supervisor.isReconnecting(self.server))
+        resynchronize.assert_called_once_with(self.server)
+
+    def test_gave_up(self, resynchronize):
+        self.supervisor.connectionLost(self.server)
+        for _ in range(reconnect_supervisor.RECONNECT_MAX_ATTEMPTS):
+            self.supervisor._attemptSlot(self.server.id())
+            self.server.callbacks[-1]({"message": "Connection refused", "errno": 111}, True)
+
+        self.assertFalse(self.supervisor.isReconnecting(self.server))
+        self.assertIn("Connection refused", self.server.failed)
+        self.assertFalse(resynchronize.called)
+
+
+class FakeModule(object):
+
+    def serverReconnected(self, server):
+        server.send_notification("dynamips.settings", {"path": "dynamips"})
+
+    @classmethod
+    def instance(cls):
+        return cls()
+
+
+class TestResynchronize(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.client = WebSocketClient("ws://127.0.0.1:8000")
+        self.sent = []
+        self.client.send = self.sent.append
+
+    def tearDown(self):
+        del self.app
+
+    def test_settings_sent_first(self):
+        self.client.setReconnecting(True)
+        self.client.send_message("dynamips.vm.create", {"name": "R1"}, lambda result, error=False: None)
+        self.client.setReconnecting(False)
+        self.client._connected = True
+
+        with mock.patch("gns3.modules.MODULES", [FakeModule]):
+            ReconnectSupervisor()._resynchronize(self.client)
+
+        messages = []
+        for data in self.sent:
+            message = json.loads(data)
+            messages.extend(message if isinstance(message, list) else [message])
+        self.assertEqual([message["method"] for message in messages], ["dynamips.settings", "dynamips.vm.create"])
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import io
+import struct
+import zlib
+from unittest import TestCase
+
+from gns3.qt import QtCore
+from gns3.scene_exporter import PNGWriter, PNG_SIGNATURE, SceneExporter, ExportCancelled
+from gns3.symbol_cache import SymbolCache
+from gns3 import level_of_detail
+
+
+def readChunks(data):
+    chunks = []
+    offset = len(PNG_SIGNATURE)
+    while offset < len(data):
+        length, = struct.unpack(">I", data[offset:offset + 4])
+        chunk_type = data[offset + 4:offset + 8]
+        chunk = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack(">I", data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(chunk_type + chunk) & 0xffffffff
+        chunks.append((chunk_type, chunk))
+        offset += 12 + length
+    return chunks
+
+
+class TestPNGWriter(TestCase):
+
+    def test_streamed_rows(self):
+        stream = io.BytesIO()
+        writer = PNGWriter(stream, 4, 3)
+        rows = [bytes([row * 10] * 12) for row in range(3)]
+        # rows are written in several strips
+        writer.writeRows(rows[:2])
+        writer.writeRows(rows[2:])
+        writer.close()
+
+        data = stream.getvalue()
+        self.assertTrue(data.startswith(PNG_SIGNATURE))
+        chunks = readChunks(data)
+        self.assertEqual(chunks[0], (b"IHDR", struct.pack(">IIBBBBB", 4, 3, 8, 2, 0, 0, 0)))
+        self.assertEqual(chunks[-1], (b"IEND", b""))
+        pixels = zlib.decompress(b"".join(chunk for chunk_type, chunk in chunks if chunk_type == b"IDAT"))
+        self.assertEqual(pixels, b"".join(b"\x00" + row for row in rows))
+
+    def test_wrong_size(self):
+        writer = PNGWriter(io.BytesIO(), 4, 2)
+        with self.assertRaises(ValueError):
+            writer.writeRows([b"\x00" * 6])
+        writer.writeRows([b"\x00" * 12])
+        with self.assertRaises(ValueError):
+            writer.close()
+
+
+class FakeScene(object):
+
+    def __init__(self):
+        self.level = level_of_detail.MINIMAL
+
+    def levelOfDetail(self):
+        return self.level
+
+    def setLevelOfDetail(self, level):
+        self.level = level
+
+
+class TestVectorDetail(TestCase):
+
+    def test_full_detail_restored(self):
+        scene = FakeScene()
+        exporter = SceneExporter(scene, rect=QtCore.QRectF(0, 0, 100, 100))
+        symbol_cache = SymbolCache.instance()
+        symbol_cache.setPixmapsEnabled(True)
+        with self.assertRaises(ExportCancelled):
+            with exporter._fullDetail():
+                self.assertEqual(scene.level, level_of_detail.FULL)
+                self.assertFalse(level_of_detail.isEnabled())
+                self.assertFalse(symbol_cache.pixmapsEnabled())
+                raise ExportCancelled()
+        self.assertEqual(scene.level, level_of_detail.MINIMAL)
+        self.assertTrue(level_of_detail.isEnabled())
+        self.assertTrue(symbol_cache.pixmapsEnabled())
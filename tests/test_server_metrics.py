@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import sys
+from unittest import TestCase, mock
+
+from gns3.qt import QtGui
+from gns3.server_metrics import LatencyHistogram
+from gns3.websocket_compression import PerMessageDeflate, FrameInflater, buildFrame, OPCODE_TEXT
+from gns3.websocket_client import WebSocketClient
+from ws4py.client import WebSocketBaseClient
+
+
+class TestServerMetrics(TestCase):
+
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        for latency in (3, 4, 8, 15, 150):
+            histogram.add(latency)
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.mean(), 36)
+        self.assertEqual(histogram.percentile(50), 10)
+        self.assertEqual(histogram.percentile(95), 150)
+        self.assertEqual(histogram.buckets(), [(5, 2), (10, 1), (20, 1), (200, 1)])
+
+    def test_rtt(self):
+        app = QtGui.QApplication(sys.argv)
+        client = WebSocketClient("ws://127.0.0.1:8000")
+        client._connected = True
+        client.send = lambda data: None
+        client.send_message("vpcs.start", {"id": 1}, lambda result, error=False: None)
+        request_id = next(iter(client.pendingRequests()._requests))
+        client._dispatchMessage({"jsonrpc": 2.0, "id": request_id, "result": True})
+        latencies = client.metrics().latencies()
+        self.assertEqual(latencies["vpcs.start"].count, 1)
+        self.assertEqual(client.metrics().dump()["methods"]["vpcs.start"]["count"], 1)
+        del app
+
+    def test_bytes_received_on_the_wire(self):
+        app = QtGui.QApplication(sys.argv)
+        client = WebSocketClient("ws://127.0.0.1:8000")
+        client._inflater = FrameInflater(PerMessageDeflate())
+        message = b"hostname R1\n" * 100
+        frame = buildFrame(OPCODE_TEXT, PerMessageDeflate().compress(message), compressed=True, masked=False)
+        with mock.patch.object(WebSocketBaseClient, "process", lambda client, data: True, create=True):
+            self.assertTrue(client.process(frame))
+        # the compressed size is counted, not the inflated message
+        self.assertEqual(client.metrics().bytes_in, len(frame))
+        self.assertLess(client.metrics().bytes_in, len(message))
+        del app
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from unittest import TestCase
+
+# modules which must only be imported on first use
+DEFERRED_MODULES = ["libcloud",
+                    "paramiko",
+                    "requests",
+                    "tornado",
+                    "PyQt4.QtWebKit",
+                    "gns3.cloud.rackspace_ctrl",
+                    "gns3.cloud.utils",
+                    "gns3.news_dock_widget",
+                    "gns3.dialogs.preferences_dialog",
+                    "gns3.dialogs.new_project_dialog",
+                    "gns3.dialogs.node_configurator_dialog"]
+
+# seconds allowed to import the GUI, can be raised on slow machines
+COLD_START_BUDGET = float(os.environ.get("GNS3_COLD_START_BUDGET", 3.0))
+
+# where the import time profiling report is written
+REPORT_PATH = os.environ.get("GNS3_IMPORT_REPORT", os.path.join(tempfile.gettempdir(), "gns3_import_report.txt"))
+
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+import gns3.main
+print(json.dumps({"duration": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+
+
+def importProfile(lines):
+    """
+    Parses the output of python -X importtime, slowest imports first.
+    """
+
+    profile = []
+    for line in lines:
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        profile.append((int(cumulative), int(self_time), name.strip()))
+    return sorted(profile, reverse=True)
+
+
+class TestStartupImports(TestCase):
+
+    def setUp(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.environ.get("PYTHONPATH", "")]))
+        process = subprocess.Popen([sys.executable, "-X", "importtime", "-c", CHILD],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env, universal_newlines=True)
+        stdout, stderr = process.communicate()
+        if process.returncode != 0:
+            self.skipTest("cannot import the GUI: {}".format(stderr.strip().splitlines()[-1:]))
+        self.result = json.loads(stdout.strip().splitlines()[-1])
+        self.profile = importProfile(stderr.splitlines())
+
+        with open(REPORT_PATH, "w") as f:
+            f.write("GUI imported in {:.3f}s (budget {:.3f}s)\n".format(self.result["duration"], COLD_START_BUDGET))
+            f.write("cumulative [us]  self [us]  module\n")
+            for cumulative, self_time, name in self.profile[:50]:
+                f.write("{:>15}  {:>9}  {}\n".format(cumulative, self_time, name))
+
+    def test_deferred_modules(self):
+        loaded = set(self.result["modules"])
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, loaded, "{} is imported at startup".format(module))
+
+    def test_cold_start_budget(self):
+        self.assertLess(self.result["duration"], COLD_START_BUDGET,
+                        "importing the GUI took {:.3f}s, see {}".format(self.result["duration"], REPORT_PATH))
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import sys
+from unittest import TestCase
+from unittest import mock
+
+from gns3.qt import QtGui
+from gns3.startup_orchestrator import StartupOrchestrator
+
+
+class FakeServer(object):
+
+    def __init__(self, host, port, connected=False):
+        self.host = host
+        self.port = port
+        self._connected = connected
+        self.callback = None
+
+    def connected(self):
+        return self._connected
+
+    def connectAsync(self, callback):
+        self.callback = callback
+
+
+class TestStartupOrchestrator(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.main_window = mock.MagicMock()
+        self.main_window.settings.return_value = {"check_for_update": False}
+        self.local_server = FakeServer("127.0.0.1", 8000, connected=True)
+        self.remote_servers = {1: FakeServer("10.0.0.1", 8000), 2: FakeServer("10.0.0.2", 8000)}
+        servers = mock.MagicMock()
+        servers.localServer.return_value = self.local_server
+        servers.remoteServers.return_value = self.remote_servers
+        patcher = mock.patch("gns3.startup_orchestrator.Servers.instance", return_value=servers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        del self.app
+
+    @mock.patch("gns3.startup_orchestrator.StartupOrchestrator._sendAnalytics")
+    def test_parallel_remote_connections(self, send_analytics):
+        orchestrator = StartupOrchestrator(None)
+        orchestrator._main_window = self.main_window
+        orchestrator.start()
+
+        # all the connections are started before any of them is over
+        for server in self.remote_servers.values():
+            self.assertIsNotNone(server.callback)
+        self.assertEqual(len(orchestrator.pendingSteps()), 2)
+
+        self.remote_servers[1].callback(self.remote_servers[1])
+        self.remote_servers[2].callback({"message": "Connection refused", "errno": 111}, True)
+        self.assertEqual(orchestrator.pendingSteps(), [])
+        self.assertIn("remote server 10.0.0.2:8000 connection", orchestrator.timings())
+        self.assertIn("startup", orchestrator.timings())
+        self.assertTrue(self.main_window.uiStatusBar.showMessage.called)
+
+    @mock.patch("gns3.startup_orchestrator.StartupOrchestrator._sendAnalytics")
+    def test_update_check_ends_with_reply(self, send_analytics):
+        self.main_window.settings.return_value = {"check_for_update": True, "last_check_for_update": 0}
+        orchestrator = StartupOrchestrator(None)
+        orchestrator._main_window = self.main_window
+        orchestrator.start()
+        for server in self.remote_servers.values():
+            server.callback(server)
+        self.assertEqual(orchestrator.pendingSteps(), ["update check"])
+
+        # the update server replies
+        self.main_window._checkForUpdateActionSlot.call_args[1]["callback"]()
+        self.assertEqual(orchestrator.pendingSteps(), [])
+        self.assertIn("update check", orchestrator.timings())
+
+    @mock.patch("gns3.startup_orchestrator.StartupOrchestrator._sendAnalytics")
+    def test_finished_once_local_server_started(self, send_analytics):
+        self.local_server._connected = False
+        self.remote_servers.clear()
+        servers = mock.MagicMock()
+        servers.localServer.return_value = self.local_server
+        servers.remoteServers.return_value = self.remote_servers
+        servers.localServerAutoStart.return_value = True
+        servers.localServerPath.return_value = sys.executable
+        servers.startLocalServer.return_value = True
+        with mock.patch("gns3.startup_orchestrator.Servers.instance", return_value=servers):
+            orchestrator = StartupOrchestrator(None)
+            orchestrator._main_window = self.main_window
+            finished = []
+            orchestrator.finished_signal.connect(lambda: finished.append(True))
+            orchestrator.start()
+
+            # the local server is started once the connection has failed
+            self.local_server.callback({"message": "Connection refused", "errno": 111}, True)
+            self.assertEqual(finished, [])
+            self.assertEqual(orchestrator.pendingSteps(), ["local server start"])
+
+            orchestrator._localServerStartedSlot()
+            self.assertEqual(finished, [])
+            self.local_server.callback(self.local_server)
+            self.assertEqual(finished, [True])
+            self.assertIn("local server start", orchestrator.timings())
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import time
+import tempfile
+from unittest import TestCase
+
+from gns3.qt import QtCore, QtGui, QtSvg
+from gns3.symbol_cache import SymbolCache, isRasterPainter
+
+import logging
+log = logging.getLogger(__name__)
+
+SYMBOL = """<svg xmlns="http://www.w3.org/2000/svg" width="60" height="40">
+{}
+</svg>
+""".format("\n".join('<rect x="{0}" y="{0}" width="10" height="10" fill="#{0:02x}8040"/>'.format(index) for index in range(50)))
+
+
+class TestSymbolCache(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.cache = SymbolCache()
+        with tempfile.NamedTemporaryFile("w", suffix=".svg", delete=False) as f:
+            f.write(SYMBOL)
+            self.path = f.name
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_shared_and_evicted(self):
+        first = self.cache.acquire(self.path)
+        second = self.cache.acquire(self.path)
+        self.assertIs(first, second)
+        self.assertEqual(first.objectName(), self.path)
+        self.assertEqual(self.cache.references(self.path), 2)
+        self.cache.release(self.path)
+        self.assertEqual(self.cache.stats()["symbols"], 1)
+        self.cache.release(self.path)
+        self.assertEqual(self.cache.stats()["symbols"], 0)
+        self.assertIsNone(self.cache.acquire(self.path + ".missing"))
+
+    def test_pixmap_per_zoom_level(self):
+        renderer = self.cache.acquire(self.path)
+        size = QtCore.QSizeF(60, 40)
+        pixmap = self.cache.pixmap(renderer, size, 1.0)
+        self.assertEqual((pixmap.width(), pixmap.height()), (60, 40))
+        self.assertEqual(self.cache.pixmap(renderer, size, 2.01).width(), 120)
+        self.cache.pixmap(renderer, size, 1.0)
+        self.assertEqual(self.cache.stats()["pixmaps"], 2)
+
+    def test_raster_painter(self):
+        image = QtGui.QImage(10, 10, QtGui.QImage.Format_ARGB32)
+        painter = QtGui.QPainter(image)
+        self.assertTrue(isRasterPainter(painter))
+        painter.end()
+
+        generator = QtSvg.QSvgGenerator()
+        generator.setOutputDevice(QtCore.QBuffer())
+        generator.setSize(QtCore.QSize(10, 10))
+        painter = QtGui.QPainter(generator)
+        self.assertFalse(isRasterPainter(painter))
+        painter.end()
+
+    def test_benchmark(self):
+        count = 1000
+        start = time.perf_counter()
+        renderers = [QtSvg.QSvgRenderer(self.path) for _ in range(count)]
+        parse_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        shared = [self.cache.acquire(self.path) for _ in range(count)]
+        cache_time = time.perf_counter() - start
+
+        self.assertEqual(self.cache.stats()["parsed"], 1)
+        self.assertEqual(len(set(map(id, shared))), 1)
+        log.info("{} symbols: parsed in {:.3f}s, shared in {:.3f}s".format(count, parse_time, cache_time))
+        del renderers
@@ -5,6 +5,26 @@ from gns3.topology import Topology
 from gns3.main_window import MainWindow
 
 
+class FakeNode(object):
+    def __init__(self, node_id, server="local", module="dynamips"):
+        self._id = node_id
+        self._name = "R{}".format(node_id)
+        self._server = server
+        self._module = module
+
+    def id(self):
+        return self._id
+
+    def name(self):
+        return self._name
+
+    def server(self):
+        return self._server
+
+    def module(self):
+        return self._module
+
+
 class TestTopology(TestCase):
     def setUp(self):
         self.t = Topology.instance()
@@ -103,3 +123,84 @@ class TestTopology(TestCase):
         self.assertEqual(len(instances), 2)
         self.assertEqual(instances[0].name, 'Foo Instance')
         self.assertEqual(instances[1].name, 'Another Foo Instance')
+
+    def test_node_indexes(self):
+        nodes = [FakeNode(1, "server1", "dynamips"),
+                 FakeNode(2, "server1", "iou"),
+                 FakeNode(3, "server2", "dynamips")]
+        for node in nodes:
+            self.t.addNode(node)
+        self.assertEqual(self.t.nodes(), nodes)
+        self.assertIs(self.t.getNode(2), nodes[1])
+        self.assertIsNone(self.t.getNode(4))
+        self.assertIs(self.t.getNodeByName("R3"), nodes[2])
+        self.assertEqual(self.t.nodesByServer("server1"), nodes[:2])
+        self.assertEqual(self.t.nodesByModule("dynamips"), [nodes[0], nodes[2]])
+
+        # renamed nodes are still found
+        nodes[0]._name = "Core"
+        self.assertIs(self.t.getNodeByName("Core"), nodes[0])
+        self.assertIsNone(self.t.getNodeByName("R1"))
+
+        self.t.removeNode(nodes[0])
+        self.assertIsNone(self.t.getNode(1))
+        self.assertEqual(self.t.nodesByServer("server1"), [nodes[1]])
+        self.assertEqual(self.t.nodesByModule("dynamips"), [nodes[2]])
+
+    def test_instance_lookup(self):
+        self.t.addInstance(name="First", id="xyz", size_id="1", image_id="2",
+                           private_key="private", public_key="public")
+        self.t.addInstance(name="Second", id="xyz", size_id="1", image_id="2",
+                           private_key="private", public_key="public")
+        self.assertEqual(self.t.getInstance("xyz").name, "First")
+        self.t.removeInstance("xyz")
+        self.assertEqual(self.t.getInstance("xyz").name, "Second")
+        self.assertIsNone(self.t.getInstance("abc"))
+
+    def test_lookups_are_indexed(self):
+        calls = []
+
+        class CountingNode(FakeNode):
+            def id(self):
+                calls.append("id")
+                return FakeNode.id(self)
+
+            def name(self):
+                calls.append("name")
+                return FakeNode.name(self)
+
+        count = 2000
+        nodes = [CountingNode(node_id, "server{}".format(node_id % 4)) for node_id in range(1, count + 1)]
+        for node in nodes:
+            self.t.addNode(node)
+        for node in nodes:
+            self.assertIs(self.t.getNode(node._id), node)
+            self.assertIs(self.t.getNodeByName(node._name), node)
+        self.assertEqual(len(self.t.nodesByServer("server1")), count // 4)
+
+        # a constant number of calls per node, scanning the nodes would be quadratic
+        self.assertLessEqual(len(calls), 10 * count)
+
+    def test_batch_deduplicates_refreshes(self):
+        calls = []
+        refresh = lambda: calls.append("refresh")
+        self.assertFalse(self.t.defer(refresh))
+        with self.t.batch():
+            with self.t.batch():
+                for _ in range(50):
+                    self.assertTrue(self.t.defer(refresh))
+                self.t.defer(lambda: calls.append("other"))
+            self.assertEqual(calls, [])
+            self.assertTrue(self.t.inBulk())
+        self.assertEqual(calls, ["refresh", "other"])
+        self.assertFalse(self.t.inBulk())
+
+    def test_reset_drops_deferred_refreshes(self):
+        calls = []
+        with self.t.batch():
+            self.t.defer(lambda: calls.append("removed node"))
+            self.t.reset()
+            self.assertTrue(self.t.inBulk())
+            self.t.defer(lambda: calls.append("new node"))
+        self.assertEqual(calls, ["new node"])
+        self.assertFalse(self.t.inBulk())
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import sys
+from unittest import TestCase
+
+from gns3.qt import QtCore, QtGui
+from gns3.topology_loader import TopologyLoader
+
+
+class FakeServer(object):
+    host = "127.0.0.1"
+    port = 8000
+
+    def __init__(self):
+        self.batches = 0
+
+    def startBatch(self):
+        pass
+
+    def endBatch(self):
+        self.batches += 1
+
+
+class FakeNode(QtCore.QObject):
+    created_signal = QtCore.Signal(int)
+    error_signal = QtCore.Signal(int, str)
+    server_error_signal = QtCore.Signal(int, int, str)
+
+    def __init__(self, node_id, server, loaded):
+        super(FakeNode, self).__init__()
+        self._id = node_id
+        self._server = server
+        self._loaded = loaded
+
+    def id(self):
+        return self._id
+
+    def name(self):
+        return "R{}".format(self._id)
+
+    def server(self):
+        return self._server
+
+    def load(self, node_info):
+        self._loaded.append(self)
+
+
+class FakeLink(QtCore.QObject):
+    add_link_signal = QtCore.Signal(int)
+    cancel_link_signal = QtCore.Signal(int)
+
+
+class TestTopologyLoader(TestCase):
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.loaded = []
+        self.progress = []
+        self.finished = []
+        self.server = FakeServer()
+        self.loader = TopologyLoader(window=2)
+        self.loader.progress_signal.connect(lambda done, total: self.progress.append((done, total)))
+        self.loader.finished_signal.connect(lambda: self.finished.append(True))
+
+    def tearDown(self):
+        del self.app
+
+    def test_window(self):
+        nodes = [FakeNode(node_id, self.server, self.loaded) for node_id in range(1, 6)]
+        for node in nodes:
+            self.loader.addNode(node, {})
+        self.loader.start()
+        self.assertEqual(self.loaded, nodes[:2])
+
+        nodes[0].created_signal.emit(nodes[0].id())
+        self.assertEqual(self.loaded, nodes[:3])
+        nodes[1].server_error_signal.emit(nodes[1].id(), -1, "error")
+        self.assertEqual(self.loaded, nodes[:4])
+        self.assertEqual(self.loader.failures(), 1)
+
+        for node in nodes[2:]:
+            node.created_signal.emit(node.id())
+        self.assertEqual(self.loaded, nodes)
+        self.assertEqual(self.progress[-1], (5, 5))
+        self.assertEqual(self.finished, [True])
+        self.assertIn("nodes", self.loader.timings())
+        self.assertIn("total", self.loader.timings())
+
+    def test_links(self):
+        nodes = [FakeNode(node_id, self.server, self.loaded) for node_id in range(1, 4)]
+        self.loader.setTopologyLinks([{"id": 1, "source_node_id": 1, "destination_node_id": 2},
+                                      {"id": 2, "source_node_id": 2, "destination_node_id": 3}])
+        for node in nodes:
+            self.loader.addNode(node, {})
+        self.loader.start()
+
+        nodes[0].created_signal.emit(1)
+        nodes[1].created_signal.emit(2)
+        link = FakeLink()
+        self.loader.addLink(1, link)
+        # node 3 fails, link 2 will never be created
+        nodes[2].error_signal.emit(3, "error")
+        self.assertEqual(self.finished, [])
+        link.add_link_signal.emit(1)
+        self.assertEqual(self.finished, [True])
+        self.assertEqual(self.loader.failures(), 2)
+        self.assertIn("links", self.loader.timings())
+
+    def test_skipped_links_do_not_start_links_timing(self):
+        node = FakeNode(1, self.server, self.loaded)
+        self.loader.setTopologyLinks([{"id": 1, "source_node_id": 1, "destination_node_id": 2}])
+        self.loader.addNode(node, {})
+        # node 2 was never loaded
+        self.loader.addLink(1, None)
+        self.assertIsNone(self.loader._links_start_time)
+        self.loader.start()
+        node.created_signal.emit(1)
+        self.assertEqual(self.finished, [True])
+        self.assertNotIn("links", self.loader.timings())
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import sys
+from unittest import TestCase
+
+from gns3.qt import QtCore, QtGui
+from gns3.node import Node
+from gns3.topology_summary_view import TopologySummaryModel, CaptureFilterProxyModel
+
+
+class FakePort(object):
+
+    def __init__(self, name, free=False, capturing=False, destination=None):
+        self._name = name
+        self.free = free
+        self._capturing = capturing
+        self.destination = destination
+
+    def name(self):
+        return self._name
+
+    def description(self):
+        if self.destination:
+            return "connected to {}".format(self.destination.name())
+        return "connected"
+
+    def destinationNode(self):
+        return self.destination
+
+    def isFree(self):
+        return self.free
+
+    def capturing(self):
+        return self._capturing
+
+
+class FakeNode(QtCore.QObject):
+    started_signal = QtCore.Signal()
+    stopped_signal = QtCore.Signal()
+    suspended_signal = QtCore.Signal()
+    updated_signal = QtCore.Signal()
+    deleted_signal = QtCore.Signal()
+
+    def __init__(self, name, ports):
+        super(FakeNode, self).__init__()
+        self._name = name
+        self._ports = ports
+
+    def name(self):
+        return self._name
+
+    def setName(self, name):
+        self._name = name
+
+    def status(self):
+        return Node.stopped
+
+    def ports(self):
+        return self._ports
+
+
+class TestTopologySummaryModel(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.model = TopologySummaryModel()
+        self.inserted = []
+        self.removed = []
+        self.model.rowsInserted.connect(lambda parent, first, last: self.inserted.append((parent.row(), first)))
+        self.model.rowsRemoved.connect(lambda parent, first, last: self.removed.append((parent.row(), first)))
+
+    def test_incremental_updates(self):
+        ports = [FakePort("e0"), FakePort("e1", free=True), FakePort("e2")]
+        node = FakeNode("R1", ports)
+        self.model.addNode(node)
+        node_index = self.model.index(0, 0)
+        self.assertEqual(self.model.data(node_index), "R1")
+        self.assertEqual(self.model.rowCount(node_index), 2)
+
+        # connecting a port inserts a single row
+        self.inserted = []
+        ports[1].free = False
+        node.updated_signal.emit()
+        self.assertEqual(self.inserted, [(0, 1)])
+        self.assertEqual(self.model.data(self.model.index(1, 0, node_index)), "e1 connected")
+
+        # disconnecting a port removes a single row
+        ports[0].free = True
+        node.updated_signal.emit()
+        self.assertEqual(self.removed, [(0, 0)])
+        self.assertEqual(self.model.rowCount(node_index), 2)
+
+        node.deleted_signal.emit()
+        self.assertEqual(self.model.rowCount(), 0)
+
+    def test_rename_refreshes_peers(self):
+        r1 = FakeNode("R1", [])
+        r2 = FakeNode("R2", [])
+        r3 = FakeNode("R3", [])
+        r1.ports().append(FakePort("s0", destination=r2))
+        r2.ports().extend([FakePort("s0", destination=r1), FakePort("s0", destination=r3)])
+        for node in (r1, r2, r3):
+            self.model.addNode(node)
+        r2_index = self.model.index(1, 0)
+        self.assertEqual(self.model.data(self.model.index(0, 0, r2_index)), "s0 connected to R1")
+
+        changed = []
+        self.model.dataChanged.connect(lambda first, last: changed.append((first.parent().row(), first.row(), last.row())))
+        r1.setName("X1")
+        r1.updated_signal.emit()
+
+        # the peer port rows show the new name and are sorted again
+        self.assertIn((1, 0, 1), changed)
+        self.assertEqual(self.model.data(self.model.index(0, 0, r2_index)), "s0 connected to R3")
+        self.assertEqual(self.model.data(self.model.index(1, 0, r2_index)), "s0 connected to X1")
+
+    def test_rename_keeps_persistent_indexes(self):
+        r1 = FakeNode("R1", [])
+        r2 = FakeNode("R2", [])
+        r3 = FakeNode("R3", [])
+        r2.ports().extend([FakePort("s0", destination=r1), FakePort("s0", destination=r3)])
+        for node in (r1, r2, r3):
+            self.model.addNode(node)
+        r2_index = self.model.index(1, 0)
+        current = QtCore.QPersistentModelIndex(self.model.index(0, 0, r2_index))
+
+        r1.setName("X1")
+        r2.updated_signal.emit()
+
+        # the persistent index follows the port connected to the renamed node
+        self.assertEqual(current.row(), 1)
+        self.assertEqual(self.model.data(QtCore.QModelIndex(current)), "s0 connected to X1")
+
+    def test_capture_filter(self):
+        self.model.addNode(FakeNode("R1", [FakePort("e0")]))
+        self.model.addNode(FakeNode("R2", [FakePort("e0", capturing=True)]))
+        proxy = CaptureFilterProxyModel()
+        proxy.setSourceModel(self.model)
+        self.assertEqual(proxy.rowCount(), 2)
+        proxy.setOnlyCapturing(True)
+        self.assertEqual(proxy.rowCount(), 1)
+        self.assertEqual(proxy.data(proxy.index(0, 0)), "R2")
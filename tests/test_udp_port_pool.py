@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import sys
+from unittest import TestCase
+
+from gns3.qt import QtCore, QtGui
+from gns3.udp_port_pool import UDPPortPool, PREFETCH_COUNT
+
+
+class FakeServer(object):
+    host = "127.0.0.1"
+    port = 8000
+
+    def __init__(self):
+        self.sent = []
+        self.batches = 0
+
+    def startBatch(self):
+        pass
+
+    def endBatch(self):
+        self.batches += 1
+
+    def send_message(self, method, params, callback):
+        self.sent.append((method, params, callback))
+
+    def reply(self, lport):
+        method, params, callback = self.sent.pop(0)
+        callback({"lport": lport, "port_id": params["port_id"]})
+
+
+class FakeNode(QtCore.QObject):
+    allocate_udp_nio_signal = QtCore.Signal(int, int, int)
+
+    def __init__(self, node_id, server, initialized=True):
+        super(FakeNode, self).__init__()
+        self._id = node_id
+        self._server = server
+        self._initialized = initialized
+        self.allocated = []
+        self.allocate_udp_nio_signal.connect(lambda node_id, port_id, lport: self.allocated.append((port_id, lport)))
+
+    def id(self):
+        return self._id
+
+    def name(self):
+        return "R{}".format(self._id)
+
+    def server(self):
+        return self._server
+
+    def module(self):
+        return "vpcs"
+
+    def initialized(self):
+        return self._initialized
+
+    def udpPortRequest(self, port_id):
+        return "vpcs.allocate_udp_port", {"id": self._id, "port_id": port_id}
+
+    def _allocateUDPPortCallback(self, result, error=False):
+        self.allocate_udp_nio_signal.emit(self._id, result["port_id"], result["lport"])
+
+
+class TestUDPPortPool(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.server = FakeServer()
+        self.pool = UDPPortPool()
+
+    def test_first_allocation_refills(self):
+        node = FakeNode(1, self.server)
+        self.pool.allocate(node, 0)
+        # the node request plus a batch of prefetch requests
+        self.assertEqual(len(self.server.sent), 1 + PREFETCH_COUNT)
+        self.assertEqual(self.server.batches, 1)
+        for lport in range(10000, 10000 + len(self.server.sent)):
+            self.server.reply(lport)
+        self.assertEqual(node.allocated, [(0, 10000)])
+        self.assertEqual(self.pool.available(self.server), PREFETCH_COUNT)
+
+        # the next allocation is served synchronously
+        self.pool.allocate(node, 1)
+        self.assertEqual(node.allocated[-1], (1, 10001))
+
+    def test_prefetch_for_node_being_created(self):
+        created = FakeNode(1, self.server)
+        pending = FakeNode(2, self.server, initialized=False)
+        self.pool.prefetch(pending, 2)
+        self.assertEqual(self.server.sent, [])
+        self.pool.prefetch(created, 2)
+        self.pool.prefetch(pending, 3)
+        self.assertEqual(len(self.server.sent), 3)
+
+        # the allocation waits for a prefetch request in flight
+        self.pool.allocate(pending, 5)
+        self.assertEqual(len(self.server.sent), 3)
+        self.server.reply(20000)
+        self.assertEqual(pending.allocated, [(5, 20000)])
+
+    def test_discard_node(self):
+        node = FakeNode(1, self.server)
+        self.pool.prefetch(node, 2)
+        self.server.reply(30000)
+        self.pool.discardNode(node)
+        self.server.reply(30001)
+        self.assertEqual(self.pool.available(), 0)
+
+    def test_reset(self):
+        node = FakeNode(1, self.server)
+        self.pool.prefetch(node, 2)
+        self.pool.reset()
+        self.server.reply(40000)
+        self.assertEqual(self.pool.available(), 0)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import socket
+import sys
+import threading
+import time
+from unittest import TestCase
+
+from gns3.qt import QtGui
+from gns3.utils import wait_for_connection_thread
+from gns3.utils.wait_for_connection_thread import WaitForConnectionThread
+
+
+class FakeProcess(object):
+
+    def __init__(self, returncode=None):
+        self.returncode = returncode
+
+    def poll(self):
+        return self.returncode
+
+
+class TestWaitForConnectionThread(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.errors = []
+        self.completed = []
+
+    def tearDown(self):
+        del self.app
+
+    def _thread(self, port, **kwargs):
+        thread = WaitForConnectionThread("127.0.0.1", port, **kwargs)
+        thread.error.connect(lambda message, stop: self.errors.append(message))
+        thread.completed.connect(lambda: self.completed.append(True))
+        return thread
+
+    def _freePort(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def test_connected(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen(1)
+            thread = self._thread(server.getsockname()[1])
+            thread.run()
+        self.assertEqual(self.completed, [True])
+        self.assertEqual(thread.attempts(), 1)
+
+    def test_woken_up_by_ready_event(self):
+        port = self._freePort()
+        ready_event = threading.Event()
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.addCleanup(server.close)
+
+        def listen():
+            # the server prints its ready line once listening
+            time.sleep(0.2)
+            server.bind(("127.0.0.1", port))
+            server.listen(1)
+            ready_event.set()
+
+        old_delay = wait_for_connection_thread.PROBE_INITIAL_DELAY
+        wait_for_connection_thread.PROBE_INITIAL_DELAY = 10.0
+        self.addCleanup(setattr, wait_for_connection_thread, "PROBE_INITIAL_DELAY", old_delay)
+        threading.Thread(target=listen).start()
+        begin = time.time()
+        thread = self._thread(port, ready_event=ready_event)
+        thread.run()
+        self.assertEqual(self.completed, [True])
+        # the backoff alone would have waited much longer
+        self.assertLess(time.time() - begin, 2.0)
+
+    def test_process_exited(self):
+        thread = self._thread(self._freePort(), process=FakeProcess(returncode=1))
+        thread.run()
+        self.assertEqual(self.completed, [])
+        self.assertEqual(len(self.errors), 1)
+        self.assertIn("exited with code 1", self.errors[0])
+        self.assertEqual(thread.attempts(), 0)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import sys
+import json
+from unittest import TestCase, mock
+
+from gns3.qt import QtGui
+from gns3.websocket_client import WebSocketClient
+
+
+class TestWebSocketClientCoalescing(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.client = WebSocketClient("ws://127.0.0.1:8000")
+        self.client._connected = True
+        self.sent = []
+        self.client.send = self.sent.append
+        self.replies = []
+
+    def tearDown(self):
+        del self.app
+
+    def callback(self, result, error=False):
+        self.replies.append(result)
+
+    def sent_messages(self):
+        messages = []
+        for data in self.sent:
+            message = json.loads(data)
+            if isinstance(message, list):
+                messages.extend(message)
+            else:
+                messages.append(message)
+        return messages
+
+    def test_updates_are_merged(self):
+        self.client.send_message("dynamips.vm.update", {"id": 1, "ram": 128}, self.callback)
+        self.client.send_message("dynamips.vm.update", {"id": 2, "ram": 128}, self.callback)
+        self.client.send_message("dynamips.vm.update", {"id": 1, "nvram": 64}, self.callback)
+        self.client._flushOutgoing()
+
+        messages = self.sent_messages()
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0]["params"], {"id": 1, "ram": 128, "nvram": 64})
+        self.assertEqual(messages[1]["params"], {"id": 2, "ram": 128})
+        self.assertEqual(self.client.coalescedCount(), 1)
+
+        # both senders are called back
+        self.client._dispatchMessage({"jsonrpc": 2.0, "id": messages[0]["id"], "result": {"ram": 128}})
+        self.assertEqual(len(self.replies), 2)
+
+    def test_order_is_kept(self):
+        self.client.send_message("dynamips.vm.update", {"id": 1, "ram": 128}, self.callback)
+        self.client.send_message("dynamips.vm.start", {"id": 1}, self.callback)
+        self.client.send_message("dynamips.vm.update", {"id": 1, "ram": 256}, self.callback)
+        self.client._flushOutgoing()
+
+        methods = [message["method"] for message in self.sent_messages()]
+        self.assertEqual(methods, ["dynamips.vm.update", "dynamips.vm.start", "dynamips.vm.update"])
+
+    def test_settings_are_merged(self):
+        self.client.send_notification("iou.settings", {"iourc": "/tmp/a", "iouyap": "/tmp/iouyap"})
+        self.client.send_notification("iou.settings", {"iourc": "/tmp/b"})
+        self.client.send_notification("iou.settings", {"license_check": False})
+        self.client._flushOutgoing()
+
+        messages = self.sent_messages()
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0]["params"], {"iourc": "/tmp/b", "iouyap": "/tmp/iouyap", "license_check": False})
+
+    def test_settings_params_are_copied(self):
+        remote_client = WebSocketClient("ws://127.0.0.1:8001")
+        remote_client._connected = True
+        remote_sent = []
+        remote_client.send = remote_sent.append
+
+        # the modules reuse the same params for all their servers
+        params = {"path": "/usr/bin/dynamips"}
+        self.client.send_notification("dynamips.settings", params)
+        del params["path"]
+        params["working_dir"] = "/tmp/remote"
+        remote_client.send_notification("dynamips.settings", params)
+        self.client._flushOutgoing()
+        remote_client._flushOutgoing()
+
+        self.assertEqual(self.sent_messages()[0]["params"], {"path": "/usr/bin/dynamips"})
+        self.assertEqual(json.loads(remote_sent[0])["params"], {"working_dir": "/tmp/remote"})
+
+
+class TestWebSocketClientReconnection(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication(sys.argv)
+        self.client = WebSocketClient("ws://127.0.0.1:8000")
+        self.sent = []
+        self.client.send = self.sent.append
+        self.replies = []
+
+    def tearDown(self):
+        del self.app
+
+    def callback(self, result, error=False):
+        self.replies.append((result, error))
+
+    def test_messages_queued_while_reconnecting(self):
+        self.client.setReconnecting(True)
+        self.client.send_message("vpcs.start", {"id": 1}, self.callback)
+        self.client.send_notification("vpcs.settings", {"path": "vpcs"})
+        self.client._flushOutgoing()
+        self.assertEqual(self.sent, [])
+
+        self.client._connected = True
+        self.client.setReconnecting(False)
+        self.client._flushOutgoing()
+        self.assertEqual(len(self.sent), 2)
+
+    def test_reconnect_after_handshake(self):
+        # the handshake is done but the queued opened() hasn't run yet
+        self.client._handshaked = True
+        with mock.patch("gns3.websocket_client.NetworkThread.isGuiThread", return_value=True):
+            self.client.reconnect()
+        self.assertTrue(self.client.connected())
+        self.client.send_message("vpcs.start", {"id": 1}, self.callback)
+        self.client._flushOutgoing()
+        self.assertEqual(len(self.sent), 2)
+
+    def test_queued_requests_failed(self):
+        self.client.setReconnecting(True)
+        self.client.send_message("vpcs.start", {"id": 1}, self.callback)
+        self.client.send_notification("vpcs.settings", {"path": "vpcs"})
+        self.client.failOutgoing("Could not reconnect")
+        self.assertEqual(len(self.replies), 1)
+        error, is_error = self.replies[0]
+        self.assertTrue(is_error)
+        self.assertEqual(error["message"], "Could not reconnect")
+        self.assertEqual(self.sent, [])
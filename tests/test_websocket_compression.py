@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import sys
+import struct
+from unittest import TestCase, mock
+
+from gns3.qt import QtGui
+from gns3.server_metrics import ServerMetrics
+from gns3.websocket_compression import PerMessageDeflate, FrameInflater, buildFrame, mask
+from gns3.websocket_compression import OPCODE_TEXT, OPCODE_CONTINUATION, READING_SIZE
+from gns3.websocket_client import WebSocketClient
+from ws4py.client import WebSocketBaseClient
+
+
+CONFIG = "\n".join("interface FastEthernet0/{}\n no ip address\n shutdown\n!".format(port) for port in range(48)).encode("utf-8")
+
+
+def parseFrame(data):
+    """
+    Parses a single unmasked frame.
+    """
+
+    first_byte, second_byte = data[0], data[1]
+    length = second_byte & 0x7f
+    offset = 2
+    if length == 126:
+        length = struct.unpack_from("!H", data, 2)[0]
+        offset = 4
+    elif length == 127:
+        length = struct.unpack_from("!Q", data, 2)[0]
+        offset = 10
+    return first_byte, data[offset:offset + length]
+
+
+class TestPerMessageDeflate(TestCase):
+
+    def test_negotiation(self):
+        self.assertIsNone(PerMessageDeflate.fromResponse("x-webkit-deflate-frame"))
+        deflate = PerMessageDeflate.fromResponse("permessage-deflate; client_max_window_bits=12; server_no_context_takeover")
+        self.assertEqual(deflate._client_max_window_bits, 12)
+        self.assertTrue(deflate._server_no_context_takeover)
+        with self.assertRaises(ValueError):
+            PerMessageDeflate.fromResponse("permessage-deflate; client_max_window_bits=8")
+        with self.assertRaises(ValueError):
+            PerMessageDeflate.fromResponse("permessage-deflate; unknown_param")
+
+    def test_round_trip(self):
+        client = PerMessageDeflate()
+        server = PerMessageDeflate()
+        for _ in range(3):
+            compressed = client.compress(CONFIG)
+            self.assertLess(len(compressed) * 4, len(CONFIG))
+            self.assertEqual(server.decompress(compressed), CONFIG)
+
+    def test_mask(self):
+        key = b"\x01\x02\x03\x04"
+        data = b"hello world"
+        self.assertEqual(mask(mask(data, key), key), data)
+        self.assertEqual(mask(data, key)[:4], bytes(a ^ b for a, b in zip(data[:4], key)))
+
+
+class TestFrameInflater(TestCase):
+
+    def setUp(self):
+        self.server = PerMessageDeflate()
+        self.metrics = ServerMetrics()
+        self.inflater = FrameInflater(PerMessageDeflate(), self.metrics)
+
+    def test_compressed_message(self):
+        frame = buildFrame(OPCODE_TEXT, self.server.compress(CONFIG), compressed=True, masked=False)
+        # data can be received in several chunks
+        self.assertEqual(self.inflater.feed(frame[:10]), [])
+        frames = self.inflater.feed(frame[10:])
+        self.assertEqual(len(frames), 1)
+        first_byte, payload = parseFrame(frames[0])
+        self.assertEqual(first_byte, 0x80 | OPCODE_TEXT)
+        self.assertEqual(payload, CONFIG)
+        ratio_in, ratio_out = self.metrics.compressionRatio()
+        self.assertGreater(ratio_in, 4)
+        self.assertEqual(ratio_out, 1.0)
+
+    def test_fragmented_message(self):
+        compressed = self.server.compress(CONFIG)
+        half = len(compressed) // 2
+        first = bytearray(buildFrame(OPCODE_TEXT, compressed[:half], compressed=True, masked=False))
+        # clear the FIN bit of the first fragment
+        first[0] &= 0x7f
+        last = buildFrame(OPCODE_CONTINUATION, compressed[half:], masked=False)
+        self.assertEqual(self.inflater.feed(bytes(first)), [])
+        first_byte, payload = parseFrame(self.inflater.feed(last)[0])
+        self.assertEqual(first_byte, 0x80 | OPCODE_TEXT)
+        self.assertEqual(payload, CONFIG)
+
+    def test_uncompressed_frames_untouched(self):
+        text = buildFrame(OPCODE_TEXT, b"{}", masked=False)
+        ping = buildFrame(0x9, b"", masked=False)
+        self.assertEqual(self.inflater.feed(text + ping), [text, ping])
+
+
+class TestCompressedClient(TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv)
+        self.client = WebSocketClient("ws://127.0.0.1:8000")
+        self.client._inflater = FrameInflater(PerMessageDeflate())
+        self.client.reading_buffer_size = 2
+        self.processed = []
+
+    def _process(self, client, data):
+        self.processed.append(data)
+        return bool(data)
+
+    def test_connection_closed(self):
+        with mock.patch.object(WebSocketBaseClient, "process", self._process, create=True):
+            self.assertFalse(self.client.process(b""))
+        self.assertEqual(self.processed, [b""])
+
+    def test_split_large_frame(self):
+        message = CONFIG * 64
+        frame = buildFrame(OPCODE_TEXT, PerMessageDeflate().compress(message), compressed=True, masked=False)
+        with mock.patch.object(WebSocketBaseClient, "process", self._process, create=True):
+            self.assertTrue(self.client.process(frame[:2]))
+            self.assertEqual(self.processed, [])
+            # the rest of the frame is read in large blocks
+            self.assertEqual(self.client.reading_buffer_size, READING_SIZE)
+            self.assertTrue(self.client.process(frame[2:]))
+        self.assertEqual(len(self.processed), 1)
+        self.assertEqual(parseFrame(self.processed[0])[1], message)